@@ -20,19 +20,60 @@
 // Konfiguration
 // ───────────────────────────────────────────────────────────────
 constexpr uint32_t BAUDRATE         = 115200;  // UART‑Geschwindigkeit
-constexpr uint32_t SAMPLE_PERIOD_MS = 20;      // 50 Hz  (1 000 ms / 50)
+constexpr uint32_t SAMPLE_PERIOD_MS = 20;      // 50 Hz  (1 000 ms / 50), auch Sensor‑Rate
 constexpr uint32_t LED_BLINK_MS     = 100;     // Herzschlag‑LED
+constexpr bool     OUTPUT_BINARY    = false;   // true: Binär‑Frames statt CSV
+                                               // (Pi: SerialCore(protocol="binary"),
+                                               //  erlaubt SAMPLE_PERIOD_MS < 20)
+constexpr uint8_t  FRAME_SYNC       = 0xA5;
 
 // Bosch Sensor‑Hub ➜ Rotation‑Vector (Quaternion)
 SensorQuaternion rotationVec(SENSOR_ID_RV);
 
+// ───────────────────────────────────────────────────────────────
+// CRC‑16/CCITT‑FALSE (Poly 0x1021, Init 0xFFFF) – identisch zu binascii.crc_hqx
+uint16_t crc16(const uint8_t* data, size_t len)
+{
+  uint16_t crc = 0xFFFF;
+  for (size_t i = 0; i < len; ++i) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (uint8_t b = 0; b < 8; ++b)
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+  }
+  return crc;
+}
+
+// Ein Sample als CSV‑Zeile oder Binär‑Frame auf 'out' schreiben
+void sendSample(Stream& out, uint32_t now, float qx, float qy, float qz, float qw)
+{
+  if (OUTPUT_BINARY) {
+    uint8_t frame[23];
+    frame[0] = FRAME_SYNC;
+    memcpy(frame + 1,  &now, 4);                 // Cortex‑M4: little‑endian
+    memcpy(frame + 5,  &qx,  4);
+    memcpy(frame + 9,  &qy,  4);
+    memcpy(frame + 13, &qz,  4);
+    memcpy(frame + 17, &qw,  4);
+    uint16_t crc = crc16(frame + 1, 20);
+    frame[21] = crc & 0xFF;
+    frame[22] = crc >> 8;
+    out.write(frame, sizeof(frame));
+    return;
+  }
+  out.print(now);  out.print(',');
+  out.print(qx, 6); out.print(',');
+  out.print(qy, 6); out.print(',');
+  out.print(qz, 6); out.print(',');
+  out.println(qw, 6);
+}
+
 // ───────────────────────────────────────────────────────────────
 void setup()
 {
   // USB‑Serial (für Debug über den PC, optional)
   Serial.begin(BAUDRATE);
   while (!Serial);
-  Serial.println("Nicla Sense ME – Quaternion UART mode");
+  if (!OUTPUT_BINARY) Serial.println("Nicla Sense ME – Quaternion UART mode");
 
   // Hardware‑UART1 für den Raspberry Pi
   Serial1.begin(BAUDRATE);
@@ -44,7 +85,9 @@ void setup()
 
   // Bosch BHY2‑Sensor‑Hub initialisieren (Standalone‑Modus)
   BHY2.begin(NICLA_STANDALONE);
-  rotationVec.begin(50, 0);          // 50 Hz Output, keine Latenz
+  // Sensor‑Rate aus SAMPLE_PERIOD_MS, sonst kämen bei kürzerer Periode
+  // nur wiederholte Samples; keine Latenz
+  rotationVec.begin(1000.0f / SAMPLE_PERIOD_MS, 0);
 }
 
 // ───────────────────────────────────────────────────────────────
@@ -69,7 +112,7 @@ void loop()
   rotationVec.clearDataAvailFlag();
 
   uint32_t now = millis();
-  if (now - lastSend < SAMPLE_PERIOD_MS) return; // 50 Hz‑Limit
+  if (now - lastSend < SAMPLE_PERIOD_MS) return; // Sample‑Takt
   lastSend = now;
 
   // Werte lesen
@@ -79,16 +122,8 @@ void loop()
   float qw = rotationVec.w();
 
   // ▶ Ausgabe über USB‑Serial (nur Debug, kann entfallen)
-  Serial.print(now);  Serial.print(',');
-  Serial.print(qx, 6); Serial.print(',');
-  Serial.print(qy, 6); Serial.print(',');
-  Serial.print(qz, 6); Serial.print(',');
-  Serial.println(qw, 6);
+  sendSample(Serial, now, qx, qy, qz, qw);
 
   // ▶ Ausgabe über UART1 an den Pi
-  Serial1.print(now);  Serial1.print(',');
-  Serial1.print(qx, 6); Serial1.print(',');
-  Serial1.print(qy, 6); Serial1.print(',');
-  Serial1.print(qz, 6); Serial1.print(',');
-  Serial1.println(qw, 6);
+  sendSample(Serial1, now, qx, qy, qz, qw);
 }
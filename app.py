@@ -1,31 +1,322 @@
 # app.py
 
-from flask import Flask, render_template, Response, request, jsonify
-from serial_core import SerialCore
-import threading, json, time
+from flask import Flask, render_template, Response, request, jsonify, send_file, abort
+from broadcast import BroadcastHub
+from sample_ring import rows_to_dicts
+from raw_recording import RawRecorder
+from sensor_manager import SensorManager
+from metrics import REGISTRY, CONTENT_TYPE
+from profiler import SamplingProfiler
+import session_recording
+from session_recording import SessionRecorder
+import session_analysis
+import threading, json, time, os, struct, atexit
 import numpy as np
 
+try:
+    from flask_sock import Sock   # optional: binärer WebSocket-Stream /ws
+except ImportError:
+    Sock = None
+
 app = Flask(__name__, template_folder="templates", static_folder="static")
+sock = Sock(app) if Sock else None
 
-# SerialCore-Instanz global
-sc = SerialCore(port="/dev/serial0", baud=115200)
-sc.connect()
+# Hub verteilt Status-Meldungen an alle Clients (markiert mit "sensor"),
+# Samples liegen im Ring des jeweiligen Sensors
+hub = BroadcastHub(maxlen=256)
 
-# Wird von SerialCore.q gefüllt: Winkel-Dicts und Status-Meldungen.
-# Wir liefern sie per Server‐Sent Events an die Clients.
-def event_stream():
-    """Server-Sent Events: wandelt alle numpy-Arrays in Listen um, dann JSON."""
-    while True:
-        data = sc.q.get()  # das stammt von SerialCore / DataProcessor
-        # baue ein neues Dict, in dem wir alle numpy-Arrays in Listen konvertieren
-        serializable = {}
-        for k, v in data.items():
-            if isinstance(v, np.ndarray):
-                serializable[k] = v.tolist()
+# Sensoren: NICLA_SENSORS="nord=/dev/ttyUSB0,sued=ble:Nicla-2,…" (Syntax in
+# sensor_manager.py). Ohne Angabe ein Sensor "main" wie bisher:
+# NICLA_PROTOCOL=binary, wenn die Firmware mit OUTPUT_BINARY gebaut wurde;
+# CSV wird blockweise gelesen (LineDecoder statt readline pro Frame).
+# NICLA_REPLAY=datei.nraw spielt stattdessen eine Aufzeichnung ab
+# (NICLA_REPLAY_SPEED: 1 = Echtzeit, N = N-fach, 0 = so schnell wie möglich).
+sensors = SensorManager(hub)
+if os.environ.get("NICLA_SENSORS"):
+    sensors.add_spec(os.environ["NICLA_SENSORS"])
+elif os.environ.get("NICLA_REPLAY"):
+    sensors.add_replay("main", os.environ["NICLA_REPLAY"],
+                       speed=float(os.environ.get("NICLA_REPLAY_SPEED", "1")))
+else:
+    sensors.add_serial("main", "/dev/serial0", baud=115200,
+                       protocol=os.environ.get("NICLA_PROTOCOL", "csv"))
+# Standard-Sensor für die Routen ohne Sensor-ID
+sc = sensors.get().core
+# NICLA_RAW_LOG=datei.nraw zeichnet alle Roh-Frames für späteres Replay auf,
+# bei mehreren Sensoren je Sensor in datei_<id>.nraw
+if os.environ.get("NICLA_RAW_LOG"):
+    _stem, _ext = os.path.splitext(os.environ["NICLA_RAW_LOG"])
+    for _s in sensors:
+        _s.processor.recorder = RawRecorder(f"{_stem}_{_s.id}{_ext}" if len(sensors) > 1
+                                           else os.environ["NICLA_RAW_LOG"])
+# Aufnahmen (.nrec) liegen in NICLA_RECORD_DIR, gesteuert über /api/record/*
+# bzw. /api/sensors/<sid>/record/*; je Sensor läuft höchstens eine Aufnahme.
+# NICLA_RECORD=name.nrec startet direkt eine Aufnahme des Standard-Sensors
+# (NICLA_RECORD_ROTATE_MB: neue Teildatei ab dieser Größe, NICLA_RECORD_FSYNC_S)
+RECORD_DIR = os.environ.get("NICLA_RECORD_DIR",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings"))
+recorders = {}   # Sensor-ID → laufende bzw. zuletzt beendete Aufnahme
+_rec_lock = threading.Lock()
+
+def _free_name(name):
+    """name bzw. name_2.nrec, name_3.nrec … – der erste, den es noch nicht gibt."""
+    stem, ext = os.path.splitext(name)
+    k = 1
+    while session_recording.session_files(os.path.join(RECORD_DIR, name)):
+        k += 1
+        name = f"{stem}_{k}{ext}"
+    return name
+
+def start_recording(name=None, rotate_mb=None, fsync_s=None, sensor=None, unique=False):
+    """
+    Startet eine Aufnahme aus dem Ring des Sensors; None, falls für diesen
+    Sensor schon eine läuft. Ohne name (oder mit unique) wird ein freier Name
+    gewählt, sonst FileExistsError, wenn es die Aufnahme schon gibt.
+    """
+    sensor = sensor or sensors.get()
+    with _rec_lock:
+        rec = recorders.get(sensor.id)
+        if rec and rec.active:
+            return None
+        os.makedirs(RECORD_DIR, exist_ok=True)
+        if name is None or unique:
+            prefix = "nicla_" if len(sensors) == 1 else f"nicla_{sensor.id}_"
+            name = _free_name(name or time.strftime(prefix + "%Y-%m-%d_%H-%M-%S.nrec"))
+        rotate_mb = float(os.environ.get("NICLA_RECORD_ROTATE_MB", "0")) if rotate_mb is None else rotate_mb
+        fsync_s = float(os.environ.get("NICLA_RECORD_FSYNC_S", "10")) if fsync_s is None else fsync_s
+        rec = recorders[sensor.id] = SessionRecorder(
+            os.path.join(RECORD_DIR, name), sensor.ring, fsync_s=fsync_s,
+            rotate_bytes=int(rotate_mb * 1e6) or None)
+        return rec
+
+def stop_recording(sensor=None):
+    """Beendet die Aufnahme des Sensors; None, falls keine läuft."""
+    sensor = sensor or sensors.get()
+    with _rec_lock:
+        rec = recorders.get(sensor.id)
+        if rec and rec.active:
+            rec.close()
+            return rec
+    return None
+
+def stop_all_recordings():
+    for s in sensors:
+        stop_recording(s)
+
+def _recording_info(sensor):
+    rec = recorders.get(sensor.id)
+    return rec.info() if rec else None
+
+def _recording_path(name):
+    """Pfad einer Aufnahme in RECORD_DIR; 404 bei fremden oder fehlenden Namen."""
+    if os.path.basename(name) != name or not name.endswith(".nrec"):
+        abort(404)
+    path = os.path.join(RECORD_DIR, name)
+    if not os.path.isfile(path):
+        abort(404)
+    return path
+
+if os.environ.get("NICLA_RECORD"):
+    start_recording(os.path.basename(os.environ["NICLA_RECORD"]), unique=True)
+atexit.register(stop_all_recordings)
+# Je Sensor: Verlauf in mehreren Auflösungen (60 s roh, 1 h à 1 s, 1 Tag à
+# 1 min, fester Speicher) und laufende Schwinganalyse im Reader-Thread
+sensors.start()
+history  = sensors.get().history
+analyzer = sensors.get().analyzer
+
+# Kennzahlen für /metrics: Zähler/Histogramme laufen im Datenweg mit,
+# Zustände (Queues, Clients, Raten) werden erst beim Abruf gelesen
+SSE_SERIALIZE_S = REGISTRY.histogram("nicla_sse_serialize_seconds",
+                                     "Aufbereitung und JSON-Serialisierung je SSE-Durchlauf")
+STREAM_CLIENTS  = REGISTRY.gauge("nicla_stream_clients", "Verbundene Stream-Clients", ("stream",))
+REGISTRY.collect("nicla_hub_clients", "Subscriptions am BroadcastHub", lambda: hub.clients)
+REGISTRY.collect("nicla_queue_depth", "Nicht abgeholte Meldungen je Queue",
+                 lambda: [(("hub",), hub.pending)], labels=("queue",))
+
+def _per_sensor(fn):
+    return lambda: [((s.id,), fn(s)) for s in sensors]
+
+REGISTRY.collect("nicla_samples_total", "Verarbeitete Samples",
+                 _per_sensor(lambda s: s.processor.timing.samples), ("sensor",), "counter")
+REGISTRY.collect("nicla_dropped_samples_total", "Verlorene Samples (Lücken der Sensor-Zeit)",
+                 _per_sensor(lambda s: s.processor.timing.dropped), ("sensor",), "counter")
+REGISTRY.collect("nicla_device_rate_hz", "Sample-Rate des Boards in Sensor-Zeit",
+                 _per_sensor(lambda s: s.processor.timing.device_hz), ("sensor",))
+REGISTRY.collect("nicla_clock_drift_ppm", "Gangunterschied Nicla gegenüber Host",
+                 _per_sensor(lambda s: s.processor.timing.drift_ppm), ("sensor",))
+REGISTRY.collect("nicla_calibrating", "1, solange eine Kalibrierungsphase läuft",
+                 _per_sensor(lambda s: int(s.processor.calib.collecting())), ("sensor",))
+
+# Stichproben-Profiler: /api/profile/start|stop, Stacks unter /api/profile.
+# NICLA_PROFILE=datei.folded profiliert ab dem Start und schreibt beim Beenden.
+profiler = SamplingProfiler()
+if os.environ.get("NICLA_PROFILE"):
+    profiler.start()
+    atexit.register(lambda: (profiler.stop(), profiler.dump(os.environ["NICLA_PROFILE"])))
+REGISTRY.collect("nicla_profiler_running", "1, solange der Stichproben-Profiler läuft",
+                 lambda: int(profiler.running))
+
+KEEPALIVE_S = 15.0   # Kommentarzeile, damit getrennte Clients bemerkt werden
+RING_FILL   = 0.5    # agg=stats: ein Intervall darf den Ring höchstens so weit füllen
+POLL_S      = 0.05   # max. Wartezeit auf neue Samples, dann Status prüfen
+
+def _serializable(data, fields=None):
+    """Wandelt numpy-Arrays in Listen um und behält nur die gewünschten Felder."""
+    out = {}
+    for k, v in data.items():
+        if fields and k not in fields:
+            continue
+        out[k] = v.tolist() if isinstance(v, np.ndarray) else v
+    return out
+
+def _aggregate(rows, fields=None):
+    """
+    Fasst die Samples eines Intervalls zusammen: skalare Messwerte als
+    Mittelwert plus <key>_min/<key>_max, 'secs' und Matrizen vom neuesten
+    Sample, 'n' = Anzahl zusammengefasster Samples.
+    """
+    out = {"n": len(rows)}
+    for k in (fields or rows.dtype.names):
+        if k not in rows.dtype.names:
+            continue
+        col = rows[k]
+        if k == "secs" or col.ndim > 1:
+            out[k] = col[-1].tolist()
+            continue
+        out[k] = float(col.mean())
+        out[k + "_min"] = float(col.min())
+        out[k + "_max"] = float(col.max())
+    return out
+
+def _sensor(sid=None):
+    """Sensor zur ID aus der URL (ohne ID der Standard-Sensor); 404, falls unbekannt."""
+    if sid is not None and sid not in sensors:
+        abort(404)
+    return sensors.get(sid)
+
+def _own_events(sub, sensor):
+    """Anstehende Hub-Meldungen, die zu diesem Sensor gehören (bzw. keinem)."""
+    return [_serializable(d) for d in sub.drain() if d.get("sensor", sensor.id) == sensor.id]
+
+# Samples kommen aus dem Ring des Sensors (jeder Client mit eigenem Cursor),
+# Status-Meldungen über die Hub-Subscription des Clients.
+def event_stream(sub, hz=None, fields=None, agg="last", sensor=None):
+    """
+    Server-Sent Events: Samples aus dem Ring des Sensors als JSON.
+    Ohne hz wird jedes Sample gesendet. Mit hz wird pro Intervall nur das
+    neueste Sample (agg="last") bzw. min/max/mean aller Samples
+    (agg="stats") gesendet; Status-Meldungen gehen immer einzeln raus.
+    fields begrenzt die serialisierten Schlüssel. Bei agg="stats" enthält
+    jedes Event "dropped": Samples des Intervalls, die der Ring schon
+    überschrieben hatte (nicht in min/max/mean enthalten).
+    """
+    sensor = sensor or sensors.get()
+    ring = sensor.ring
+    cursor = ring.head
+    last_sent = time.monotonic()
+    clients = STREAM_CLIENTS.labels("sse")
+    clients.inc()
+    try:
+        while True:
+            if hz:
+                time.sleep(1.0 / hz)
             else:
-                serializable[k] = v
-        # jetzt klappt dump
-        yield f"data: {json.dumps(serializable)}\n\n"
+                ring.wait(cursor, POLL_S)
+            t0 = time.perf_counter()
+            events = _own_events(sub, sensor)
+            rows, cursor, dropped = ring.read(cursor)
+            if len(rows):
+                if not hz:
+                    events += rows_to_dicts(rows, fields)
+                elif agg == "stats":
+                    events.append({**_aggregate(rows, fields), "dropped": dropped})
+                else:
+                    events += rows_to_dicts(rows[-1:], fields)
+            lines = [f"data: {json.dumps(ev)}\n\n" for ev in events]
+            if lines:
+                SSE_SERIALIZE_S.observe(time.perf_counter() - t0)
+            for line in lines:
+                yield line
+            if len(rows):
+                # ausgeliefert: Alter des neuesten Samples seit dem Reader
+                sensor.processor.timing.consumed("sse", cursor)
+            if events:
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= KEEPALIVE_S:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+    finally:
+        clients.dec()
+        hub.unsubscribe(sub)
+
+
+def analysis_stream(hz=2.0, analyzer=None):
+    """
+    Server-Sent Events: Kennwerte des SwingAnalyzer, sobald eine neue
+    Halbschwingung erkannt wurde (höchstens hz-mal pro Sekunde).
+    """
+    analyzer = analyzer or sensors.get().analyzer
+    version = -1
+    last_sent = time.monotonic()
+    while True:
+        time.sleep(1.0 / hz)
+        if analyzer.version != version:
+            res = analyzer.result()
+            version = res["version"]
+            yield f"data: {json.dumps(res)}\n\n"
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= KEEPALIVE_S:
+            yield ": keepalive\n\n"
+            last_sent = time.monotonic()
+
+
+# Binärformat für /ws: Header <2sBBI> = b"NB", Version, Felder/Record, Anzahl,
+# danach Anzahl × Felder float32 (little-endian), Reihenfolge wie WS_FIELDS.
+WS_FIELDS  = ("secs", "roll", "pitch", "yaw", "qx", "qy", "qz", "qw")
+WS_HEADER  = struct.Struct("<2sBBI")
+WS_VERSION = 1
+
+def _pack_batch(rows):
+    """Packt einen Sample-Block als WS_HEADER + float32-Records."""
+    vals = np.column_stack([rows[k] for k in WS_FIELDS]).astype("<f4")
+    return WS_HEADER.pack(b"NB", WS_VERSION, len(WS_FIELDS), len(rows)) + vals.tobytes()
+
+if sock:
+    def ws_stream(ws, sid=None):
+        """
+        WebSocket-Stream: alle 'ms' Millisekunden (Query, Standard 100) ein
+        Binär-Batch aller neuen Samples. Zuerst kommt ein Schema-Header als
+        JSON-Text, Status-Meldungen ebenfalls als JSON-Text.
+        /sensors/<sid>/ws liefert den Sensor sid, /ws den Standard-Sensor.
+        """
+        interval = min(max(request.args.get("ms", 100, type=float), 10.0), 5000.0) / 1000.0
+        ws.send(json.dumps({"schema": {
+            "magic": "NB", "version": WS_VERSION, "header": WS_HEADER.format,
+            "dtype": "<f4", "fields": list(WS_FIELDS)}}))
+        if sid is not None and sid not in sensors:
+            ws.send(json.dumps({"error": f"unbekannter Sensor '{sid}'"}))
+            return
+        sensor = sensors.get(sid)
+        sub = hub.subscribe()
+        cursor = sensor.ring.head
+        clients = STREAM_CLIENTS.labels("ws")
+        clients.inc()
+        try:
+            while True:
+                time.sleep(interval)
+                for data in _own_events(sub, sensor):
+                    ws.send(json.dumps(data))
+                rows, cursor, _ = sensor.ring.read(cursor)
+                if len(rows):
+                    ws.send(_pack_batch(rows))
+                    sensor.processor.timing.consumed("ws", cursor)
+        finally:
+            clients.dec()
+            hub.unsubscribe(sub)
+
+    sock.route("/ws")(ws_stream)
+    sock.route("/sensors/<sid>/ws", endpoint="ws_sensor_stream")(ws_stream)
 
 
 @app.route("/")
@@ -33,28 +324,280 @@ def index():
     """Hauptseite mit WebSocket/SSE-Client."""
     return render_template("index.html")
 
+# Alle Sensor-Routen gibt es ohne ID (Standard-Sensor, wie bisher) und als
+# /api/sensors/<sid>/… bzw. /sensors/<sid>/… für einen bestimmten Sensor.
+
+@app.route("/api/sensors")
+def api_sensors():
+    """Alle Sensoren mit Quelle, Sample-Zähler, Raten und festem Speicher."""
+    out = sensors.info()
+    for info in out:
+        info["recording"] = _recording_info(sensors.get(info["id"]))
+    return jsonify({"sensors": out, "default": sensors.get().id})
+
+@app.route("/api/timing")
+@app.route("/api/sensors/<sid>/timing")
+def api_timing(sid=None):
+    """
+    Zeitmessung aus Sensor- und Host-Zeit (timing.StreamTiming): Board-Rate,
+    Abstands-Histogramme, Lücken/Verluste, Drift und Latenzen bis zum Reader
+    bzw. bis zur Auslieferung (sse, ws, gui).
+    """
+    sensor = _sensor(sid)
+    p = sensor.processor
+    return jsonify({"sensor": sensor.id, "rate": p.rate_hz, "srate": p.srate_hz,
+                    **p.timing.snapshot()})
+
+@app.route("/metrics")
+def metrics():
+    """Kennzahlen im Prometheus-Textformat (Queues, Parsen, Verarbeitung, Kalibrierung, SSE)."""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+@app.route("/api/profile")
+def api_profile():
+    """Bisher gezählte Stacks im collapsed-Format (flamegraph.pl, speedscope)."""
+    return Response(profiler.folded(), mimetype="text/plain",
+                    headers={"Content-Disposition": "attachment; filename=nicla.folded"})
+
+@app.route("/api/profile/start", methods=["POST"])
+def api_profile_start():
+    """Startet den Profiler; Body optional {"interval_ms": 5 (1…1000), "reset": true}."""
+    body = request.get_json(silent=True) or {}
+    if body.get("reset"):
+        profiler.reset()
+    interval = body.get("interval_ms")
+    if interval is not None:
+        try:
+            interval = float(interval)
+        except (TypeError, ValueError):
+            interval = 0.0
+        if not 1 <= interval <= 1000:
+            return jsonify({"error": "interval_ms muss zwischen 1 und 1000 liegen"}), 400
+    profiler.start(interval / 1000.0 if interval else None)
+    return jsonify(profiler.info())
+
+@app.route("/api/profile/stop", methods=["POST"])
+def api_profile_stop():
+    profiler.stop()
+    return jsonify(profiler.info())
+
 @app.route("/api/swing", methods=["POST"])
-def api_swing():
+@app.route("/api/sensors/<sid>/swing", methods=["POST"])
+def api_swing(sid=None):
+    sensor = _sensor(sid)
     dur = float(request.json.get("duration", 10.0))
-    sc.swing_calib(dur)
-    return jsonify({"result":"swing started", "duration":dur})
+    sensor.core.swing_calib(dur)
+    return jsonify({"result":"swing started", "duration":dur, "sensor":sensor.id})
 
 @app.route("/api/confirm", methods=["POST"])
-def api_confirm():
+@app.route("/api/sensors/<sid>/confirm", methods=["POST"])
+def api_confirm(sid=None):
+    sensor = _sensor(sid)
     dur = float(request.json.get("duration", 0.5))
-    sc.confirm_baseline(dur)
-    return jsonify({"result":"confirm baseline", "duration":dur})
+    sensor.core.confirm_baseline(dur)
+    return jsonify({"result":"confirm baseline", "duration":dur, "sensor":sensor.id})
 
 @app.route("/api/null", methods=["POST"])
-def api_null():
+@app.route("/api/sensors/<sid>/null", methods=["POST"])
+def api_null(sid=None):
+    sensor = _sensor(sid)
     dur = float(request.json.get("duration", 0.5))
-    sc.null_calib(dur)
-    return jsonify({"result":"nullpoint calib", "duration":dur})
+    sensor.core.null_calib(dur)
+    return jsonify({"result":"nullpoint calib", "duration":dur, "sensor":sensor.id})
+
+@app.route("/api/analysis")
+@app.route("/api/sensors/<sid>/analysis")
+def api_analysis(sid=None):
+    """Aktuelle Kennwerte der Schwinganalyse (Periode, Frequenz, Dämpfung …)."""
+    return jsonify(_sensor(sid).analyzer.result())
+
+@app.route("/api/analysis/reset", methods=["POST"])
+@app.route("/api/sensors/<sid>/analysis/reset", methods=["POST"])
+def api_analysis_reset(sid=None):
+    _sensor(sid).analyzer.reset()
+    return jsonify({"result": "analysis reset"})
+
+@app.route("/analysis/stream")
+@app.route("/sensors/<sid>/analysis/stream")
+def analysis_sse(sid=None):
+    """SSE mit den Analyse-Kennwerten; hz (Standard 2) begrenzt die Event-Rate."""
+    sensor = _sensor(sid)
+    hz = request.args.get("hz", 2.0, type=float)
+    if not 0 < hz <= 20:
+        return jsonify({"error": "hz muss zwischen 0 und 20 liegen"}), 400
+    return Response(analysis_stream(hz, sensor.analyzer), mimetype="text/event-stream")
 
 @app.route("/stream")
-def stream():
-    """Server-Sent Events Endpoint."""
-    return Response(event_stream(), mimetype="text/event-stream")
+@app.route("/sensors/<sid>/stream")
+def stream(sid=None):
+    """
+    Server-Sent Events Endpoint (Standard-Sensor bzw. Sensor sid).
+    Optionale Query-Parameter:
+      hz=10             → max. 10 Events/s (neuestes Sample je Intervall)
+      agg=stats         → statt neuestem Sample min/max/mean je Intervall
+                          (hz mindestens Sample-Rate / halbe Ringgröße, sonst 400)
+      fields=roll,pitch → nur diese Schlüssel serialisieren
+    """
+    hz = request.args.get("hz", type=float)
+    if hz is not None and not 0 < hz <= 100:
+        return jsonify({"error": "hz muss zwischen 0 und 100 liegen"}), 400
+    agg = request.args.get("agg", "last")
+    if agg not in ("last", "stats"):
+        return jsonify({"error": "agg muss 'last' oder 'stats' sein"}), 400
+    fields = [f for f in request.args.get("fields", "").split(",") if f] or None
+    sensor = _sensor(sid)
+    if hz and agg == "stats":
+        # längere Intervalle als der Ring fasst: ältere Samples wären schon überschrieben.
+        # Maßgeblich ist, wie schnell der Ring in Host-Zeit voll wird (Replay auch
+        # schneller als das Board); ohne bisherige Samples gibt es keine Grenze,
+        # "dropped" im Event zeigt dann die Lücke
+        rate = sensor.processor.srate_hz or sensor.processor.timing.device_hz
+        hz_min = rate / (sensor.ring.capacity * RING_FILL)
+        if hz < hz_min:
+            return jsonify({"error": f"hz muss bei agg=stats mindestens {hz_min:.3g} sein "
+                                     f"(Ring {sensor.ring.capacity} Samples bei {rate:.0f} Hz)"}), 400
+    sub = hub.subscribe()
+    resp = Response(event_stream(sub, hz, fields, agg, sensor), mimetype="text/event-stream")
+    # Geht der Client vor dem ersten Chunk, läuft das finally des Generators
+    # nie; close() der Antwort kommt dagegen immer (unsubscribe ist idempotent)
+    resp.call_on_close(lambda: hub.unsubscribe(sub))
+    return resp
+
+@app.route("/api/history")
+@app.route("/api/sensors/<sid>/history")
+def api_history(sid=None):
+    """
+    Verlauf aus dem Speicher, spaltenweise.
+      from=-600 / to=    Host-Zeit in s (Unix); Werte <= 0 relativ zu jetzt
+                          (Standard: letzte 60 s bis jetzt)
+      res=raw|1s|1m      Auflösung (Standard: feinste, die 'from' noch abdeckt)
+      fields=roll        nur diese Felder (Standard: roll,pitch,yaw)
+    """
+    history = _sensor(sid).history
+    now = time.time()
+    t_from = request.args.get("from", -60.0, type=float)
+    t_to = request.args.get("to", type=float)
+    if t_from <= 0:
+        t_from += now
+    if t_to is not None and t_to <= 0:
+        t_to += now
+    res = request.args.get("res") or None
+    if res is not None and res not in history.retention:
+        return jsonify({"error": "res muss " + ", ".join(history.retention) + " sein"}), 400
+    fields = [f for f in request.args.get("fields", "").split(",") if f] or None
+    return jsonify(history.query(t_from, t_to, res, fields))
+
+def _record_sensor(sid, body):
+    """Sensor aus der URL bzw. aus "sensor" im Body/Query (Standard-Sensor)."""
+    if sid is None:
+        sid = body.get("sensor") or request.args.get("sensor")
+    return _sensor(sid)
+
+@app.route("/api/record/start", methods=["POST"])
+@app.route("/api/sensors/<sid>/record/start", methods=["POST"])
+def api_record_start(sid=None):
+    """
+    Startet eine Aufnahme auf dem Pi (je Sensor höchstens eine). Optional im JSON-Body:
+      name="x.nrec" (409, falls vorhanden), rotate_mb=50 (neue Teildatei), fsync_s=10,
+      sensor="nord" (nur /api/record/start; Standard: Standard-Sensor)
+    """
+    body = request.get_json(silent=True) or {}
+    sensor = _record_sensor(sid, body)
+    name = body.get("name")
+    if name is not None:
+        name = os.path.basename(str(name))
+        if not name.endswith(".nrec"):
+            name += ".nrec"
+    opts = {}
+    for key in ("rotate_mb", "fsync_s"):
+        v = body.get(key)
+        if v is None:
+            opts[key] = None
+            continue
+        try:
+            v = float(v)
+        except (TypeError, ValueError):
+            v = -1.0
+        if not 0 <= v < float("inf"):
+            return jsonify({"error": f"{key} muss eine Zahl >= 0 sein"}), 400
+        opts[key] = v
+    try:
+        rec = start_recording(name, opts["rotate_mb"], opts["fsync_s"], sensor)
+    except FileExistsError:
+        return jsonify({"error": f"Aufnahme '{name}' existiert bereits"}), 409
+    if rec is None:
+        return jsonify({"error": "Aufnahme läuft bereits", "sensor": sensor.id,
+                        "recording": _recording_info(sensor)}), 409
+    return jsonify({"result": "recording started", "sensor": sensor.id, "recording": rec.info()})
+
+@app.route("/api/record/stop", methods=["POST"])
+@app.route("/api/sensors/<sid>/record/stop", methods=["POST"])
+def api_record_stop(sid=None):
+    sensor = _record_sensor(sid, request.get_json(silent=True) or {})
+    rec = stop_recording(sensor)
+    if rec is None:
+        return jsonify({"error": "keine Aufnahme aktiv", "sensor": sensor.id}), 409
+    return jsonify({"result": "recording stopped", "sensor": sensor.id, "recording": rec.info()})
+
+@app.route("/api/record")
+@app.route("/api/sensors/<sid>/record")
+def api_record_status(sid=None):
+    """Laufende bzw. zuletzt beendete Aufnahme des Sensors."""
+    sensor = _record_sensor(sid, {})
+    return jsonify({"sensor": sensor.id, "recording": _recording_info(sensor)})
+
+@app.route("/api/recordings")
+def api_recordings():
+    """Alle Aufnahmen in RECORD_DIR (rotierte Teile zusammengefasst)."""
+    out = []
+    if os.path.isdir(RECORD_DIR):
+        for name in sorted(os.listdir(RECORD_DIR)):
+            if name.endswith(".nrec") and not session_recording.is_part(name):
+                info = session_recording.recording_info(os.path.join(RECORD_DIR, name))
+                info["active"] = any(r.active and os.path.basename(r.path) == name
+                                     for r in list(recorders.values()))
+                out.append(info)
+    return jsonify({"recordings": out})
+
+@app.route("/api/recordings/<name>")
+def api_recording_download(name):
+    """
+    Download einer Aufnahme: ?format=nrec (Standard, nur diese Datei bzw.
+    dieser Teil) oder ?format=csv (alle Teile, blockweise gestreamt).
+    """
+    path = _recording_path(name)
+    fmt = request.args.get("format", "nrec")
+    if fmt == "csv":
+        csv_name = os.path.splitext(name)[0] + ".csv"
+        return Response(session_recording.iter_csv(path), mimetype="text/csv",
+                        headers={"Content-Disposition": f"attachment; filename={csv_name}"})
+    if fmt != "nrec":
+        return jsonify({"error": "format muss 'nrec' oder 'csv' sein"}), 400
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True)
+
+@app.route("/api/recordings/<name>/summary")
+def api_recording_summary(name):
+    """
+    Zusammenfassung statt Rohdaten: je ?window=1 Sekunden Startzeit t, Anzahl n
+    und min/max/mean von ?field=roll (Spalten als Listen).
+    """
+    path = _recording_path(name)
+    window = request.args.get("window", 1.0, type=float)
+    if not 0.01 <= window <= 3600:
+        return jsonify({"error": "window muss zwischen 0.01 und 3600 s liegen"}), 400
+    field = request.args.get("field", "roll")
+    if field not in [n for n, _ in session_recording.read_header(path)[0]["fields"]]:
+        return jsonify({"error": f"unbekanntes Feld '{field}'"}), 400
+    return jsonify({"name": name, "field": field, "window": window,
+                    **session_recording.summarize(path, window, field)})
+
+@app.route("/api/recordings/<name>/analysis")
+def api_recording_analysis(name):
+    """Schwing-Kennwerte der ganzen Aufnahme (session_analysis); ?swings=1 mit Tabelle."""
+    res = session_analysis.analyze_file(_recording_path(name),
+                                        request.args.get("hysteresis", 1.0, type=float))
+    res["file"] = name
+    return jsonify(session_analysis.to_json(res, request.args.get("swings", type=int) == 1))
 
 if __name__ == "__main__":
     # Flask nur auf 0.0.0.0, damit vom LAN erreichbar
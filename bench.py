@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+# bench.py
+"""
+Benchmark der Pipeline Einlesen → Verarbeiten → Ausliefern, ohne Hardware.
+
+Stufen:
+  parse_readline  bisheriger zeilenweiser CSV-Parser (Referenz)
+  parse_lines     serial_protocol.LineDecoder (CSV blockweise)
+  parse_frames    serial_protocol.FrameDecoder (Binär-Frames)
+  ble_iter_unpack bisheriges ViewerCore._notify-Entpacken, 1 Sample/Notification (Referenz)
+  ble_single      serial_protocol.BleDecoder, 1 Sample/Notification
+  ble_batch       serial_protocol.BleDecoder, Batches à 12 Samples (MTU 247)
+  process         DataProcessor.process (pro Sample, pyquaternion)
+  process_batch   DataProcessor.process_batch (Blöcke)
+  calib_apply     Calibration.apply (pro Sample)
+  calib_collect   Calibration.collect während einer Kalibrierungsphase (pro Sample)
+  calib_collect_block  dasselbe mit N×4-Blöcken wie aus process_batch
+  calib_math_loop_<N>  Schwing-PCA + Mittelung mit pyquaternion-Schleifen (Referenz)
+  calib_math_<N>       dasselbe auf N×4-Arrays (calibration._swing_axis/_quat_avg),
+                       N = 1000, 10000, 100000 (ein Aufruf pro Messung)
+  window_400      SlidingWindow.push, Fenster 400 Samples
+  window_12000    SlidingWindow.push, Fenster 12000 Samples (1 min bei 200 Hz)
+  swing_analyzer  SwingAnalyzer.feed (Blöcke)
+  session_analysis session_analysis.analyze (ganze Sitzung, ein Aufruf)
+  history         SampleHistory.feed (Blöcke, roh + 1-s- und 1-min-Buckets)
+  record_csv      csv.writer mit f-Strings pro Sample (bisherige GUI-Aufnahme)
+  record_nrec     SessionRecorder.write (Spaltenpuffer, Blöcke als .nrec)
+  sensor_add      SensorManager: einen Sensor samt Pipeline anlegen
+                  (Δ Speicher / Aufrufe = Speicher pro zusätzlichem Sensor)
+  sensors_<N>     process_batch + Verlauf für N Sensoren abwechselnd
+                  (Samples insgesamt, N = 1, 4)
+  sse             app.event_stream (Ring → JSON-Events)
+  gui_update      NiclaGUI._update + _render mit Blitting, Agg-Backend (ohne Display)
+  gui_update_draw dasselbe mit komplettem Neuzeichnen pro Frame
+
+Eingabe ist ein synthetisches Schwingsignal oder eine .nraw-Aufzeichnung
+(--replay). Ergebnis: Durchsatz, Latenz-Perzentile pro Aufruf und
+Speicherzuwachs (tracemalloc) je Stufe als JSON, z. B.
+    python bench.py --samples 20000 --out bench_results/
+    python bench.py --compare alt.json neu.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+import serial_protocol
+from data_processor import DataProcessor
+from timing import StreamTiming
+import metrics
+from sample_ring import SampleRing, SAMPLE_DTYPE
+from window_stats import SlidingWindow
+from swing_analysis import SwingAnalyzer
+from session_recording import SessionRecorder
+from history import SampleHistory
+from sensor_manager import SensorManager
+import session_analysis
+import calibration
+from pyquaternion import Quaternion
+
+
+# ---------------------------------------------------------------------------
+# Eingangsdaten
+# ---------------------------------------------------------------------------
+
+def synthetic_stream(n: int, rate_hz: float = 50.0, seed: int = 0):
+    """
+    Gedämpfte Glockenschwingung um eine leicht schräge Achse plus Rauschen.
+    Rückgabe: ms (N), quat (N×4, qx,qy,qz,qw) wie vom Sensor.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / rate_hz
+    angle = np.radians(60.0) * np.exp(-t / 600.0) * np.sin(2 * np.pi * t / 1.8)
+    axis = np.array([0.98, 0.15, 0.1])
+    axis /= np.linalg.norm(axis)
+    q = np.column_stack((np.outer(np.sin(angle / 2), axis), np.cos(angle / 2)))
+    q += rng.normal(scale=1e-3, size=q.shape)
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    return np.round(t * 1000.0), q
+
+
+def load_stream(path: str):
+    from raw_recording import load_raw
+    rec = load_raw(path)
+    return rec["ms"].astype(float), rec["q"].astype(float)
+
+
+def csv_bytes(ms, quat) -> bytes:
+    return b"".join(b"%d,%.6f,%.6f,%.6f,%.6f\r\n" % (m, *q) for m, q in zip(ms, quat))
+
+
+def frame_bytes(ms, quat) -> bytes:
+    return b"".join(serial_protocol.encode_frame(int(m), *q) for m, q in zip(ms, quat))
+
+
+# ---------------------------------------------------------------------------
+# Messung
+# ---------------------------------------------------------------------------
+
+def _measure(calls, samples: int) -> dict:
+    """
+    calls: Liste parameterloser Funktionen (ein Aufruf = ein Messpunkt).
+    Liefert Durchsatz und Perzentile der Aufrufdauer in Mikrosekunden.
+    """
+    dur = np.empty(len(calls))
+    t0 = time.perf_counter()
+    for i, fn in enumerate(calls):
+        c0 = time.perf_counter_ns()
+        fn()
+        dur[i] = time.perf_counter_ns() - c0
+    wall = time.perf_counter() - t0
+    dur /= 1e3
+    return {
+        "samples":          samples,
+        "calls":            len(calls),
+        "samples_per_call": samples / max(len(calls), 1),
+        "wall_s":           wall,
+        "samples_per_s":    samples / wall if wall > 0 else 0.0,
+        "us_per_sample":    wall * 1e6 / samples if samples else 0.0,
+        "call_us": {
+            "p50": float(np.percentile(dur, 50)),
+            "p95": float(np.percentile(dur, 95)),
+            "p99": float(np.percentile(dur, 99)),
+            "max": float(dur.max()),
+        },
+    }
+
+
+def _memory(make_calls) -> dict:
+    """Speicherzuwachs eines zweiten Durchlaufs unter tracemalloc."""
+    calls = make_calls()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for fn in calls:
+        fn()
+    cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"growth_kb": (cur - base) / 1024, "peak_kb": (peak - base) / 1024}
+
+
+def run_stage(make_calls, samples: int, memory: bool = True) -> dict:
+    res = _measure(make_calls(), samples)
+    if memory:
+        res["memory"] = _memory(make_calls)
+    return res
+
+
+# ---------------------------------------------------------------------------
+# Stufen
+# ---------------------------------------------------------------------------
+
+def _chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def stage_parse(ms, quat, chunk: int):
+    csv_data, bin_data = csv_bytes(ms, quat), frame_bytes(ms, quat)
+
+    def readline():
+        return [lambda: serial_protocol._bench_readline(csv_data)]
+
+    def lines():
+        dec = serial_protocol.LineDecoder()
+        return [lambda c=c: dec.feed(c) for c in _chunks(csv_data, chunk)]
+
+    def frames():
+        dec = serial_protocol.FrameDecoder()
+        return [lambda c=c: dec.feed(c) for c in _chunks(bin_data, chunk)]
+
+    single = [struct.pack(serial_protocol.PAYLOAD_FMT, int(t), *q) for t, q in zip(ms, quat)]
+    per = serial_protocol.batch_capacity(247)
+    batches = [serial_protocol.encode_batch(k, ms[i:i + per], quat[i:i + per])
+               for k, i in enumerate(range(0, len(ms), per))]
+
+    def iter_unpack():
+        return [lambda d=d: np.array(list(struct.iter_unpack(serial_protocol.PAYLOAD_FMT, d)))
+                for d in single]
+
+    def ble(packets):
+        dec = serial_protocol.BleDecoder()
+        return lambda: [lambda d=d: dec.feed(d) for d in packets]
+
+    n = len(ms)
+    return {"parse_readline":  run_stage(readline, n),
+            "parse_lines":     run_stage(lines, n),
+            "parse_frames":    run_stage(frames, n),
+            "ble_iter_unpack": run_stage(iter_unpack, n),
+            "ble_single":      run_stage(ble(single), n),
+            "ble_batch":       run_stage(ble(batches), n)}
+
+
+def stage_process(ms, quat, block: int):
+    def single():
+        p = DataProcessor(None, SampleRing())
+        return [lambda i=i: p.process(ms[i], *quat[i]) for i in range(len(ms))]
+
+    def batch():
+        p = DataProcessor(None, SampleRing())
+        return [lambda i=i: p.process_batch(ms[i:i + block], quat[i:i + block])
+                for i in range(0, len(ms), block)]
+
+    def timing(size):
+        t = StreamTiming()
+        return lambda: [lambda i=i: t.feed(ms[i:i + size], i + size)
+                        for i in range(0, len(ms), size)]
+
+    def observe():
+        h = metrics.Histogram("bench_seconds", "bench")   # eigene, nicht im REGISTRY
+        return [lambda i=i: h.observe(1e-4) for i in range(len(ms))]
+
+    n = len(ms)
+    return {"process": run_stage(single, n), "process_batch": run_stage(batch, n),
+            # Anteil der Zeitmessung an process bzw. process_batch
+            "timing_feed_1": run_stage(timing(1), n),
+            "timing_feed": run_stage(timing(block), n),
+            # eine Histogramm-Beobachtung (/metrics) je Aufruf
+            "metrics_observe": run_stage(observe, n, memory=False)}
+
+
+def stage_calibration(ms, quat, block: int):
+    qs = [Quaternion(w=q[3], x=q[0], y=q[1], z=q[2]) for q in quat]
+    Q = quat[:, [3, 0, 1, 2]].astype(float)
+
+    def apply():
+        p = DataProcessor(None)
+        return [lambda q=q: p.calib.apply(q) for q in qs]
+
+    def collect():
+        p = DataProcessor(None)
+        p.calib.start_nullpoint(3600.0)   # Phase bleibt während der Messung aktiv
+        return [lambda i=i: p.calib.collect(qs[i], ms[i] / 1000.0) for i in range(len(qs))]
+
+    def collect_block():
+        p = DataProcessor(None)
+        p.calib.start_nullpoint(3600.0)
+        return [lambda i=i: p.calib.collect(Q[i:i + block], ms[i:i + block] / 1000.0)
+                for i in range(0, len(Q), block)]
+
+    n = len(qs)
+    res = {"calib_apply": run_stage(apply, n), "calib_collect": run_stage(collect, n),
+           "calib_collect_block": run_stage(collect_block, n)}
+
+    base = Quaternion(axis=[1.0, 0.0, 0.0], angle=0.1)
+    for size in CALIB_MATH_SIZES:
+        Q = np.resize(quat[:, [3, 0, 1, 2]].astype(float), (size, 4))
+        big = [Quaternion(q) for q in Q]
+        res[f"calib_math_loop_{size}"] = run_stage(
+            lambda: [lambda: _calib_math_loop(big, base)], size, memory=False)
+        res[f"calib_math_{size}"] = run_stage(
+            lambda: [lambda: _calib_math(Q, base)], size)
+    return res
+
+
+CALIB_MATH_SIZES = (1000, 10000, 100000)
+
+
+def _calib_math_loop(qs, base):
+    """Bisherige Schwing-PCA und Mittelung mit pyquaternion pro Sample (Referenz)."""
+    corrected = [base * q for q in qs]
+    omegas = []
+    for a, b in zip(corrected, corrected[1:]):
+        dq  = b * a.inverse
+        v   = np.array(dq.vector)
+        ang = 2 * np.arctan2(np.linalg.norm(v), dq.w)
+        if np.linalg.norm(v) > 1e-6:
+            omegas.append((v / np.linalg.norm(v)) * ang)
+    _, _, vt = np.linalg.svd(np.vstack(omegas), full_matrices=False)
+    M = sum(np.outer(q.elements, q.elements) for q in corrected) / len(corrected)
+    return vt[0], np.linalg.eigh(M)
+
+
+def _calib_math(Q, base):
+    corrected = calibration._left_apply(base, Q)
+    return calibration._swing_axis(corrected), calibration._quat_avg(corrected)
+
+
+def stage_window(ms, quat):
+    """Gleitendes Min/Max/Mittel/Varianz pro Sample für zwei Fenstergrößen."""
+    secs = (ms / 1000.0).tolist()
+    vals = (np.degrees(quat[:, 0]) * 2).tolist()
+
+    def make(maxlen):
+        def calls():
+            w = SlidingWindow(maxlen=maxlen)
+            return [lambda t=t, v=v: w.push(t, v) for t, v in zip(secs, vals)]
+        return calls
+
+    def analyzer():
+        a = SwingAnalyzer()
+        return [lambda i=i: a.feed(secs[i:i + 64], vals[i:i + 64])
+                for i in range(0, len(secs), 64)]
+
+    def history():
+        h, rows = SampleHistory(), np.zeros(len(secs), dtype=SAMPLE_DTYPE)
+        rows["secs"], rows["roll"] = secs, vals
+        t0 = time.time()
+        return [lambda i=i: h.feed(rows[i:i + 64], now=t0 + secs[min(i + 63, len(secs) - 1)])
+                for i in range(0, len(secs), 64)]
+
+    def offline():
+        t, v = np.array(secs), np.array(vals)
+        return [lambda: session_analysis.analyze(t, v)]
+
+    n = len(secs)
+    return {"window_400": run_stage(make(400), n),
+            "window_12000": run_stage(make(12000), n),
+            "swing_analyzer": run_stage(analyzer, n),
+            "history": run_stage(history, n),
+            "session_analysis": run_stage(offline, n)}
+
+
+def stage_record(ms, quat, block: int):
+    """Aufzeichnung: bisherige CSV-Formatierung gegen SessionRecorder.write."""
+    import csv
+    p = DataProcessor(None, SampleRing(max(4096, len(ms))))
+    blocks = [p.process_batch(ms[i:i + block], quat[i:i + block])
+              for i in range(0, len(ms), block)]
+    tmp = tempfile.mkdtemp()
+
+    def old():
+        wr = csv.writer(open(os.path.join(tmp, "x.csv"), "w", newline=""))
+        return [lambda b=b: wr.writerows([
+            f"{r['secs']:.4f}", f"{r['roll']:.2f}", f"{r['pitch']:.2f}", f"{r['yaw']:.2f}",
+            f"{r['qx']:.6f}", f"{r['qy']:.6f}", f"{r['qz']:.6f}", f"{r['qw']:.6f}"]
+            for r in b) for b in blocks]
+
+    def new():
+        rec = SessionRecorder(os.path.join(tmp, "x.nrec"), fsync_s=None, overwrite=True)
+        return [lambda b=b: rec.write(b) for b in blocks]
+
+    n = len(ms)
+    return {"record_csv": run_stage(old, n), "record_nrec": run_stage(new, n)}
+
+
+SENSOR_COUNTS = (1, 4)
+
+
+def stage_sensors(ms, quat, block: int, adds: int = 8):
+    """Zusatzkosten je Sensor: fester Speicher beim Anlegen, Durchsatz bei N Sensoren."""
+    def add():
+        mgr = SensorManager()
+        def one():
+            s = mgr.add_serial(f"s{len(mgr)}", "/dev/null")
+            s.history = SampleHistory()
+        return [one] * adds
+
+    res = {"sensor_add": run_stage(add, adds)}
+    for count in SENSOR_COUNTS:
+        def calls():
+            mgr = SensorManager()
+            for k in range(count):
+                mgr.add_serial(f"s{k}", "/dev/null").history = SampleHistory()
+            out = []
+            for i in range(0, len(ms), block):
+                for s in mgr:
+                    out.append(lambda s=s, i=i: s.history.feed(
+                        s.processor.process_batch(ms[i:i + block], quat[i:i + block])))
+            return out
+        res[f"sensors_{count}"] = run_stage(calls, len(ms) * count)
+    return res
+
+
+def _import_app():
+    """app.py ohne seriellen Port importieren (leere Replay-Aufzeichnung)."""
+    if "app" not in sys.modules:
+        from raw_recording import RawRecorder
+        path = os.path.join(tempfile.mkdtemp(), "leer.nraw")
+        RawRecorder(path).close()
+        os.environ["NICLA_REPLAY"] = path
+        os.environ.pop("NICLA_RAW_LOG", None)
+    import app
+    app.sc.disconnect()
+    return app
+
+
+def stage_sse(ms, quat, block: int):
+    app = _import_app()
+    ring = app.sc.ring
+
+    def make(fields):
+        def calls():
+            sub = app.hub.subscribe()
+            gen = app.event_stream(sub, hz=None, fields=fields)
+            # erstes Event (Status) startet den Generator, Cursor = leerer Ring
+            app.hub.put({"status": "bench"})
+            next(gen)
+            p = DataProcessor(None, ring)
+            out = []
+            for i in range(0, len(ms), block):
+                rows = p.process_batch(ms[i:i + block], quat[i:i + block])
+                # gemessen wird nur die Serialisierung: ein next() pro Event
+                out.append(lambda k=len(rows): [next(gen) for _ in range(k)])
+            return out
+        return calls
+
+    n = len(ms)
+    saved = ring.capacity
+    res = {}
+    try:
+        # Ring groß genug, damit kein Sample vor dem Lesen überschrieben wird
+        app.sc.ring = ring = SampleRing(max(saved, n + block))
+        res["sse_all_fields"] = run_stage(make(None), n, memory=False)
+        app.sc.ring = ring = SampleRing(max(saved, n + block))
+        res["sse_angles"] = run_stage(make(["secs", "roll", "pitch", "yaw"]), n, memory=False)
+    finally:
+        app.sc.ring = SampleRing(saved)
+    return res
+
+
+def stage_gui(ms, quat, block: int):
+    """NiclaGUI._update + _render auf einem Ersatzobjekt mit Agg-Canvas."""
+    try:
+        import gui
+    except Exception as e:   # tkinter/bleak fehlen → Stufe überspringen
+        return {"gui_update": {"skipped": str(e)}}
+    import collections, types
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from plot_renderer import PlotRenderer, AxisLimits, ScrollLimits
+    from window_stats import SlidingWindow
+
+    class _Var:
+        def set(self, v):
+            self.v = v
+
+    class _Text:
+        def configure(self, **kw): pass
+        def delete(self, *a): pass
+        def insert(self, i, text): self.text = text
+
+    def make_view(blit):
+        v = types.SimpleNamespace()
+        fig = Figure(figsize=(9.6, 6.4))
+        gs = fig.add_gridspec(2, 1, height_ratios=[3, 1])
+        ax3 = fig.add_subplot(gs[0], projection="3d")
+        v.ax_lines = [ax3.plot([0, 1], [0, 0], [0, 0])[0] for _ in range(3)]
+        v.ax2 = fig.add_subplot(gs[1])
+        v.line2d, = v.ax2.plot([], [])
+        v.canvas = FigureCanvasAgg(fig)
+        v.canvas.draw_idle = v.canvas.draw   # Agg: sofort zeichnen
+        v.renderer = PlotRenderer(v.canvas, v.ax_lines + [v.line2d], blit=blit)
+        v.canvas.draw()
+        v._xlim, v._ylim = ScrollLimits(), AxisLimits()
+        v.var = collections.defaultdict(_Var)
+        v.win, v.stats_win = SlidingWindow(maxlen=400), SlidingWindow(span=60.0)
+        v.buf_t, v.buf_rl = v.win.t, v.win.v
+        v.analyzing, v.analyzer, v._ana_version = True, SwingAnalyzer(), -1
+        v.txt_ana = _Text()
+        v._compute_and_show_analysis = lambda: gui.NiclaGUI._compute_and_show_analysis(v)
+        return v
+
+    def frame(v, rows):
+        gui.NiclaGUI._update(v, rows)
+        gui.NiclaGUI._render(v)
+
+    def calls(blit):
+        v, ring = make_view(blit), SampleRing(max(4096, len(ms)))
+        p = DataProcessor(None, ring)
+        blocks = [p.process_batch(ms[i:i + block], quat[i:i + block])
+                  for i in range(0, len(ms), block)]
+        return [lambda b=b: frame(v, b) for b in blocks]
+
+    return {"gui_update":      run_stage(lambda: calls(True), len(ms)),
+            "gui_update_draw": run_stage(lambda: calls(False), len(ms))}
+
+
+STAGES = ("parse", "process", "calibration", "window", "record", "sensors", "sse", "gui")
+
+
+# ---------------------------------------------------------------------------
+# Ergebnisse
+# ---------------------------------------------------------------------------
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+                              ).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def run(samples: int, stages=STAGES, replay: str = None, block: int = 64,
+        chunk: int = 4096, gui_samples: int = 400) -> dict:
+    ms, quat = load_stream(replay) if replay else synthetic_stream(samples)
+    ms, quat = ms[:samples], quat[:samples]
+    results = {}
+    if "parse" in stages:
+        results.update(stage_parse(ms, quat, chunk))
+    if "process" in stages:
+        results.update(stage_process(ms, quat, block))
+    if "calibration" in stages:
+        results.update(stage_calibration(ms, quat, block))
+    if "window" in stages:
+        results.update(stage_window(ms, quat))
+    if "record" in stages:
+        results.update(stage_record(ms, quat, block))
+    if "sensors" in stages:
+        results.update(stage_sensors(ms, quat, block))
+    if "sse" in stages:
+        results.update(stage_sse(ms, quat, block))
+    if "gui" in stages:
+        # Zeichnen ist teuer → kleinere Stichprobe, Blöcke wie ein 40-ms-Poll
+        results.update(stage_gui(ms[:gui_samples], quat[:gui_samples], 2))
+    return {
+        "meta": {
+            "commit":    _git_rev(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python":    platform.python_version(),
+            "numpy":     np.__version__,
+            "machine":   platform.machine(),
+            "platform":  platform.platform(),
+            "samples":   int(len(ms)),
+            "source":    replay or "synthetic",
+            "block":     block,
+            "chunk":     chunk,
+        },
+        "stages": results,
+    }
+
+
+def compare(old: dict, new: dict) -> str:
+    lines = [f"{'Stufe':<24}{'alt Samples/s':>16}{'neu Samples/s':>16}{'Faktor':>9}",
+             f"{'':<16}{old['meta']['commit']:>16}{new['meta']['commit']:>16}"]
+    for name, res in new["stages"].items():
+        a = old["stages"].get(name, {}).get("samples_per_s")
+        b = res.get("samples_per_s")
+        if a and b:
+            lines.append(f"{name:<24}{a:>16.0f}{b:>16.0f}{b / a:>8.2f}×")
+    return "\n".join(lines)
+
+
+def _summary(result: dict) -> str:
+    lines = [f"{'Stufe':<24}{'Samples/s':>12}{'µs/Sample':>11}{'p50 µs':>10}"
+             f"{'p99 µs':>10}{'Δ Speicher kB':>15}"]
+    for name, r in result["stages"].items():
+        if "skipped" in r:
+            lines.append(f"{name:<24}übersprungen: {r['skipped']}")
+            continue
+        mem = r.get("memory", {}).get("growth_kb")
+        lines.append(f"{name:<24}{r['samples_per_s']:>12.0f}{r['us_per_sample']:>11.2f}"
+                     f"{r['call_us']['p50']:>10.1f}{r['call_us']['p99']:>10.1f}"
+                     f"{'' if mem is None else format(mem, '.1f'):>15}")
+    return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark der Nicla-Pipeline (ohne Hardware)")
+    ap.add_argument("--samples", type=int, default=20000)
+    ap.add_argument("--stages", default=",".join(STAGES),
+                    help="Kommagetrennt aus: " + ", ".join(STAGES))
+    ap.add_argument("--replay", help=".nraw-Aufzeichnung statt synthetischer Daten")
+    ap.add_argument("--block", type=int, default=64, help="Blockgröße für process_batch")
+    ap.add_argument("--chunk", type=int, default=4096, help="Bytes pro Decoder-Aufruf")
+    ap.add_argument("--out", help="JSON-Datei oder Verzeichnis für das Ergebnis")
+    ap.add_argument("--compare", nargs=2, metavar=("ALT", "NEU"),
+                    help="zwei Ergebnis-Dateien vergleichen")
+    args = ap.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            print(compare(json.load(f_old), json.load(f_new)))
+        return
+
+    result = run(args.samples, args.stages.split(","), args.replay, args.block, args.chunk)
+    print(_summary(result))
+    if args.out:
+        path = args.out
+        if os.path.isdir(path) or path.endswith(os.sep):
+            os.makedirs(path, exist_ok=True)
+            path = os.path.join(path, f"{result['meta']['timestamp'].replace(':', '-')}"
+                                      f"_{result['meta']['commit']}.json")
+        with open(path, "w") as f:
+            json.dump(result, f, indent=2)
+        print("gespeichert:", path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# broadcast.py
+"""
+Broadcast-Hub zwischen SerialCore/DataProcessor und den SSE-Clients.
+
+Jeder Client bekommt eine eigene Subscription mit begrenztem Ringpuffer
+(älteste Samples fliegen raus, wenn der Client nicht nachkommt). Status-
+Meldungen landen in einem separaten kleinen Puffer und erreichen so jeden
+Client, auch wenn sein Datenpuffer überläuft. Ohne Clients wird nichts
+gespeichert.
+"""
+
+import collections
+import threading
+
+
+class Subscription:
+    """Empfangspuffer eines einzelnen Clients."""
+
+    def __init__(self, maxlen: int = 256, status_maxlen: int = 64):
+        self.data    = collections.deque(maxlen=maxlen)
+        self.status  = collections.deque(maxlen=status_maxlen)
+        self.dropped = 0   # verworfene Samples (Client zu langsam)
+        self._event  = threading.Event()
+
+    def _push(self, item: dict, is_status: bool):
+        buf = self.status if is_status else self.data
+        if len(buf) == buf.maxlen:
+            self.dropped += 1
+        buf.append(item)
+        self._event.set()
+
+    def get(self, timeout: float = None):
+        """
+        Nächstes Element (Status-Meldungen zuerst) oder None nach timeout.
+        """
+        while True:
+            if self.status:
+                return self.status.popleft()
+            if self.data:
+                return self.data.popleft()
+            self._event.clear()
+            if self.status or self.data:
+                continue
+            if not self._event.wait(timeout):
+                return None
+
+    def drain(self) -> list:
+        """Alle anstehenden Elemente auf einmal (Status-Meldungen zuerst)."""
+        items = []
+        while self.status:
+            items.append(self.status.popleft())
+        while self.data:
+            items.append(self.data.popleft())
+        return items
+
+
+class BroadcastHub:
+    """
+    Verteilt jedes Element an alle Subscriptions.
+    put() hat dieselbe Signatur wie queue.Queue.put, der Hub kann also direkt
+    als Queue von SerialCore/DataProcessor verwendet werden.
+    """
+
+    def __init__(self, maxlen: int = 256, status_maxlen: int = 64):
+        self.maxlen        = maxlen
+        self.status_maxlen = status_maxlen
+        self._lock = threading.Lock()
+        self._subs = ()   # copy-on-write, put() liest ohne Lock
+
+    def subscribe(self) -> Subscription:
+        sub = Subscription(self.maxlen, self.status_maxlen)
+        with self._lock:
+            self._subs = self._subs + (sub,)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subs = tuple(s for s in self._subs if s is not sub)
+
+    @property
+    def clients(self) -> int:
+        return len(self._subs)
+
+    @property
+    def pending(self) -> int:
+        """Noch nicht abgeholte Elemente über alle Subscriptions."""
+        return sum(len(s.data) + len(s.status) for s in self._subs)
+
+    def put(self, item: dict, block: bool = True, timeout: float = None):
+        # alles ohne Zeitstempel (Status, dominante Achse, …) ist ein Event
+        is_status = "secs" not in item
+        for sub in self._subs:
+            sub._push(item, is_status)
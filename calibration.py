@@ -4,16 +4,51 @@ import threading
 import time
 import numpy as np
 from pyquaternion import Quaternion
+from metrics import REGISTRY
+from quat_math import (quat_inverse, quat_left_matrix, quat_mul, quat_normalise,
+                       quat_yaw_pitch_roll)
 
-def _quat_avg(qs: list[Quaternion]) -> Quaternion:
+def _as_array(qs) -> np.ndarray:
+    """Liste von Quaternion-Objekten oder N×4-Array → N×4-Array (w,x,y,z)."""
+    if isinstance(qs, np.ndarray):
+        return qs.reshape(-1, 4).astype(float, copy=False)
+    return np.array([q.elements for q in qs], dtype=float).reshape(-1, 4)
+
+def _quat_avg(qs) -> Quaternion:
     """
-    Mittelt eine Liste von Quaternionen über ihren Outer-Product,
+    Mittelt Quaternionen über die Summe ihrer Outer-Products (Q.T @ Q),
     liefert die normalisierte Hauptkomponente zurück.
     """
-    M = sum(np.outer(q.elements, q.elements) for q in qs) / len(qs)
+    Q = _as_array(qs)
+    M = Q.T @ Q / len(Q)
     vals, vecs = np.linalg.eigh(M)
     return Quaternion(vecs[:, vals.argmax()]).normalised
 
+def _rotation_vectors(Q: np.ndarray) -> np.ndarray:
+    """
+    Rotationsvektoren ω = v/‖v‖ · 2·arctan2(‖v‖, w) der Relativdrehungen
+    Δq = q[i+1] * q[i]⁻¹ aufeinanderfolgender Quaternionen (N×4 → M×3).
+    Paare ohne messbare Drehung (‖v‖ ≤ 1e-6) entfallen.
+    """
+    dq = quat_mul(Q[1:], quat_inverse(Q[:-1]))
+    v = dq[:, 1:]
+    n = np.linalg.norm(v, axis=1)
+    keep = n > 1e-6
+    ang = 2 * np.arctan2(n[keep], dq[keep, 0])
+    return v[keep] * (ang / n[keep])[:, None]
+
+def _swing_axis(Q: np.ndarray) -> np.ndarray:
+    """Dominante Schwingachse: erster Singulärvektor der Rotationsvektoren."""
+    omegas = _rotation_vectors(Q)
+    if not len(omegas):
+        return np.array([1.0, 0.0, 0.0])
+    _, _, vt = np.linalg.svd(omegas, full_matrices=False)
+    return vt[0]
+
+def _left_apply(q: Quaternion, Q: np.ndarray) -> np.ndarray:
+    """q * Q[i] für alle Zeilen (N×4) als eine Matrixmultiplikation."""
+    return Q @ quat_left_matrix(q.q).T
+
 def _quat_between(v0: np.ndarray, v1: np.ndarray) -> Quaternion:
     """
     Erzeugt die kürzeste Rotation, die Vektor v0 auf v1 abbildet.
@@ -30,32 +65,167 @@ def _quat_between(v0: np.ndarray, v1: np.ndarray) -> Quaternion:
     axis = np.cross(v0, v1)
     return Quaternion(1 + d, *axis).normalised
 
+DEFAULT_RATE_HZ = 100.0   # Annahme für die Puffergröße, solange srate_hz noch 0 ist
+MIN_SAMPLES     = 2       # eine Phase endet frühestens nach so vielen Samples
+MAX_GAP_S       = 1.0     # längere Lücken im Sensor-Takt zählen nur so viel
+
+# Host-Zeit je Phase (erstes Sample bis fertig) und Dauer der Auswertung
+PHASE_S  = REGISTRY.histogram("nicla_calibration_phase_seconds",
+                              "Dauer einer Kalibrierungsphase in Host-Zeit", ("phase",))
+FINISH_S = REGISTRY.histogram("nicla_calibration_finish_seconds",
+                              "Auswertung einer Kalibrierungsphase (_finish_*)", ("phase",))
+ABORTED  = REGISTRY.counter("nicla_calibration_aborted_total",
+                            "Abgebrochene bzw. ersetzte Kalibrierungen")
+
+class _QuatBuffer:
+    """
+    Wachsender N×4-Puffer (w,x,y,z) für die Samples einer Kalibrierungsphase.
+    Die Kapazität wird vorab aus Dauer × Samplerate bestimmt; reicht sie
+    nicht, verdoppelt append() den Speicher.
+    """
+
+    def __init__(self, capacity: int = 0):
+        self._buf = np.empty((max(int(capacity), 16), 4))
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def append(self, Q):
+        Q = np.asarray(Q, dtype=float).reshape(-1, 4)
+        end = self.n + len(Q)
+        if end > len(self._buf):
+            grown = np.empty((max(end, 2 * len(self._buf)), 4))
+            grown[:self.n] = self._buf[:self.n]
+            self._buf = grown
+        self._buf[self.n:end] = Q
+        self.n = end
+
+    def array(self) -> np.ndarray:
+        """Gesammelte Samples als N×4-View."""
+        return self._buf[:self.n]
+
+class _Phase:
+    """
+    Eine Sammelphase der Zustandsmaschine. Gemessen wird in Sensor-Zeit:
+    die Phase endet, sobald dur Sekunden (Summe der Abstände der
+    Zeitstempel) und mindestens MIN_SAMPLES Samples beisammen sind.
+    Rücksprünge (Sensor-Neustart) zählen 0, Lücken höchstens MAX_GAP_S.
+    """
+
+    def __init__(self, name: str, dur: float, rate: float, start_msg: str,
+                 finish, countdown: bool = False):
+        self.name      = name
+        self.dur       = dur
+        self.start_msg = start_msg
+        self.finish    = finish          # finish(Q) → Status-Text bei Abschluss
+        self.countdown = countdown
+        self.buf       = _QuatBuffer(dur * rate * 1.2 + 16)
+        self.elapsed   = 0.0
+        self.t0        = None            # Host-Zeit des ersten Samples
+        self._last     = None
+        self._shown    = int(dur)
+
+    def begin_msgs(self) -> list:
+        msgs = [self.start_msg]
+        if self.countdown and self._shown > 0:
+            msgs.append(f"{self._shown} s verbleiben")
+        return msgs
+
+    def feed(self, Q: np.ndarray, secs: np.ndarray):
+        """
+        Übernimmt Samples bis zum Phasenende.
+        Liefert (verbrauchte Zeilen, fertig?, Countdown-Meldungen).
+        """
+        if self.t0 is None:
+            self.t0 = time.monotonic()
+        prev = secs[0] if self._last is None else self._last
+        dt = np.clip(np.diff(secs, prepend=prev), 0.0, MAX_GAP_S)
+        el = self.elapsed + np.cumsum(dt)
+        count = self.buf.n + np.arange(1, len(secs) + 1)
+        done = np.flatnonzero((el >= self.dur) & (count >= MIN_SAMPLES))
+        used = int(done[0]) + 1 if len(done) else len(secs)
+        self.buf.append(Q[:used])
+        self.elapsed = float(el[used - 1])
+        self._last   = float(secs[used - 1])
+
+        msgs = []
+        if self.countdown:
+            # jede unterschrittene volle Sekunde melden, auch mehrere pro Block
+            low = max(int(np.ceil(self.dur - self.elapsed)), 1)
+            msgs = [f"{rem} s verbleiben" for rem in range(self._shown - 1, low - 1, -1)]
+            self._shown = min(self._shown, low)
+        return used, len(done) > 0, msgs
+
 class Calibration:
     """
     Kombinierte Swing-Kalibrierung plus neue Nullpunkt-Kalibrierung (alle drei Achsen).
     - start_swing(duration, callback, base_dur=0.5, offset_dur=0.5):
-        führt dreiphasig eine Swing-Kalibrierung durch (Basis, PCA, Offset).
+        Swing-Kalibrierung: Basis und PCA, die Offset-Phase folgt erst auf
+        confirm_baseline().
     - confirm_baseline(duration, callback):
         dient als dritte Phase der Swing-Kalibrierung, berechnet den Roll-Offset.
     - start_nullpoint(duration, callback):
         misst für 'duration' Sekunden die aktuelle Orientierung (bereinigt um
         q_base und q_axis) und setzt einen neuen Offset-Quaternion so, dass
         alle Achsen (Roll/Pitch/Yaw) auf 0° stehen. Ohne PCA.
+
+    Alle Aufrufe kehren sofort zurück. Die Phasen laufen als Zustandsmaschine
+    im Takt der Samples: collect() bekommt die Roh-Quaternionen samt
+    Sensor-Zeitstempel, schließt fertige Phasen ab (im Thread des Aufrufers,
+    also dem Reader) und schaltet zur nächsten weiter. Das Ergebnis hängt
+    damit nur von den Sensordaten ab, nicht von CPU-Last oder
+    Wiedergabegeschwindigkeit. Der callback wird ebenfalls dort aufgerufen.
     """
 
     def __init__(self):
+        # Schreibzugriffe auf q_base/q_axis/q_offset serialisieren
+        self._lock = threading.Lock()
+        # vorab zusammengesetzte Korrektur: (Version, Quaternion, 4×4-Matrix)
+        self._corr = (0, Quaternion(), np.eye(4))
+
         # bestehende Zustände für Swing-Kalib
-        self.q_base = Quaternion()       # Basis-Quaternion (Ruhelage)
+        self._q_base   = Quaternion()    # Basis-Quaternion (Ruhelage)
         self.axis   = np.array([1.0,0.0,0.0])  # Achse aus PCA
-        self.q_axis = Quaternion()       # Quaternion, die 'axis' auf X-Standard (1,0,0) bringt
+        self._q_axis   = Quaternion()    # Quaternion, die 'axis' auf X-Standard (1,0,0) bringt
         self.roll_offset_angle = 0.0     # Roll-Offset (für Swing-Baseline)
-        self.q_offset = Quaternion()     # Quaternion, um den Roll-Offset zu kompensieren
+        self._q_offset = Quaternion()    # Quaternion, um den Roll-Offset zu kompensieren
+
+        # von DataProcessor nachgeführt, bestimmt die Vorab-Größe der Puffer
+        self.srate_hz = 0.0
 
-        # interner Zustand
+        # Zustandsmaschine: anstehende Phasen (erste = laufende) und deren
+        # callback; Umschalten und Anhängen nur unter _buf_lock
+        self._buf_lock   = threading.Lock()
+        self._phases     = []
+        self._callback   = None
         self._collecting = False
-        self._collector  = None
-        self._baseline_qs = []
-        self._swing_qs    = []
+        self._offset_dur = 0.5           # Standard für confirm_baseline()
+
+    # --- Ablauf der Phasen ---
+
+    def _phase(self, name: str, dur: float, start_msg: str, finish,
+               countdown: bool = False) -> _Phase:
+        return _Phase(name, dur, self.srate_hz or DEFAULT_RATE_HZ, start_msg,
+                      finish, countdown)
+
+    def _run(self, phases: list, callback):
+        """Ersetzt den laufenden Ablauf durch phases und meldet die erste Phase an."""
+        with self._buf_lock:
+            old = self._callback if self._phases else None
+            self._phases     = list(phases)
+            self._callback   = callback
+            self._collecting = True
+        if old:
+            ABORTED.inc()
+            old("calib_aborted")
+        self._notify(callback, phases[0].begin_msgs())
+
+    @staticmethod
+    def _notify(callback, msgs):
+        if callback:
+            for msg in msgs:
+                callback(msg)
 
     def start_swing(self,
                     swing_dur: float,
@@ -66,110 +236,70 @@ class Calibration:
         Dreiphasige Swing-Kalibrierung:
          1) Basis-Mittelung (still) → q_base
          2) Swing + PCA → q_axis
-         3) Offset-Baseline → q_offset (nur Roll)
+         3) Offset-Baseline → q_offset (nur Roll), erst mit confirm_baseline(),
+            wenn die Glocke wieder ruht (offset_dur gilt dann als Standard)
         callback erhält Status-Texte:
           "please_hold_baseline" →  Nutzer soll stillhalten (base_dur)
           "baseline_done"        →  Basis eingeholt
           "please_swing"         →  Nutzer soll Glocke schwingen (swing_dur)
           "{n} s verbleiben"     →  Countdown
-          "swing_pca_done"       →  PCA fertig, jetzt stillhalten
-          "please_hold_offset"   →  Offset-Baseline (offset_dur)
-          "swing_done"           →  Swing-Kalib abgeschlossen
-        """
-        # --- Phase 1: Basis-Mittelung ---
-        self._baseline_qs = []
-        def collect_base(q):
-            self._baseline_qs.append(q)
-
-        if callback: callback("please_hold_baseline")
-        self._collecting = True
-        self._collector  = collect_base
-        time.sleep(base_dur)
-        self._collecting = False
-        self._collector  = None
-
-        if self._baseline_qs:
-            q_avg       = _quat_avg(self._baseline_qs)
+          "swing_pca_done"       →  PCA fertig, Glocke ausschwingen lassen
+        Dauern in Sekunden Sensor-Zeit.
+        """
+        self._offset_dur = offset_dur
+        self._run([
+            self._phase("base", base_dur, "please_hold_baseline", self._finish_base),
+            self._phase("swing", swing_dur, "please_swing", self._finish_swing, countdown=True),
+        ], callback)
+
+    def _finish_base(self, Q) -> str:
+        if len(Q):
+            q_avg       = _quat_avg(Q)
             self.q_base = q_avg.inverse.normalised
-        if callback: callback("baseline_done")
-
-        # --- Phase 2: Swing + PCA ---
-        self._swing_qs = []
-        def collect_swing(q):
-            self._swing_qs.append(q)
+        return "baseline_done"
 
-        if callback: callback("please_swing")
-        self._collecting = True
-        self._collector  = collect_swing
+    def _finish_swing(self, Q) -> str:
+        # korrigiere Swing-Qs mit Basis, PCA der Relativdrehungen
+        corrected = _left_apply(self.q_base, Q)
+        self.axis = _swing_axis(corrected)
+        self.q_axis = _quat_between(self.axis, np.array([1.0,0.0,0.0])).normalised
+        return "swing_pca_done"
 
-        def _pca_job():
-            # Countdown während Swing
-            for rem in range(int(swing_dur), 0, -1):
-                if callback:
-                    callback(f"{rem} s verbleiben")
-                time.sleep(1)
-
-            self._collecting = False
-            self._collector  = None
-
-            # korrigiere Swing-Qs mit Basis
-            corrected = [self.q_base * q for q in self._swing_qs]
-            omegas = []
-            for a, b in zip(corrected, corrected[1:]):
-                dq  = b * a.inverse
-                v   = np.array(dq.vector)
-                ang = 2 * np.arctan2(np.linalg.norm(v), dq.w)
-                if np.linalg.norm(v) > 1e-6:
-                    omegas.append((v / np.linalg.norm(v)) * ang)
-
-            if omegas:
-                _, _, vt = np.linalg.svd(np.vstack(omegas), full_matrices=False)
-                self.axis = vt[0]
-            else:
-                self.axis = np.array([1.0, 0.0, 0.0])
-
-            self.q_axis = _quat_between(self.axis, np.array([1.0,0.0,0.0])).normalised
-            if callback: callback("swing_pca_done")
-
-        threading.Thread(target=_pca_job, daemon=True).start()
-
-        # --- Phase 3: Offset-Baseline (Roll) ---
-        def _offset_starter():
-            # Warte bis PCA fertig (callback sendet "swing_pca_done")
-            # und führe dann confirm_baseline durch
-            self.confirm_baseline(offset_dur, callback)
-
-        threading.Thread(target=_offset_starter, daemon=True).start()
-
-    def confirm_baseline(self, offset_dur: float, callback=None):
+    def confirm_baseline(self, offset_dur: float = None, callback=None):
         """
-        Offset-Baseline für Swing-Kalibrierung (Roll-Nullpunkt).
+        Offset-Baseline für Swing-Kalibrierung (Roll-Nullpunkt), sobald die
+        Glocke ruht. Läuft die Offset-Phase schon, beginnt sie mit offset_dur
+        neu; steckt die Swing-Kalibrierung noch in Basis oder Swing, folgt
+        sie direkt danach; sonst startet die Phase allein.
         callback erhält:
           "please_hold_offset" →  Nutzer soll stillhalten (offset_dur)
           "swing_done"         →  Swing-Kalibrierung vollständig abgeschlossen
         """
-        self._baseline_qs = []
-        def collect_offset(q):
-            self._baseline_qs.append(q)
-
-        if callback: callback("please_hold_offset")
-        self._collecting = True
-        self._collector  = collect_offset
-
-        def _offset_job():
-            time.sleep(offset_dur)
-            self._collecting = False
-            self._collector  = None
-
-            # Korrigiere jede Baseline-Quaternion: zuerst Basis → dann Achse
-            corrected = [(self.q_axis * (self.q_base * q)) for q in self._baseline_qs]
-            rolls = [qc.yaw_pitch_roll[2] for qc in corrected]
-            roll_mean = float(np.mean(rolls)) if rolls else 0.0
-            self.set_manual_roll(roll_mean)
-
-            if callback: callback("swing_done")
-
-        threading.Thread(target=_offset_job, daemon=True).start()
+        dur = self._offset_dur if offset_dur is None else offset_dur
+        phase = self._phase("offset", dur, "please_hold_offset", self._finish_offset)
+        with self._buf_lock:
+            names = [p.name for p in self._phases]
+            pending = "offset" in names or "swing" in names
+            if "offset" in names:
+                self._phases[names.index("offset")] = phase
+                if callback:
+                    self._callback = callback
+                restart = names.index("offset") == 0
+            elif pending:
+                self._phases.append(phase)   # Callback der Swing-Kalibrierung bleibt
+                restart = False
+        if not pending:
+            self._run([phase], callback)
+        elif restart:
+            self._notify(self._callback, phase.begin_msgs())
+
+    def _finish_offset(self, Q) -> str:
+        # Korrigiere jede Baseline-Quaternion: zuerst Basis → dann Achse
+        corrected = _left_apply(self.q_axis * self.q_base, Q)
+        rolls = quat_yaw_pitch_roll(quat_normalise(corrected))[2]
+        roll_mean = float(np.mean(rolls)) if len(rolls) else 0.0
+        self.set_manual_roll(roll_mean)
+        return "swing_done"
 
     def start_nullpoint(self, null_dur: float, callback=None):
         """
@@ -182,40 +312,113 @@ class Calibration:
           "please_hold_null" →  Nutzer soll in Null-Pose stillhalten
           "null_done"        →  Nullpunkt-Kalibrierung abgeschlossen
         """
-        self._baseline_qs = []
-        def collect_null(q):
-            # q: Roh-Quaternion
-            self._baseline_qs.append(q)
-
-        if callback: callback("please_hold_null")
-        self._collecting = True
-        self._collector  = collect_null
-
-        def _null_job():
-            time.sleep(null_dur)
+        self._run([self._phase("null", null_dur, "please_hold_null", self._finish_null)],
+                  callback)
+
+    def _finish_null(self, Q) -> str:
+        # Korrigiere alle gesammelten Quaternions: q_corrected = (q_axis * (q_base * q_raw))
+        corrected = _left_apply(self.q_axis * self.q_base, Q)
+        if len(corrected):
+            # Mittelwert der korrigierten Quaternions
+            q_avg = _quat_avg(corrected)
+            # Neuer Offset‐Quaternion: invertiere diesen Mittelwert
+            self.q_offset = q_avg.inverse.normalised
+        else:
+            self.q_offset = Quaternion()  # kein Datenpunkt → Identity
+        return "null_done"
+
+    def cancel(self):
+        """Bricht eine laufende Kalibrierung ab (callback erhält "calib_aborted")."""
+        with self._buf_lock:
+            cb = self._callback if self._phases else None
+            self._phases     = []
+            self._callback   = None
             self._collecting = False
-            self._collector  = None
-
-            # Korrigiere alle gesammelten Quaternions: q_corrected = (q_axis * (q_base * q_raw))
-            corrected = [(self.q_axis * (self.q_base * q)) for q in self._baseline_qs]
-            if corrected:
-                # Mittelwert der korrigierten Quaternions
-                q_avg = _quat_avg(corrected)
-                # Neuer Offset‐Quaternion: invertiere diesen Mittelwert
-                self.q_offset = q_avg.inverse.normalised
-            else:
-                self.q_offset = Quaternion()  # kein Datenpunkt → Identity
+        if cb:
+            ABORTED.inc()
+        self._notify(cb, ["calib_aborted"])
 
-            if callback: callback("null_done")
-
-        threading.Thread(target=_null_job, daemon=True).start()
+    def collect(self, q, secs):
+        """
+        Wird mit neuen Roh-Quaternionen aufgerufen, solange eine Phase läuft:
+        einzelnes Quaternion oder N×4-Block (w,x,y,z), secs = Sensor-Zeit(en)
+        in Sekunden. Treibt die Zustandsmaschine: fertige Phasen werden
+        ausgewertet, übrige Samples des Blocks gehen an die nächste Phase.
+        """
+        if not self._collecting:
+            return
+        Q = np.asarray(q.q if isinstance(q, Quaternion) else q, dtype=float).reshape(-1, 4)
+        secs = np.asarray(secs, dtype=float).reshape(-1)
+        while len(Q):
+            with self._buf_lock:
+                if not self._phases:
+                    return
+                phase, callback = self._phases[0], self._callback
+                used, done, msgs = phase.feed(Q, secs)
+                if done:
+                    self._phases.pop(0)
+                    nxt = self._phases[0] if self._phases else None
+                    if nxt is None:
+                        self._callback   = None
+                        self._collecting = False
+            self._notify(callback, msgs)
+            if not done:
+                return
+            # Auswertung außerhalb des Locks: callbacks dürfen neue Phasen starten
+            t1 = time.monotonic()
+            PHASE_S.labels(phase.name).observe(t1 - phase.t0)
+            msg = phase.finish(phase.buf.array())
+            FINISH_S.labels(phase.name).observe(time.monotonic() - t1)
+            self._notify(callback, [msg])
+            if nxt is not None:
+                self._notify(callback, nxt.begin_msgs())
+            Q, secs = Q[used:], secs[used:]
+
+    # --- Kalibrierungs-Quaternions: Setzen baut die Gesamtkorrektur neu ---
+
+    @property
+    def q_base(self) -> Quaternion:
+        return self._q_base
+
+    @q_base.setter
+    def q_base(self, q: Quaternion):
+        self._update(q_base=q)
+
+    @property
+    def q_axis(self) -> Quaternion:
+        return self._q_axis
+
+    @q_axis.setter
+    def q_axis(self, q: Quaternion):
+        self._update(q_axis=q)
+
+    @property
+    def q_offset(self) -> Quaternion:
+        return self._q_offset
+
+    @q_offset.setter
+    def q_offset(self, q: Quaternion):
+        self._update(q_offset=q)
+
+    def _update(self, **quats):
+        """
+        Übernimmt neue Werte für q_base/q_axis/q_offset und baut die
+        Gesamtkorrektur q_offset * q_axis * q_base einmalig neu auf.
+        Das Tupel _corr wird als Ganzes ersetzt, der Reader-Thread sieht
+        also immer entweder die alte oder die neue Kalibrierung.
+        """
+        with self._lock:
+            for name, q in quats.items():
+                setattr(self, "_" + name, q)
+            q_corr = self._q_offset * self._q_axis * self._q_base
+            self._corr = (self._corr[0] + 1, q_corr, quat_left_matrix(q_corr.q))
 
-    def collect(self, q: Quaternion):
+    def correction(self):
         """
-        Wird bei jedem neuen Roh-Quaternion aufgerufen, solange _collecting True ist.
+        Liefert (Version, Quaternion, 4×4-Matrix) der Gesamtkorrektur.
+        Die Matrix L erfüllt q_corr * q = L @ q (Elemente w,x,y,z).
         """
-        if self._collecting and self._collector:
-            self._collector(q)
+        return self._corr
 
     def apply(self, q: Quaternion) -> Quaternion:
         """
@@ -223,8 +426,9 @@ class Calibration:
            → q_base (Basis)
            → q_axis (Achsenausrichtung)
            → q_offset (Offset, Roll & jetzt auch Pitch/Yaw)
+        Die Verkettung ist vorab berechnet (siehe _update).
         """
-        return (self.q_offset * self.q_axis * self.q_base) * q
+        return self._corr[1] * q
 
     def set_manual_roll(self, angle_rad: float):
         """
@@ -233,6 +437,11 @@ class Calibration:
         self.roll_offset_angle = angle_rad
         self.q_offset = Quaternion(axis=[1, 0, 0], angle=-angle_rad).normalised
 
+    def reset(self):
+        """Setzt q_base, q_axis und q_offset in einem Schritt auf Identity."""
+        self.roll_offset_angle = 0.0
+        self._update(q_base=Quaternion(), q_axis=Quaternion(), q_offset=Quaternion())
+
     def collecting(self) -> bool:
         """
         True, solange eine Kalibrierungsphase (Swing oder Nullpunkt) aktiv ist.
@@ -3,49 +3,74 @@ import time
 import numpy as np
 from pyquaternion import Quaternion
 from calibration import Calibration
+from quat_math import quat_normalise, quat_rotation_matrix, quat_yaw_pitch_roll
+from sample_ring import SAMPLE_DTYPE
+from timing import StreamTiming
+from metrics import REGISTRY
+
+# Laufzeit je Aufruf (Sekunden), getrennt nach Einzel- und Block-Pfad
+PROCESS_S = REGISTRY.histogram("nicla_process_seconds",
+                               "Laufzeit von DataProcessor.process/process_batch je Aufruf",
+                               ("call",))
+_PROCESS_ONE   = PROCESS_S.labels("process")
+_PROCESS_BATCH = PROCESS_S.labels("process_batch")
 
 class DataProcessor:
-    def __init__(self, queue):
+    def __init__(self, queue, ring=None):
+        # queue: Einzel-Dicts pro Sample (Altpfad), ring: SampleRing (Blöcke)
         self.queue = queue
+        self.ring  = ring
+        # optional: raw_recording.RawRecorder für die Roh-Frames
+        self.recorder = None
+        # optional: swing_analysis.SwingAnalyzer, bekommt (secs, roll) je Block
+        self.analyzer = None
         self.calib = Calibration()
+        # Sensor-Zeit vs. Host-Zeit: Board-Rate, Jitter, Lücken, Drift, Latenz
+        self.timing = StreamTiming()
         self._rate_cnt   = 0
-        self._rate_t0    = time.time()
+        self._rate_t0    = time.monotonic()
         self.rate_hz     = 0.0
         self._srate_cnt  = 0
-        self._srate_t0   = time.time()
+        self._srate_t0   = time.monotonic()
         self.srate_hz    = 0.0
 
-    def process(self, ms: int, qx: float, qy: float, qz: float, qw: float):
-        secs = ms / 1000.0
-        now = time.time()
+    def _count(self, n: int = 1):
+        now = time.monotonic()
 
-        # Paket-Rate (2 s-Fenster)
+        # Paket-Rate (2 s-Fenster): ein Aufruf = ein Paket bzw. Block
         self._rate_cnt += 1
         if now - self._rate_t0 >= 2.0:
             self.rate_hz  = self._rate_cnt / (now - self._rate_t0)
             self._rate_t0 = now
             self._rate_cnt = 0
 
-        # Sample-Rate (2 s-Fenster)
-        self._srate_cnt += 1
+        # Sample-Rate (2 s-Fenster): Samples je Sekunde Host-Zeit
+        self._srate_cnt += n
         if now - self._srate_t0 >= 2.0:
             self.srate_hz   = self._srate_cnt / (now - self._srate_t0)
+            # Phasenpuffer nach der Rate des Boards (Sensor-Zeit) bemessen
+            self.calib.srate_hz = self.timing.device_hz or self.srate_hz
             self._srate_t0  = now
             self._srate_cnt = 0
 
+    def process(self, ms: int, qx: float, qy: float, qz: float, qw: float):
+        t0 = time.perf_counter()
+        secs = ms / 1000.0
+        self._count(1)
+        if self.recorder:
+            self.recorder.write([ms], [[qx, qy, qz, qw]])
+
         # RAW-Quaternion
         q_raw = Quaternion(w=qw, x=qx, y=qy, z=qz)
         R_raw = q_raw.rotation_matrix
 
         # Kalibriertes Quaternion
-        self.calib.collect(q_raw)
+        self.calib.collect(q_raw, secs)
         q_cal = self.calib.apply(q_raw)
         yaw, pitch, roll = q_cal.yaw_pitch_roll
         R_cal = q_cal.rotation_matrix
 
-        # Dict in die Queue
-        if self.queue:
-            self.queue.put({
+        d = {
                 "secs":    secs,
                 "rate":    self.rate_hz,
                 "srate":   self.srate_hz,
@@ -60,4 +85,125 @@ class DataProcessor:
                 "pitch":   np.degrees(pitch),
                 "yaw":     np.degrees(yaw),
                 "R":       R_cal
-            })
+        }
+        # Dict in die Queue bzw. als Zeile in den Ring
+        if self.ring is not None:
+            row = np.zeros(1, dtype=SAMPLE_DTYPE)
+            for k, v in d.items():
+                row[k] = v
+            self.ring.write(row)
+        self.timing.feed((ms,), self.ring.head if self.ring is not None else None)
+        if self.analyzer:
+            self.analyzer.feed((d["secs"],), (d["roll"],))
+        if self.queue:
+            self.queue.put(d)
+        _PROCESS_ONE.observe(time.perf_counter() - t0)
+
+    def process_batch(self, ms_array, quat_array):
+        """
+        Vektorisierte Variante von process() für einen ganzen Block.
+          ms_array:   N Zeitstempel (millis)
+          quat_array: N×4 Roh-Quaternionen in Sensor-Reihenfolge (qx,qy,qz,qw)
+        Liefert den Block als Structured-Array (SAMPLE_DTYPE, Spaltennamen wie
+        die Schlüssel aus process()) und hängt ihn an den Ring an. Falls eine
+        Queue gesetzt ist, kommt zusätzlich pro Sample das gewohnte Dict hinein.
+        """
+        t0 = time.perf_counter()
+        ms   = np.asarray(ms_array, dtype=float).reshape(-1)
+        quat = np.asarray(quat_array, dtype=float).reshape(-1, 4)
+        n = len(ms)
+        if n == 0:
+            return None
+        self._count(n)
+        if self.recorder:
+            self.recorder.write(ms, quat)
+
+        # RAW-Quaternionen (w,x,y,z), normiert wie pyquaternion.rotation_matrix
+        q_raw = quat_normalise(quat[:, [3, 0, 1, 2]])
+        R_raw = quat_rotation_matrix(q_raw)
+
+        # Kalibrierungsphasen übernehmen den Block direkt in ihren Puffer
+        # und laufen im Takt der Sensor-Zeit weiter
+        if self.calib.collecting():
+            self.calib.collect(q_raw, ms / 1000.0)
+
+        # Kalibriertes Quaternion: (q_offset * q_axis * q_base) * q_raw,
+        # als vorab zusammengesetzte Links-Multiplikationsmatrix
+        _, _, L = self.calib.correction()
+        q_cal = quat_normalise(q_raw @ L.T)
+        yaw, pitch, roll = quat_yaw_pitch_roll(q_cal)
+        R_cal = quat_rotation_matrix(q_cal)
+
+        rows = np.empty(n, dtype=SAMPLE_DTYPE)
+        rows["secs"]   = ms / 1000.0
+        rows["rate"]   = self.rate_hz
+        rows["srate"]  = self.srate_hz
+        # RAW
+        rows["raw_qx"] = q_raw[:, 1]; rows["raw_qy"] = q_raw[:, 2]
+        rows["raw_qz"] = q_raw[:, 3]; rows["raw_qw"] = q_raw[:, 0]
+        rows["raw_R"]  = R_raw
+        # Kalibriert
+        rows["qx"]     = q_cal[:, 1]; rows["qy"]     = q_cal[:, 2]
+        rows["qz"]     = q_cal[:, 3]; rows["qw"]     = q_cal[:, 0]
+        rows["roll"]   = np.degrees(roll)
+        rows["pitch"]  = np.degrees(pitch)
+        rows["yaw"]    = np.degrees(yaw)
+        rows["R"]      = R_cal
+
+        if self.ring is not None:
+            self.ring.write(rows)
+        self.timing.feed(ms, self.ring.head if self.ring is not None else None)
+        if self.analyzer:
+            self.analyzer.feed(rows["secs"].tolist(), rows["roll"].tolist())
+        # Einzel-Dicts in die Queue (kompatibel zu process())
+        if self.queue:
+            names = rows.dtype.names
+            for values in rows.tolist():
+                self.queue.put(dict(zip(names, values)))
+        _PROCESS_BATCH.observe(time.perf_counter() - t0)
+        return rows
+
+
+def selftest(n: int = 500, block: int = 64, seed: int = 1):
+    """
+    Vergleicht process() (pro Sample, pyquaternion) mit process_batch()
+    (Blöcke, NumPy) bei gesetzter Kalibrierung (q_base, q_axis, q_offset):
+    alle Felder außer den Raten müssen übereinstimmen.
+    python data_processor.py
+    """
+    from sample_ring import SampleRing
+    rng = np.random.default_rng(seed)
+    quat = rng.normal(size=(n, 4))
+    quat /= np.linalg.norm(quat, axis=1)[:, None]
+    ms = np.cumsum(rng.integers(15, 25, size=n)).astype(float)
+
+    calib = [Quaternion(rng.normal(size=4)).normalised for _ in range(3)]
+    out = []
+    for batch in (False, True):
+        p = DataProcessor(None, SampleRing(n))
+        p.calib.q_base, p.calib.q_axis, p.calib.q_offset = calib
+        if batch:
+            for i in range(0, n, block):
+                p.process_batch(ms[i:i + block], quat[i:i + block])
+        else:
+            for m, q in zip(ms, quat):
+                p.process(int(m), *q)
+        rows, _, _ = p.ring.read(0)
+        assert len(rows) == n
+        out.append(rows)
+
+    single, batch = out
+    # Kalibrierung wirkt tatsächlich (kalibriert ≠ roh)
+    assert not np.allclose(single["qx"], single["raw_qx"])
+    for name in SAMPLE_DTYPE.names:
+        if name in ("rate", "srate"):
+            continue
+        a, b = single[name], batch[name]
+        if name in ("roll", "pitch", "yaw"):
+            a, b = (a - b + 180.0) % 360.0 - 180.0, 0.0   # ±180° gleichwertig
+        assert np.allclose(a, b, atol=1e-9), f"{name}: max. Abweichung {np.max(np.abs(a - b))}"
+
+
+if __name__ == "__main__":
+    selftest()
+    print("selftest ok")
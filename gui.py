@@ -1,18 +1,24 @@
 """
 gui.py – Nicla-Viewer mit USB-prioritärer Verbindung, BLE-Fallback,
-CSV, Live-3D+2D, Swing‐Kalibrierung, Nullpunkt-Kalibrierung,
+Aufnahme (.nrec/CSV), Live-3D+2D, Swing‐Kalibrierung, Nullpunkt-Kalibrierung,
 Analyse (Max/Min/Mittel/Frequenz/Periodendauer) und helles Arc-Theme
 """
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import csv, datetime, collections
+import argparse, datetime, os, threading, time
 from queue import Queue, Empty
 from serial.tools import list_ports
 
 from viewer_core import ViewerCore
 from serial_core import SerialCore
-from pyquaternion import Quaternion
+from raw_recording import RawRecorder, ReplayCore
+from plot_renderer import PlotRenderer, AxisLimits, ScrollLimits
+from window_stats import SlidingWindow
+from swing_analysis import SwingAnalyzer
+from session_recording import SessionRecorder, export_csv
+from metrics import REGISTRY, start_http_server
+from profiler import SamplingProfiler
 import numpy as np
 
 import matplotlib
@@ -26,35 +32,69 @@ try:
 except ImportError:
     RootTk, THEME = tk.Tk, {}
 
+TIMING_S = 1.0   # Aktualisierung des Zeitmessungs-Panels (s)
+
 class NiclaGUI(RootTk):
-    def __init__(self):
+    def __init__(self, replay=None, speed=1.0, raw_log=None, fps=25, blit=True,
+                 stats_span=60.0):
+        """
+        replay:  .nraw-Aufzeichnung statt USB abspielen (Geschwindigkeit speed)
+        raw_log: Roh-Frames (USB und BLE) zusätzlich in diese .nraw-Datei schreiben
+        fps:     Bildrate der Plots (unabhängig von der Sample-Rate)
+        blit:    Plots per Blitting zeichnen (False → draw_idle wie bisher)
+        stats_span: Länge des Live-Statistikfensters in Sekunden
+        """
         super().__init__(**THEME)
         self.title("Nicla Bell Viewer")
-        self.geometry("1040x920")  # etwas höher, um Analyse-Fenster unterzubringen
+        self.geometry("1200x920")  # etwas höher, um Analyse-Fenster unterzubringen
         self.configure(bg="#fafafa")
 
-        # Backends
+        # Backends (im Replay-Modus ersetzt ReplayCore den USB-Port)
         self.core  = ViewerCore()
-        self.ser   = SerialCore()
+        self.ser   = ReplayCore(replay, speed=speed) if replay else SerialCore()
         self.queue = Queue()
+        # Queue-Tiefen für /metrics (--metrics-port), gelesen erst beim Abruf
+        REGISTRY.collect("nicla_queue_depth", "Nicht abgeholte Meldungen je Queue",
+                         lambda: [(("gui",), self.queue.qsize()), (("serial",), self.ser.q.qsize())],
+                         labels=("queue",))
+        if raw_log:
+            rec = RawRecorder(raw_log)
+            self.core.processor.recorder = self.ser.processor.recorder = rec
 
         # GUI-State
         self.mode      = tk.StringVar(value="USB")
         self.port_var  = tk.StringVar(value="COM7")
-        self._csv_file = None
-        self._csv_wr   = None
-
-        # Buffers für 2D-Plot (Roll vs. Zeit)
-        self.buf_t  = collections.deque(maxlen=400)
-        self.buf_rl = collections.deque(maxlen=400)
-
-        # Analyse-Status und Puffer
+        # Aufnahme: SessionRecorder liest selbst aus dem Ring (eigener Thread)
+        self._rec      = None
+        self._rec_csv  = None   # CSV-Ziel, exportiert nach dem Stoppen
+
+        # Lese-Cursor je Sample-Ring (USB / BLE)
+        self._cursors = {}
+        # Zeitmessung: Panel alle TIMING_S Sekunden neu
+        self._timing_t = 0.0
+
+        # Rendering: feste Bildrate, neuestes Sample für Textfelder/3D
+        self.fps   = fps
+        self._blit = blit
+        self._last = None
+        self._xlim = ScrollLimits()
+        self._ylim = AxisLimits()
+
+        # Buffers für 2D-Plot (Roll vs. Zeit) mit laufendem Min/Max
+        self.win    = SlidingWindow(maxlen=400)
+        self.buf_t  = self.win.t
+        self.buf_rl = self.win.v
+        # Live-Statistik über ein längeres Zeitfenster
+        self.stats_win = SlidingWindow(span=stats_span)
+
+        # Analyse-Status und laufende Schwinganalyse (konstanter Speicher)
         self.analyzing = False
-        self.ana_t = []
-        self.ana_r = []
+        self.analyzer  = SwingAnalyzer()
+        self._ana_version = -1
 
         self._style()
         self._build_widgets()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # Start: Versuche USB auf COM7, sonst BLE
         if not self._try_usb_startup():
@@ -72,7 +112,7 @@ class NiclaGUI(RootTk):
         s.map("TButton", background=[("active","#d0d0d0")])
 
     def _build_widgets(self):
-        # ===== Header mit Modus-Wahl + Port-Auswahl + CSV =====
+        # ===== Header mit Modus-Wahl + Port-Auswahl + Aufnahme =====
         hdr = ttk.Frame(self); hdr.pack(fill="x", padx=10, pady=6)
         ttk.Radiobutton(hdr, text="BLE", value="BLE", variable=self.mode,
                         command=self._mode_changed).pack(side="left")
@@ -85,8 +125,8 @@ class NiclaGUI(RootTk):
         self.cbx_port.pack(side="left"); self.btn_refresh.pack(side="left", padx=(2,8))
         self.lbl_status  = ttk.Label(hdr, text="Init …"); self.lbl_status.pack(side="left", fill="x", expand=True)
         ttk.Button(hdr, text="Reconnect", command=self._reconnect).pack(side="left", padx=6)
-        self.btn_csv = ttk.Button(hdr, text="Start CSV", command=self._toggle_csv)
-        self.btn_csv.pack(side="left")
+        self.btn_rec = ttk.Button(hdr, text="Start Aufnahme", command=self._toggle_rec)
+        self.btn_rec.pack(side="left")
 
         # ===== Aktionen-Frame: Swing-Kalib, Nullpunkt-Kalib, Confirm, Reset =====
         act = ttk.LabelFrame(self, text="Aktionen"); act.pack(fill="x", padx=10, pady=4)
@@ -119,6 +159,10 @@ class NiclaGUI(RootTk):
         col(info, "Euler-Winkel",[("Roll","roll",12), ("Pitch","pitch",12), ("Yaw","yaw",12)])
         # Kalibrierte Quaternion
         col(info, "Quaternion",  [("qx","qx",12), ("qy","qy",12), ("qz","qz",12), ("qw","qw",12)])
+        # Zeitmessung aus Sensor- und Host-Zeit (timing.StreamTiming)
+        col(info, "Zeitmessung", [("Board Hz","dev_hz",9), ("Verloren","dropped",9),
+                                  ("Drift ppm","drift",9), ("Transport","lat_tr",9),
+                                  ("→ GUI","lat_gui",9)])
 
         # Rotationsmatrix 3×3
         mat = ttk.LabelFrame(info, text="Rotationsmatrix R"); mat.pack(side="left", fill="y")
@@ -152,16 +196,20 @@ class NiclaGUI(RootTk):
         self.ax2 = ax2
 
         canvas = FigureCanvasTkAgg(fig, master=plot_area)
+        self.renderer = PlotRenderer(canvas, self.ax_lines + [self.line2d], blit=self._blit)
         canvas.draw(); canvas.get_tk_widget().pack(fill="both", expand=True)
         self.canvas = canvas
 
         # ===== Analyse-Bereich unterhalb der Plots =====
         ana_frame = ttk.LabelFrame(self, text="Analyse"); ana_frame.pack(fill="x", padx=10, pady=(0,10))
+        # Live-Kennwerte des Roll-Winkels (gleitendes Fenster)
+        col(ana_frame, f"Roll live ({self.stats_win.span:.0f} s)",
+            [("Min","live_min",8), ("Max","live_max",8), ("Mittel","live_mean",8), ("σ","live_std",8)])
         # Button: Starte Analyse / Beende Analyse
         self.btn_analyse = ttk.Button(ana_frame, text="Starte Analyse", command=self._toggle_analyse)
         self.btn_analyse.pack(side="left", padx=6, pady=6)
         # Textfeld für Analyse-Ergebnisse
-        self.txt_ana = tk.Text(ana_frame, height=6, width=80, wrap="word", font=("Segoe UI", 9))
+        self.txt_ana = tk.Text(ana_frame, height=8, width=80, wrap="word", font=("Segoe UI", 9))
         self.txt_ana.insert("1.0", "Analyse-Ergebnisse erscheinen hier …")
         self.txt_ana.configure(state="disabled")
         self.txt_ana.pack(fill="both", expand=True, padx=6, pady=6)
@@ -182,7 +230,8 @@ class NiclaGUI(RootTk):
         port = self.port_var.get()
         ok = self.ser.connect(port, baud=115200)
         if ok:
-            self.lbl_status.configure(text=f"USB {port}")
+            replay = isinstance(self.ser, ReplayCore)
+            self.lbl_status.configure(text=f"Replay {self.ser.port}" if replay else f"USB {port}")
             self.mode.set("USB")
             self._mode_changed()
         return ok
@@ -199,7 +248,7 @@ class NiclaGUI(RootTk):
 
     def _reconnect(self):
         self.core.disconnect(); self.ser.disconnect()
-        self.buf_t.clear(); self.buf_rl.clear()
+        self._clear_plot()
         if self.mode.get()=="BLE":
             self._connect_ble()
         else:
@@ -211,30 +260,51 @@ class NiclaGUI(RootTk):
             self.lbl_status.configure(text=f"USB {p}")
 
     # -------------------------------------------------------------------------
-    # ===== CSV-Aufzeichnung =====
+    # ===== Aufzeichnung (.nrec, optional CSV-Export) =====
     # -------------------------------------------------------------------------
 
-    def _toggle_csv(self):
-        if self._csv_file:
-            # CSV stoppen
-            self._csv_file.close(); self._csv_file = None; self._csv_wr = None
-            self.btn_csv.configure(text="Start CSV")
-            self.lbl_status.configure(text="CSV gespeichert")
+    def _toggle_rec(self):
+        if self._rec:
+            # Aufnahme stoppen (Thread schreibt den Rest und schließt die Datei)
+            rec, csv_path = self._rec, self._rec_csv
+            self._rec = self._rec_csv = None
+            rec.close()
+            self.btn_rec.configure(text="Start Aufnahme")
+            if rec.error:
+                self.lbl_status.configure(text=f"Aufnahme-Fehler: {rec.error}")
+            elif csv_path:
+                # Export im Hintergrund, Meldung über die Status-Queue
+                self.lbl_status.configure(text="Exportiere CSV …")
+                status_q = self.queue if self.mode.get() == "BLE" else self.ser.q
+                def job():
+                    export_csv(rec.path, csv_path)
+                    status_q.put({"status": f"CSV gespeichert: {csv_path}"})
+                threading.Thread(target=job, daemon=True).start()
+            else:
+                self.lbl_status.configure(text=f"Aufnahme gespeichert ({rec.rows} Samples)")
             return
 
-        # CSV starten
+        # Aufnahme starten; bei Dateiendung .csv wird nach dem Stoppen exportiert
         ts = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        path = filedialog.asksaveasfilename(defaultextension=".csv",
-            initialfile=f"nicla_{ts}.csv", title="CSV speichern",
-            filetypes=[("CSV","*.csv")])
+        path = filedialog.asksaveasfilename(defaultextension=".nrec",
+            initialfile=f"nicla_{ts}.nrec", title="Aufnahme speichern",
+            filetypes=[("Aufnahme","*.nrec"), ("CSV (Export nach Stopp)","*.csv")])
         if not path:
             return
-        self._csv_file = open(path,"w",newline="")
-        self._csv_wr   = csv.writer(self._csv_file)
-        self._csv_wr.writerow(["secs","roll","pitch","yaw","qx","qy","qz","qw"])
-        self.btn_csv.configure(text="Stop CSV")
+        if path.lower().endswith(".csv"):
+            self._rec_csv, path = path, os.path.splitext(path)[0] + ".nrec"
+        ring = self.core.ring if self.mode.get() == "BLE" else self.ser.ring
+        # Überschreiben hat der Dateidialog schon bestätigt
+        self._rec = SessionRecorder(path, ring, overwrite=True)
+        self.btn_rec.configure(text="Stop Aufnahme")
         self.lbl_status.configure(text=f"Schreibe: {path}")
 
+    def _on_close(self):
+        """Laufende Aufnahme sauber abschließen, dann Fenster schließen."""
+        if self._rec:
+            self._rec.close()
+        self.destroy()
+
     # -------------------------------------------------------------------------
     # ===== Kalibrierungs‐Methoden (Swing, Confirm, Nullpunkt, Reset) =====
     # -------------------------------------------------------------------------
@@ -266,73 +336,115 @@ class NiclaGUI(RootTk):
     def _reset(self):
         """Setzt alle Kalibrierungen zurück (q_base, q_axis, q_offset)."""
         for backend in (self.core.processor.calib, self.ser.processor.calib):
-            backend.q_base = Quaternion()
-            backend.q_axis = Quaternion()
-            backend.set_manual_roll(0.0)  # erneuert q_offset = Identity
-            backend.q_offset = Quaternion()
+            backend.reset()  # alle drei Quaternions atomar auf Identity
         # Reset 2D-Puffer
-        self.buf_t.clear(); self.buf_rl.clear()
+        self._clear_plot()
+
+    def _clear_plot(self):
+        self.win.clear(); self.stats_win.clear()
+        self._xlim.reset(); self._ylim.reset()
 
     # -------------------------------------------------------------------------
-    # ===== Poll-Loop: Eingehende Daten aus Queue verarbeiten =====
+    # ===== Poll-Loop: Status aus Queue, Samples blockweise aus dem Ring, =====
+    # ===== danach genau ein Frame mit fester Bildrate                     =====
     # -------------------------------------------------------------------------
 
     def _poll(self):
         try:
+            # Je nach Modus Status-Queue und Sample-Ring des Backends wählen
+            if self.mode.get()=="BLE":
+                status_q, ring, proc = self.queue, self.core.ring, self.core.processor
+            else:
+                status_q, ring, proc = self.ser.q, self.ser.ring, self.ser.processor
+
+            # Status‐Nachrichten
             while True:
-                # Je nach Modus die Queue abfragen
-                if self.mode.get()=="BLE":
-                    d = self.queue.get_nowait()
-                else:
-                    d = self.ser.q.get_nowait()
-
-                # Status‐Nachrichten
-                if "status" in d:
-                    st = d["status"]
-                    if st == "please_hold_baseline":
-                        self.lbl_status.configure(text="Bitte stillhalten (Baseline)…")
-                    elif st == "baseline_done":
-                        self.lbl_status.configure(text="Baseline abgeschlossen")
-                    elif st == "please_swing":
-                        self.lbl_status.configure(text="Bitte Glocke schwingen…")
-                    elif st.endswith("s verbleiben"):
-                        self.lbl_status.configure(text=st)
-                    elif st == "swing_pca_done":
-                        self.lbl_status.configure(text="Swing-PCA fertig. Jetzt stillhalten!")
-                        self.btn_confirm.configure(state="normal")
-                    elif st == "please_hold_offset":
-                        self.lbl_status.configure(text="Bitte stillhalten (Offset)…")
-                    elif st == "swing_done":
-                        self.lbl_status.configure(text="Swing-Kalibrierung abgeschlossen")
-                    elif st == "please_hold_null":
-                        self.lbl_status.configure(text="Bitte stillhalten (Nullpunkt)…")
-                    elif st == "null_done":
-                        self.lbl_status.configure(text="Nullpunkt-Kalibrierung abgeschlossen")
-                        self.btn_null.configure(state="normal")
-                    else:
-                        # generischer Status
-                        self.lbl_status.configure(text=st)
-
-                # Dominante Achse (optional sichtbar machen)
-                elif "dominant_axis" in d:
-                    # Man könnte hier z. B. eine gestrichelte Linie einblenden
-                    pass
-
-                # Wenn es sich um einen Daten-Dict handelt:
-                else:
-                    self._update(d)
-
-        except Empty:
-            pass
+                try:
+                    d = status_q.get_nowait()
+                except Empty:
+                    break
+                self._handle_status(d)
+
+            # Alle Samples seit dem letzten Poll als ein Block
+            cursor = self._cursors.get(id(ring), ring.head)
+            rows, self._cursors[id(ring)], _ = ring.read(cursor)
+            if len(rows):
+                self._update(rows)
+                self._render()
+                proc.timing.consumed("gui", self._cursors[id(ring)])
+            if time.monotonic() - self._timing_t >= TIMING_S:
+                self._render_timing(proc.timing.snapshot())
         finally:
-            # Nächster Poll in 40 ms
-            self.after(40, self._poll)
+            # Nächster Frame
+            self.after(max(1, int(1000 / self.fps)), self._poll)
+
+    def _render_timing(self, t):
+        """Zeitmessung: Board-Rate, Verluste, Drift und p95-Latenzen (ms)."""
+        self._timing_t = time.monotonic()
+        gui = t["consumers"].get("gui", {})
+        self.var["dev_hz"].set(f"{t['device_hz']:.1f}")
+        self.var["dropped"].set(f"{t['dropped']} ({100 * t['loss']:.1f}%)")
+        self.var["drift"].set("–" if t["drift_ppm"] is None else f"{t['drift_ppm']:+.0f}")
+        self.var["lat_tr"].set(f"{t['transport']['p95_ms']:.1f} ms" if t["transport"]["count"] else "–")
+        self.var["lat_gui"].set(f"{gui['p95_ms']:.1f} ms" if gui.get("count") else "–")
+
+    def _handle_status(self, d):
+        if "status" in d:
+            st = d["status"]
+            if st == "please_hold_baseline":
+                self.lbl_status.configure(text="Bitte stillhalten (Baseline)…")
+            elif st == "baseline_done":
+                self.lbl_status.configure(text="Baseline abgeschlossen")
+            elif st == "please_swing":
+                self.lbl_status.configure(text="Bitte Glocke schwingen…")
+            elif st.endswith("s verbleiben"):
+                self.lbl_status.configure(text=st)
+            elif st == "swing_pca_done":
+                self.lbl_status.configure(text="Swing-PCA fertig. Jetzt stillhalten!")
+                self.btn_confirm.configure(state="normal")
+            elif st == "please_hold_offset":
+                self.lbl_status.configure(text="Bitte stillhalten (Offset)…")
+            elif st == "swing_done":
+                self.lbl_status.configure(text="Swing-Kalibrierung abgeschlossen")
+            elif st == "please_hold_null":
+                self.lbl_status.configure(text="Bitte stillhalten (Nullpunkt)…")
+            elif st == "null_done":
+                self.lbl_status.configure(text="Nullpunkt-Kalibrierung abgeschlossen")
+                self.btn_null.configure(state="normal")
+            elif st == "calib_aborted":
+                self.lbl_status.configure(text="Kalibrierung abgebrochen")
+                self.btn_null.configure(state="normal")
+            else:
+                # generischer Status
+                self.lbl_status.configure(text=st)
+
+        # Dominante Achse (optional sichtbar machen)
+        elif "dominant_axis" in d:
+            # Man könnte hier z. B. eine gestrichelte Linie einblenden
+            pass
 
     # -------------------------------------------------------------------------
-    # ===== _update: Aktualisieren aller Textfelder, Plots, CSV, Analyse =====
+    # ===== _update: Puffer, Analyse – _render: Textfelder und Plots =====
     # -------------------------------------------------------------------------
 
-    def _update(self, d):
+    def _update(self, rows):
+        """Übernimmt einen Block neuer Samples (SAMPLE_DTYPE) in alle Puffer."""
+        self._last = rows[-1]
+
+        # --- 2D-Puffer Roll vs. Zeit ---
+        secs = rows["secs"].tolist()
+        roll = rows["roll"].tolist()
+        self.win.extend(secs, roll)
+        self.stats_win.extend(secs, roll)
+
+        # --- Analyse: laufend auswerten, falls aktiv ---
+        if self.analyzing:
+            self.analyzer.feed(secs, roll)
+
+    def _render(self):
+        """Zeichnet einen Frame mit dem neuesten Sample (einmal pro Poll)."""
+        d = self._last
+
         # --- System-Felder (Sekunden, Paket-Rate, Sample-Rate) ---
         for k, fmt in [("secs","{:.4f}"), ("rate","{:.1f}"), ("srate","{:.1f}")]:
             self.var[k].set(fmt.format(d[k]))
@@ -357,34 +469,27 @@ class NiclaGUI(RootTk):
             line.set_3d_properties([0, R[2][i]])
 
         # --- 2D-Plot Roll vs. Zeit aktualisieren ---
-        secs = d["secs"]
-        roll = d["roll"]
-        self.buf_t.append(secs); self.buf_rl.append(roll)
         self.line2d.set_data(self.buf_t, self.buf_rl)
-        if len(self.buf_t) > 1:
-            self.ax2.set_xlim(self.buf_t[0], self.buf_t[-1])
-        lo, hi = min(self.buf_rl), max(self.buf_rl)
-        self.ax2.set_ylim(lo-5, hi+5)
-
-        self.canvas.draw_idle()
-
-        # --- CSV schreiben, falls aktiv ---
-        if self._csv_wr:
-            self._csv_wr.writerow([
-                f"{d['secs']:.4f}",
-                f"{d['roll']:.2f}",
-                f"{d['pitch']:.2f}",
-                f"{d['yaw']:.2f}",
-                f"{d['qx']:.6f}",
-                f"{d['qy']:.6f}",
-                f"{d['qz']:.6f}",
-                f"{d['qw']:.6f}"
-            ])
-
-        # --- Analyse: Werte puffern, falls aktiv ---
-        if self.analyzing:
-            self.ana_t.append(secs)
-            self.ana_r.append(roll)
+        # Achsgrenzen nur bei Verlassen des Hysterese-Bands ändern (→ Neuaufbau)
+        moved = False
+        if len(self.buf_t) > 1 and self._xlim.update(self.buf_t[0], self.buf_t[-1]):
+            self.ax2.set_xlim(self._xlim.lo, self._xlim.hi); moved = True
+        if self._ylim.update(self.win.min, self.win.max):
+            self.ax2.set_ylim(self._ylim.lo, self._ylim.hi); moved = True
+        if moved:
+            self.renderer.invalidate()
+
+        # --- Live-Statistik ---
+        st = self.stats_win
+        for k, v in (("live_min", st.min), ("live_max", st.max),
+                     ("live_mean", st.mean), ("live_std", st.std)):
+            self.var[k].set(f"{v:+6.2f}")
+
+        # --- Analyse nach jeder erkannten Halbschwingung aktualisieren ---
+        if self.analyzing and self.analyzer.version != self._ana_version:
+            self._compute_and_show_analysis()
+
+        self.renderer.render()
 
     # -------------------------------------------------------------------------
     # ===== Analyse-Funktionen =====
@@ -393,8 +498,9 @@ class NiclaGUI(RootTk):
     def _toggle_analyse(self):
         """
         Schaltet die Analyse ein/aus:
-         - Beim Start: Puffer leeren, Button-Text auf „Beende Analyse“
-         - Beim Ende: Analyse-Werte berechnen und in Textfeld ausgeben
+         - Beim Start: Analyzer zurücksetzen, Button-Text auf „Beende Analyse“
+         - Währenddessen: Kennwerte laufend im Textfeld (siehe _render)
+         - Beim Ende: letzte Kennwerte stehen lassen
         """
         if not self.analyzing:
             # Starte Analyse
@@ -404,8 +510,8 @@ class NiclaGUI(RootTk):
             self.txt_ana.delete("1.0", "end")
             self.txt_ana.insert("1.0", "Analysiere …")
             self.txt_ana.configure(state="disabled")
-            # Puffer leeren
-            self.ana_t.clear(); self.ana_r.clear()
+            self.analyzer.reset()
+            self._ana_version = -1
         else:
             # Beende Analyse, berechne Kennwerte
             self.analyzing = False
@@ -414,40 +520,27 @@ class NiclaGUI(RootTk):
 
     def _compute_and_show_analysis(self):
         """
-        Berechnet aus den in ana_t / ana_r gesammelten Daten:
-         - Maximaler positiver Roll
-         - Maximaler negativer Roll
-         - Mittelwert aus Max/Min
-         - Schwingfrequenz
-         - Periodendauer (Durchschnitt zwischen Peak-Zeiten)
-        und zeigt die Ergebnisse im Textfeld an.
+        Zeigt die Kennwerte des SwingAnalyzer im Textfeld an:
+         - Maximaler positiver / negativer Roll, Mittelwert aus |Max|/|Min|
+         - Mittlere Periodendauer und Schwingfrequenz (Mittellagen-Durchgänge)
+         - Letzte Amplitude, log. Dekrement, Dämpfungsgrad, Asymmetrie
         """
-        if len(self.ana_r) < 3:
+        r = self.analyzer.result()
+        self._ana_version = r["version"]
+        if r["samples"] < 3:
             text = "Zu wenige Daten für Analyse."
         else:
-            max_pos = max(self.ana_r)
-            max_neg = min(self.ana_r)
-            mid_val = 0.5 * (abs(max_pos) + abs(max_neg))
-
-            # Peaks (lokale Maxima) finden
-            peaks = []
-            for i in range(1, len(self.ana_r)-1):
-                if self.ana_r[i] > self.ana_r[i-1] and self.ana_r[i] > self.ana_r[i+1]:
-                    peaks.append(self.ana_t[i])
-
-            period = 0.0
-            freq = 0.0
-            if len(peaks) >= 2:
-                diffs = [peaks[i] - peaks[i-1] for i in range(1, len(peaks))]
-                period = sum(diffs) / len(diffs)
-                freq = (1.0 / period) if period > 0 else 0.0
-
+            def f(key, fmt):
+                return "–" if r[key] is None else format(r[key], fmt)
             text = (
-                f"Max. positiver Roll (°): {max_pos:.2f}\n"
-                f"Max. negativer Roll (°): {max_neg:.2f}\n"
-                f"Mittelwert (°):           {mid_val:.2f}\n\n"
-                f"Mittlere Periodendauer (s): {period:.3f}\n"
-                f"Schwingfrequenz (Hz):       {freq:.3f}"
+                f"Max. positiver Roll (°): {f('max_pos', '.2f')}\n"
+                f"Max. negativer Roll (°): {f('max_neg', '.2f')}\n"
+                f"Mittelwert (°):           {f('mid', '.2f')}\n\n"
+                f"Mittlere Periodendauer (s): {f('period', '.3f')}\n"
+                f"Schwingfrequenz (Hz):       {f('freq', '.3f')}   ({r['cycles']} Perioden)\n"
+                f"Amplitude (°): {f('amplitude', '.2f')}   log. Dekrement: {f('log_decrement', '.4f')}"
+                f"   Dämpfungsgrad: {f('damping_ratio', '.4f')}\n"
+                f"Asymmetrie Amplitude: {f('asymmetry', '+.3f')}   Zeit: {f('time_asymmetry', '+.3f')}"
             )
 
         # Ergebnis in Textfeld ausgeben
@@ -457,4 +550,30 @@ class NiclaGUI(RootTk):
         self.txt_ana.configure(state="disabled")
 
 if __name__=="__main__":
-    NiclaGUI().mainloop()
+    ap = argparse.ArgumentParser(description="Nicla Bell Viewer")
+    ap.add_argument("--replay", help=".nraw-Aufzeichnung statt Sensor abspielen")
+    ap.add_argument("--speed", type=float, default=1.0,
+                    help="Replay-Geschwindigkeit (1 = Echtzeit, 0 = so schnell wie möglich)")
+    ap.add_argument("--record-raw", help="Roh-Frames in diese .nraw-Datei aufzeichnen")
+    ap.add_argument("--fps", type=float, default=25, help="Bildrate der Plots")
+    ap.add_argument("--no-blit", action="store_true",
+                    help="ohne Blitting zeichnen (komplettes draw_idle pro Frame)")
+    ap.add_argument("--stats-window", type=float, default=60.0,
+                    help="Länge des Live-Statistikfensters in Sekunden")
+    ap.add_argument("--metrics-port", type=int,
+                    help="Kennzahlen unter http://localhost:PORT/metrics bereitstellen")
+    ap.add_argument("--profile", metavar="DATEI",
+                    help="Stichproben-Profiler, Stacks beim Beenden in DATEI (collapsed)")
+    args = ap.parse_args()
+    if args.metrics_port:
+        start_http_server(args.metrics_port, "127.0.0.1")
+    prof = SamplingProfiler() if args.profile else None
+    if prof:
+        prof.start()
+    try:
+        NiclaGUI(replay=args.replay, speed=args.speed, raw_log=args.record_raw,
+                 fps=args.fps, blit=not args.no_blit, stats_span=args.stats_window).mainloop()
+    finally:
+        if prof:
+            prof.stop()
+            prof.dump(args.profile)
@@ -0,0 +1,175 @@
+# history.py
+"""
+Begrenzte Verlaufsdaten der verarbeiteten Samples in mehreren Auflösungen,
+damit spät verbundene Clients nicht nur ab „jetzt“ Daten sehen.
+
+Stufen (Standard):
+  raw  volle Rate, letzte 60 s        (Ring mit festem Platz für max_rate Hz)
+  1s   Buckets à 1 s, letzte Stunde   (3600 Slots)
+  1m   Buckets à 60 s, letzter Tag    (1440 Slots)
+
+Ein Bucket enthält Anzahl sowie Min/Max/Summe je Feld. Bucket-Nummer =
+floor(t / Auflösung), Slot = Nummer % Slots; ein Slot gilt nur, wenn seine
+gespeicherte Nummer zur angefragten passt. Abfragen kosten damit O(1) pro
+Bucket, der Speicher ist unabhängig von der Laufzeit fest.
+
+Zeitbasis ist die Host-Zeit (time.time()), weil millis des Sensors nach
+einem Neustart wieder bei 0 beginnen. Innerhalb eines Blocks werden die
+Abstände der Sensor-Zeit übernommen.
+"""
+
+import threading
+import time
+import numpy as np
+from sample_ring import SampleRing
+
+HISTORY_FIELDS = ("roll", "pitch", "yaw")
+LEVELS = (("1s", 1.0, 3600), ("1m", 60.0, 1440))   # (Name, Auflösung s, Slots)
+
+
+class _BucketLevel:
+    """Feste Bucket-Tabelle einer Auflösung (Slot = Bucket-Nummer % Slots)."""
+
+    def __init__(self, res: float, slots: int, fields):
+        self.res    = res
+        self.slots  = slots
+        self.fields = fields
+        k = len(fields)
+        self.ids = np.full(slots, -1, dtype=np.int64)
+        self.n   = np.zeros(slots, dtype=np.uint32)
+        self.min = np.zeros((slots, k), dtype=np.float32)
+        self.max = np.zeros((slots, k), dtype=np.float32)
+        self.sum = np.zeros((slots, k))
+
+    def add(self, t, vals):
+        """t: Host-Zeiten (aufsteigend), vals: N×Felder desselben Blocks."""
+        ids = np.floor(t / self.res).astype(np.int64)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(ids)) + 1))
+        gid = ids[starts]
+        s = gid % self.slots
+        # Slots mit älterer Bucket-Nummer neu beginnen
+        new = self.ids[s] != gid
+        if np.any(new):
+            sn = s[new]
+            self.ids[sn] = gid[new]
+            self.n[sn] = 0
+            self.min[sn] = np.inf
+            self.max[sn] = -np.inf
+            self.sum[sn] = 0.0
+        self.n[s]   += np.diff(np.append(starts, len(ids))).astype(np.uint32)
+        self.min[s]  = np.minimum(self.min[s], np.minimum.reduceat(vals, starts))
+        self.max[s]  = np.maximum(self.max[s], np.maximum.reduceat(vals, starts))
+        self.sum[s] += np.add.reduceat(vals, starts, dtype=float)
+
+    def query(self, t_from: float, t_to: float, now: float, fields) -> dict:
+        first = int(np.floor(t_from / self.res))
+        last  = int(np.floor(min(t_to, now) / self.res))
+        first = max(first, last - self.slots + 1)   # ältere Buckets sind überschrieben
+        ids = np.arange(first, last + 1, dtype=np.int64)
+        s = (ids % self.slots)[self.ids[ids % self.slots] == ids]
+        n = self.n[s]
+        out = {"t": (self.ids[s] * self.res).tolist(), "n": n.tolist()}
+        mean = self.sum[s] / np.maximum(n, 1)[:, None]
+        for f in fields:
+            k = self.fields.index(f)
+            out[f + "_min"]  = self.min[s, k].tolist()
+            out[f + "_max"]  = self.max[s, k].tolist()
+            out[f + "_mean"] = mean[:, k].tolist()
+        return out
+
+
+class SampleHistory:
+    """
+    ring:     SampleRing, aus dem ein Hintergrund-Thread liest
+              (None → Blöcke selbst per feed() übergeben)
+    fields:   gespeicherte Spalten (aus SAMPLE_DTYPE)
+    raw_span: Sekunden in voller Rate, max_rate: dafür reservierte Samples/s
+    """
+
+    def __init__(self, ring=None, fields=HISTORY_FIELDS, raw_span: float = 60.0,
+                 max_rate: float = 200.0, levels=LEVELS):
+        self.fields   = tuple(fields)
+        self.raw_span = raw_span
+        self.raw = SampleRing(int(raw_span * max_rate),
+                              dtype=[("t", "f8"), ("secs", "f8")] + [(f, "f4") for f in self.fields])
+        self.levels = {name: _BucketLevel(res, slots, self.fields) for name, res, slots in levels}
+        self.retention = {"raw": raw_span, **{name: res * slots for name, res, slots in levels}}
+        self._last_t = -np.inf
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.ring = ring
+        if ring is not None:
+            threading.Thread(target=self._run, daemon=True).start()
+
+    @property
+    def nbytes(self) -> int:
+        """Speicherbedarf aller Stufen in Bytes (fest, unabhängig von der Laufzeit)."""
+        return self.raw.nbytes + sum(l.ids.nbytes + l.n.nbytes + l.min.nbytes + l.max.nbytes
+                                     + l.sum.nbytes for l in self.levels.values())
+
+    def feed(self, rows, now: float = None):
+        """Übernimmt einen Block (SAMPLE_DTYPE); now = Host-Zeit des neuesten Samples."""
+        n = len(rows)
+        if n == 0:
+            return
+        now = time.time() if now is None else now
+        secs = rows["secs"]
+        t = now + (secs - secs[-1])
+        if n > 1 and (np.any(np.diff(secs) < 0) or t[0] < now - 10.0):
+            # Zeitsprung im Block (Sensor-Neustart, Lücke): gleichmäßig bis now
+            t = np.full(n, now)
+        t = np.maximum(t, self._last_t)    # Raw-Ring bleibt nach t sortiert
+        self._last_t = t[-1]
+        rec = np.empty(n, dtype=self.raw.dtype)
+        rec["t"], rec["secs"] = t, secs
+        for f in self.fields:
+            rec[f] = rows[f]
+        vals = np.column_stack([rows[f] for f in self.fields])
+        with self._lock:
+            self.raw.write(rec)
+            for level in self.levels.values():
+                level.add(t, vals)
+
+    def _run(self):
+        cursor = self.ring.head
+        while not self._stop.is_set():
+            self.ring.wait(cursor, 0.2)
+            rows, cursor, _ = self.ring.read(cursor)
+            self.feed(rows)
+
+    def stop(self):
+        self._stop.set()
+
+    def pick(self, t_from: float, now: float = None) -> str:
+        """Feinste Stufe, deren Aufbewahrungszeit bis t_from zurückreicht."""
+        now = time.time() if now is None else now
+        for name, span in self.retention.items():
+            if now - t_from <= span:
+                return name
+        return list(self.retention)[-1]
+
+    def query(self, t_from: float, t_to: float = None, res: str = None, fields=None) -> dict:
+        """
+        Verlauf zwischen t_from und t_to (Host-Zeit, Sekunden).
+        res: "raw", "1s", "1m" oder None (automatisch nach t_from).
+        Rückgabe spaltenweise: raw → t, secs, <Feld>; Buckets → t, n,
+        <Feld>_min/_max/_mean.
+        """
+        now = time.time()
+        t_to = now if t_to is None else t_to
+        res = res or self.pick(t_from, now)
+        fields = [f for f in (fields or self.fields) if f in self.fields]
+        with self._lock:
+            if res == "raw":
+                rows = self.raw.latest(self.raw.capacity)
+                rows = rows[rows["t"] >= now - self.raw_span]
+                i = np.searchsorted(rows["t"], t_from, side="left")
+                j = np.searchsorted(rows["t"], t_to, side="right")
+                rows = rows[i:j]
+                out = {"t": rows["t"].tolist(), "secs": rows["secs"].tolist()}
+                for f in fields:
+                    out[f] = rows[f].tolist()
+            else:
+                out = self.levels[res].query(t_from, t_to, now, fields)
+        out["res"] = res
+        return out
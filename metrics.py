@@ -0,0 +1,294 @@
+# metrics.py
+"""
+Kennzahlen im Prometheus-Textformat (0.0.4), ohne zusätzliche Abhängigkeit.
+
+Die Module legen ihre Metriken beim Import im gemeinsamen REGISTRY an und
+zählen im laufenden Betrieb nur hoch (Counter, Histogram) bzw. setzen Werte
+(Gauge). Was ohnehin als Zustand vorliegt (Queue-Tiefen, Clients, Raten),
+liest ein Callback erst beim Abruf (REGISTRY.collect) und kostet im
+Datenweg nichts. REGISTRY.render() liefert den Text für /metrics
+(app.py) bzw. start_http_server() für Prozesse ohne Flask (gui.py).
+
+    PROCESS_S = REGISTRY.histogram("nicla_process_seconds", "…", ("call",))
+    PROCESS_S.labels("process_batch").observe(dt)
+    REGISTRY.collect("nicla_queue_depth", "…", lambda: [(("hub",), hub.pending)],
+                     labels=("queue",))
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+# Sekunden, von 10 µs (ein Block) bis 10 s (Kalibrierungsphase)
+DEFAULT_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _fmt(v) -> str:
+    if isinstance(v, int):
+        return str(v)
+    if v == float("inf"):
+        return "+Inf"
+    if isinstance(v, float) and v.is_integer() and abs(v) < 1e15:
+        return str(int(v))
+    return repr(float(v))
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(names, values, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    """Gemeinsame Basis: Name, Hilfetext, Label-Namen und Kinder je Label-Wert."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, doc: str, labels: tuple = ()):
+        self.name     = name
+        self.doc      = doc
+        self.names    = tuple(labels)
+        self._lock    = threading.Lock()
+        self._children = {}
+        if not self.names:
+            self._children[()] = self._new()
+
+    def _new(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Kind-Metrik für diese Label-Werte (in der Reihenfolge von labels)."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.names):
+                raise ValueError(f"{self.name}: erwartet Labels {self.names}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new())
+        return child
+
+    def _default(self):
+        return self._children[()]
+
+    def lines(self) -> list:
+        out = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            out += child.lines(self.name, self.names, key)
+        return out
+
+
+class _Value:
+    """Ein Zahlenwert (Kind von Counter bzw. Gauge)."""
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self.value  = 0.0
+
+    def inc(self, v: float = 1.0):
+        with self._lock:
+            self.value += v
+
+    def dec(self, v: float = 1.0):
+        with self._lock:
+            self.value -= v
+
+    def set(self, v: float):
+        self.value = float(v)
+
+    def lines(self, name, names, key) -> list:
+        return [f"{name}{_label_str(names, key)} {_fmt(self.value)}"]
+
+
+class Counter(_Metric):
+    """Nur steigender Zähler (Name endet auf _total)."""
+
+    kind = "counter"
+
+    def _new(self):
+        return _Value()
+
+    def inc(self, v: float = 1.0):
+        self._default().inc(v)
+
+
+class Gauge(_Metric):
+    """Momentanwert, setz- und zählbar."""
+
+    kind = "gauge"
+
+    def _new(self):
+        return _Value()
+
+    def inc(self, v: float = 1.0):
+        self._default().inc(v)
+
+    def dec(self, v: float = 1.0):
+        self._default().dec(v)
+
+    def set(self, v: float):
+        self._default().set(v)
+
+
+class _Buckets:
+    """Kind eines Histogramms: Zählung je Klasse, Summe und Anzahl."""
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum    = 0.0
+        self._lock  = threading.Lock()
+
+    def observe(self, v: float):
+        i = bisect_left(self.bounds, v)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += v
+
+    def time(self):
+        """Kontextmanager: misst die Dauer des Blocks in Sekunden."""
+        return _Timer(self)
+
+    def lines(self, name, names, key) -> list:
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        out, acc = [], 0
+        for le, c in zip(self.bounds + (float("inf"),), counts):
+            acc += c
+            le_str = 'le="%s"' % _fmt(le)
+            out.append(f"{name}_bucket{_label_str(names, key, le_str)} {acc}")
+        out.append(f"{name}_sum{_label_str(names, key)} {_fmt(total)}")
+        out.append(f"{name}_count{_label_str(names, key)} {acc}")
+        return out
+
+
+class _Timer:
+    def __init__(self, target):
+        self.target = target
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.target.observe(time.perf_counter() - self.t0)
+
+
+class Histogram(_Metric):
+    """Verteilung (typisch Dauern in Sekunden) mit festen Klassengrenzen."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: tuple = (), buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(float(b) for b in buckets)
+        super().__init__(name, doc, labels)
+
+    def _new(self):
+        return _Buckets(self.bounds)
+
+    def observe(self, v: float):
+        self._default().observe(v)
+
+    def time(self):
+        return self._default().time()
+
+
+class _Collected:
+    """Werte, die ein Callback erst beim Abruf liefert (Gauge oder Counter)."""
+
+    def __init__(self, name: str, doc: str, fn, labels: tuple = (), kind: str = "gauge"):
+        self.name  = name
+        self.doc   = doc
+        self.fn    = fn
+        self.names = tuple(labels)
+        self.kind  = kind
+
+    def lines(self) -> list:
+        out = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            values = self.fn()
+        except Exception as e:   # ein fehlerhafter Callback darf /metrics nicht sperren
+            return out + [f"# Fehler: {type(e).__name__}: {e}"]
+        if not self.names:
+            values = [((), values)]
+        for key, v in values:
+            if v is not None:
+                out.append(f"{self.name}{_label_str(self.names, key)} {_fmt(v)}")
+        return out
+
+
+class Registry:
+    """Alle Metriken eines Prozesses; gleiche Namen liefern dieselbe Metrik."""
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._metrics = {}
+
+    def _get(self, cls, name, *args, **kw):
+        with self._lock:
+            m = self._metrics.get(name)
+            if m is None:
+                m = self._metrics[name] = cls(name, *args, **kw)
+            elif not isinstance(m, cls):
+                raise ValueError(f"Metrik {name} existiert bereits als {m.kind}")
+            return m
+
+    def counter(self, name: str, doc: str, labels: tuple = ()) -> Counter:
+        return self._get(Counter, name, doc, labels)
+
+    def gauge(self, name: str, doc: str, labels: tuple = ()) -> Gauge:
+        return self._get(Gauge, name, doc, labels)
+
+    def histogram(self, name: str, doc: str, labels: tuple = (),
+                  buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, doc, labels, buckets)
+
+    def collect(self, name: str, doc: str, fn, labels: tuple = (), kind: str = "gauge"):
+        """
+        Wert(e) beim Abruf aus fn(): ohne labels eine Zahl, sonst eine Liste
+        [(Label-Werte, Zahl), …]. Ein erneuter Aufruf ersetzt den Callback.
+        """
+        with self._lock:
+            self._metrics[name] = _Collected(name, doc, fn, labels, kind)
+
+    def render(self) -> str:
+        """Alle Metriken im Prometheus-Textformat."""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for _, m in metrics:
+            lines += m.lines()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY     = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def start_http_server(port: int, addr: str = "0.0.0.0", registry: Registry = REGISTRY):
+    """Liefert registry.render() unter http://addr:port/metrics (Hintergrund-Thread)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
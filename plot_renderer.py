@@ -0,0 +1,110 @@
+# plot_renderer.py
+"""
+Zeichnen der Live-Plots mit fester Bildrate, entkoppelt vom Sample-Takt.
+
+PlotRenderer zeichnet nur die bewegten Artists (Achsen-Linien im 3D-Plot,
+Roll-Kurve) per Blitting über einen gecachten Hintergrund. Ein kompletter
+Neuaufbau (Achsen, Ticks, Gitter) passiert nur, wenn sich Achsgrenzen
+ändern oder das Fenster neu gezeichnet wird (draw_event).
+
+AxisLimits / ScrollLimits liefern Achsgrenzen mit Hysterese, damit das nicht
+bei jedem Sample passiert.
+"""
+
+
+class AxisLimits:
+    """
+    Wertachse mit Hysterese: Die Grenzen ändern sich nur, wenn die Daten das
+    aktuelle Band verlassen oder das neue Band schmaler als 'shrink' des
+    aktuellen wäre. Neues Band = Datenbereich ± max(pad, pad_frac·Spanne).
+    """
+
+    def __init__(self, pad: float = 5.0, pad_frac: float = 0.25, shrink: float = 0.3):
+        self.pad      = pad
+        self.pad_frac = pad_frac
+        self.shrink   = shrink
+        self.lo = self.hi = None
+
+    def reset(self):
+        self.lo = self.hi = None
+
+    def update(self, lo: float, hi: float) -> bool:
+        """True, wenn sich die Grenzen geändert haben (→ neu zeichnen)."""
+        pad = max(self.pad, self.pad_frac * (hi - lo))
+        if (self.lo is not None and self.lo <= lo and hi <= self.hi
+                and (hi - lo + 2 * pad) >= self.shrink * (self.hi - self.lo)):
+            return False
+        self.lo, self.hi = lo - pad, hi + pad
+        return True
+
+
+class ScrollLimits:
+    """
+    Zeitachse, die seitenweise weiterspringt statt mit jedem Sample zu
+    scrollen: Läuft t über den rechten Rand, wird das Fenster [t0, t1] plus
+    'lead'·Spanne Vorlauf neu gesetzt.
+    """
+
+    def __init__(self, lead: float = 0.25):
+        self.lead = lead
+        self.lo = self.hi = None
+
+    def reset(self):
+        self.lo = self.hi = None
+
+    def update(self, t0: float, t1: float) -> bool:
+        if self.lo is not None and self.lo <= t1 <= self.hi:
+            return False
+        span = max(t1 - t0, 1e-3)
+        self.lo, self.hi = t0, t1 + self.lead * span
+        return True
+
+
+class PlotRenderer:
+    """
+    Zeichnet eine Figure mit Blitting.
+      artists: bewegte Artists (werden 'animated' und nur per draw_artist gezeichnet)
+      blit:    False → klassisch canvas.draw_idle() (z. B. für Backends ohne Blitting)
+    invalidate() erzwingt beim nächsten render() einen kompletten Neuaufbau.
+    """
+
+    def __init__(self, canvas, artists, blit: bool = True):
+        self.canvas  = canvas
+        self.artists = list(artists)
+        self.blit    = blit
+        self.frames     = 0   # gezeichnete Frames
+        self.full_draws = 0   # davon komplette Neuaufbauten
+        self._bg = None
+        # Achsen, deren Bereich pro Frame zurückkopiert wird
+        self._axes = list(dict.fromkeys(a.axes for a in self.artists))
+        if blit:
+            for a in self.artists:
+                a.set_animated(True)
+            canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        # nach jedem vollen Zeichnen (auch Resize) Hintergrund neu cachen
+        self._bg = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        fig = self.canvas.figure
+        for a in self.artists:
+            fig.draw_artist(a)
+
+    def invalidate(self):
+        self._bg = None
+
+    def render(self):
+        self.frames += 1
+        if not self.blit:
+            self.canvas.draw_idle()
+            return
+        if self._bg is None:
+            self.canvas.draw()   # löst draw_event aus → _on_draw
+            self.full_draws += 1
+            return
+        self.canvas.restore_region(self._bg)
+        self._draw_artists()
+        for ax in self._axes:
+            self.canvas.blit(ax.bbox)
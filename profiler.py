@@ -0,0 +1,130 @@
+# profiler.py
+"""
+Stichproben-Profiler für den laufenden Prozess (alle Threads).
+
+Ein Hintergrund-Thread liest alle interval Sekunden die aktuellen Stacks
+(sys._current_frames) und zählt sie. folded() liefert das Ergebnis im
+"collapsed"-Format von flamegraph.pl bzw. speedscope, eine Zeile je Stack:
+
+    MainThread;gui.py:_poll;gui.py:_render;… 42
+
+Der zu messende Code bleibt unverändert; die Kosten trägt nur der
+Profiler-Thread (bei 5 ms etwa 200 Stack-Abzüge pro Sekunde).
+
+    python profiler.py bench.folded bench.py --stages process   # Skript unter dem Profiler
+    flamegraph.pl bench.folded > bench.svg
+
+In app.py per /api/profile/start|stop bzw. NICLA_PROFILE, in gui.py per --profile.
+"""
+
+import collections
+import os
+import sys
+import threading
+import time
+
+DEFAULT_INTERVAL_S = 0.005
+MAX_DEPTH          = 64
+
+
+class SamplingProfiler:
+    """start()/stop() aus beliebigem Thread; folded()/dump() jederzeit."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_S):
+        self.interval = interval
+        self.stacks   = collections.Counter()
+        self.samples  = 0
+        self.started  = None
+        self.elapsed  = 0.0
+        self._thread  = None
+        self._stop    = threading.Event()
+        self._lock    = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = None):
+        """Beginnt (bzw. setzt fort) das Sammeln; bisherige Stacks bleiben."""
+        if interval:
+            self.interval = interval
+        if self.running:
+            return
+        self._stop.clear()
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self._loop, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self.elapsed += time.monotonic() - self.started
+        self.started = None
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.samples = 0
+        self.elapsed = 0.0
+
+    def _loop(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, frame in frames.items():
+                    if ident != me:
+                        self.stacks[self._stack(names.get(ident, str(ident)), frame)] += 1
+                self.samples += 1
+
+    @staticmethod
+    def _stack(thread: str, frame) -> str:
+        parts = []
+        while frame is not None and len(parts) < MAX_DEPTH:
+            code = frame.f_code
+            parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        parts.append(thread.replace(";", ":").replace(" ", "_"))
+        return ";".join(reversed(parts))
+
+    def folded(self) -> str:
+        """Gezählte Stacks im collapsed-Format (Wurzel links), häufigste zuerst."""
+        with self._lock:
+            items = self.stacks.most_common()
+        return "".join(f"{stack} {n}\n" for stack, n in items)
+
+    def dump(self, path: str) -> str:
+        with open(path, "w") as f:
+            f.write(self.folded())
+        return path
+
+    def info(self) -> dict:
+        elapsed = self.elapsed + (time.monotonic() - self.started if self.running else 0.0)
+        return {"running": self.running, "interval_s": self.interval,
+                "samples": self.samples, "stacks": len(self.stacks), "seconds": elapsed}
+
+
+if __name__ == "__main__":
+    import argparse, runpy
+    ap = argparse.ArgumentParser(description="Python-Skript mit Stichproben-Profiler ausführen")
+    ap.add_argument("out", help="Zieldatei (collapsed stacks, für flamegraph.pl/speedscope)")
+    ap.add_argument("script", help="auszuführendes Skript")
+    ap.add_argument("args", nargs=argparse.REMAINDER, help="Argumente des Skripts")
+    ap.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_S,
+                    help="Abstand der Stichproben in Sekunden")
+    a = ap.parse_args()
+    prof = SamplingProfiler(a.interval)
+    sys.argv = [a.script] + [x for x in a.args if x != "--"]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(a.script)))
+    prof.start()
+    try:
+        runpy.run_path(a.script, run_name="__main__")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        prof.stop()
+        prof.dump(a.out)
+        print(f"{prof.samples} Stichproben, {len(prof.stacks)} Stacks → {a.out}", file=sys.stderr)
@@ -0,0 +1,82 @@
+# quat_math.py
+"""
+Vektorisierte Quaternion-Mathematik auf NumPy-Arrays (N×4, Reihenfolge w,x,y,z).
+
+Die Formeln entsprechen exakt denen von pyquaternion (Hamilton-Produkt,
+Rotationsmatrix, yaw_pitch_roll), arbeiten aber auf ganzen Blöcken statt
+auf einzelnen Quaternion-Objekten.
+"""
+
+import numpy as np
+
+
+def quat_mul(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Hamilton-Produkt a * b, broadcastet über alle führenden Achsen."""
+    aw, ax, ay, az = np.moveaxis(np.asarray(a, dtype=float), -1, 0)
+    bw, bx, by, bz = np.moveaxis(np.asarray(b, dtype=float), -1, 0)
+    return np.stack((
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ), axis=-1)
+
+
+def quat_conj(q: np.ndarray) -> np.ndarray:
+    """Konjugierte Quaternionen (w, -x, -y, -z)."""
+    return np.asarray(q, dtype=float) * np.array([1.0, -1.0, -1.0, -1.0])
+
+
+def quat_inverse(q: np.ndarray) -> np.ndarray:
+    """Inverse q⁻¹ = conj(q) / |q|² (wie Quaternion.inverse)."""
+    q = np.asarray(q, dtype=float)
+    return quat_conj(q) / np.sum(q * q, axis=-1, keepdims=True)
+
+
+def quat_normalise(q: np.ndarray) -> np.ndarray:
+    """Normiert alle Quaternionen auf Länge 1 (Null-Quaternionen bleiben 0)."""
+    q = np.asarray(q, dtype=float)
+    n = np.linalg.norm(q, axis=-1, keepdims=True)
+    return np.divide(q, n, out=np.zeros_like(q), where=n > 0)
+
+
+def quat_left_matrix(q: np.ndarray) -> np.ndarray:
+    """
+    4×4-Matrix L(q) mit q * p = L(q) @ p (entspricht Quaternion._q_matrix).
+    Für einen Block P (N×4) gilt damit: q * P = P @ L(q).T
+    """
+    w, x, y, z = np.asarray(q, dtype=float)
+    return np.array([
+        [w, -x, -y, -z],
+        [x,  w, -z,  y],
+        [y,  z,  w, -x],
+        [z, -y,  x,  w]])
+
+
+def quat_rotation_matrix(q: np.ndarray) -> np.ndarray:
+    """Rotationsmatrizen (N×3×3) normierter Quaternionen."""
+    w, x, y, z = np.moveaxis(np.asarray(q, dtype=float), -1, 0)
+    ww, xx, yy, zz = w * w, x * x, y * y, z * z
+    R = np.empty(w.shape + (3, 3))
+    R[..., 0, 0] = ww + xx - yy - zz
+    R[..., 0, 1] = 2 * (x * y - w * z)
+    R[..., 0, 2] = 2 * (x * z + w * y)
+    R[..., 1, 0] = 2 * (x * y + w * z)
+    R[..., 1, 1] = ww - xx + yy - zz
+    R[..., 1, 2] = 2 * (y * z - w * x)
+    R[..., 2, 0] = 2 * (x * z - w * y)
+    R[..., 2, 1] = 2 * (y * z + w * x)
+    R[..., 2, 2] = ww - xx - yy + zz
+    return R
+
+
+def quat_yaw_pitch_roll(q: np.ndarray):
+    """
+    Yaw/Pitch/Roll (z-y'-x'', Radiant) normierter Quaternionen,
+    identisch zu Quaternion.yaw_pitch_roll.
+    """
+    w, x, y, z = np.moveaxis(np.asarray(q, dtype=float), -1, 0)
+    yaw   = np.arctan2(2 * (w * z - x * y), 1 - 2 * (y * y + z * z))
+    pitch = np.arcsin(np.clip(2 * (w * y + z * x), -1.0, 1.0))
+    roll  = np.arctan2(2 * (w * x - y * z), 1 - 2 * (x * x + y * y))
+    return yaw, pitch, roll
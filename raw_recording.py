@@ -0,0 +1,150 @@
+# raw_recording.py
+"""
+Aufzeichnung und Wiedergabe der Roh-Frames (millis + Quaternion), wie sie
+SerialCore._reader bzw. ViewerCore._notify an den DataProcessor übergeben.
+
+Dateiformat (.nraw):
+    Header  <4sHH8x> (16 Bytes) = b"NRAW", Version, Record-Größe
+    Records RAW_DTYPE (28 Bytes) = t_host (f8, time.time()), ms (u4),
+            q (4×f4: qx,qy,qz,qw)
+
+Mit ReplaySource/ReplayCore laufen app.py, gui.py, Benchmarks und
+Regressionstests ohne Nicla auf jedem Rechner.
+"""
+
+import os
+import struct
+import threading
+import time
+import numpy as np
+from serial_core import SerialCore
+
+RAW_MAGIC   = b"NRAW"
+RAW_VERSION = 1
+RAW_HEADER  = struct.Struct("<4sHH8x")
+RAW_DTYPE   = np.dtype([("t_host", "<f8"), ("ms", "<u4"), ("q", "<f4", 4)])
+
+
+class RawRecorder:
+    """Hängt Roh-Frames blockweise an eine .nraw-Datei an (thread-sicher)."""
+
+    def __init__(self, path: str):
+        self.path   = path
+        self.frames = 0
+        self._lock  = threading.Lock()
+        self._file  = open(path, "wb", buffering=64 * 1024)
+        self._file.write(RAW_HEADER.pack(RAW_MAGIC, RAW_VERSION, RAW_DTYPE.itemsize))
+
+    def write(self, ms_array, quat_array):
+        """ms_array: N millis, quat_array: N×4 (qx,qy,qz,qw)."""
+        rec = np.empty(len(ms_array), dtype=RAW_DTYPE)
+        rec["t_host"] = time.time()
+        rec["ms"]     = ms_array
+        rec["q"]      = quat_array
+        with self._lock:
+            if self._file:
+                self._file.write(rec.tobytes())
+                self.frames += len(rec)
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+def load_raw(path: str) -> np.ndarray:
+    """Lädt eine .nraw-Datei als Structured-Array (memory-mapped)."""
+    with open(path, "rb") as f:
+        magic, version, size = RAW_HEADER.unpack(f.read(RAW_HEADER.size))
+    if magic != RAW_MAGIC or size != RAW_DTYPE.itemsize:
+        raise ValueError(f"{path}: keine gültige NRAW-Datei (Version {version})")
+    # nur vollständige Records (Datei kann noch geschrieben werden)
+    n = (os.path.getsize(path) - RAW_HEADER.size) // RAW_DTYPE.itemsize
+    if n <= 0:
+        return np.zeros(0, dtype=RAW_DTYPE)
+    return np.memmap(path, dtype=RAW_DTYPE, mode="r", offset=RAW_HEADER.size, shape=(n,))
+
+
+class ReplaySource:
+    """
+    Speist eine Aufzeichnung in einen DataProcessor ein.
+      speed=1.0  Originalgeschwindigkeit (nach t_host)
+      speed=N    N-fach schneller
+      speed=0    so schnell wie möglich
+    Die Frames gehen blockweise (max. 'block' Frames) an process_batch.
+    """
+
+    def __init__(self, path: str, processor, speed: float = 1.0,
+                 block: int = 64, loop: bool = False):
+        self.rec       = load_raw(path)
+        self.processor = processor
+        self.speed     = speed
+        self.block     = block
+        self.loop      = loop
+        self.sent      = 0
+        self._stop     = threading.Event()
+        self._thread   = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Beendet die Wiedergabe und wartet auf den Thread, damit ein direkt
+        folgendes start() (Reconnect) eine neue Wiedergabe startet."""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def join(self, timeout: float = None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def run(self):
+        """Spielt die Aufzeichnung im aufrufenden Thread ab."""
+        rec, n = self.rec, len(self.rec)
+        if n == 0:
+            return
+        t_rec = rec["t_host"] - rec["t_host"][0]
+        while not self._stop.is_set():
+            t0, i = time.monotonic(), 0
+            while i < n and not self._stop.is_set():
+                if self.speed > 0:
+                    # alles bis zur aktuellen (skalierten) Aufnahmezeit senden
+                    now = (time.monotonic() - t0) * self.speed
+                    j = int(np.searchsorted(t_rec, now, side="right"))
+                    if j <= i:
+                        time.sleep(min((t_rec[i] - now) / self.speed, 0.05))
+                        continue
+                    j = min(j, i + self.block)
+                else:
+                    j = min(n, i + self.block)
+                chunk = rec[i:j]
+                self.processor.process_batch(chunk["ms"].astype(float),
+                                             chunk["q"].astype(float))
+                self.sent += j - i
+                i = j
+            if not self.loop:
+                break
+
+
+class ReplayCore(SerialCore):
+    """
+    SerialCore-Ersatz, der statt eines Ports eine .nraw-Aufzeichnung liest.
+    Kalibrierung, Ring und Status-Queue funktionieren wie bei SerialCore.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = True, q=None):
+        super().__init__(port=path, q=q)
+        self.replay = ReplaySource(path, self.processor, speed=speed, loop=loop)
+
+    def connect(self, port=None, baud=None):
+        self.replay.start()
+        return True
+
+    def disconnect(self):
+        self.replay.stop()
@@ -0,0 +1,121 @@
+# sample_ring.py
+"""
+Vorallokierter Ringpuffer (NumPy-Structured-Array) als Sample-Transport
+zwischen Reader-Thread und Konsumenten (GUI, SSE, WebSocket, Recorder …).
+
+Genau ein Thread schreibt (DataProcessor im Reader-Thread), beliebig viele
+lesen. Jeder Konsument merkt sich einen eigenen Cursor (Anzahl bisher
+gelesener Samples) und holt mit read() alles Neue als einen Block. Lesen
+braucht keinen Lock: der Schreiber kündigt vor dem Schreiben an, bis wohin
+er Slots überschreibt (_reserved), und veröffentlicht danach den neuen
+Stand (_head). Was ein Leser währenddessen kopiert hat und inzwischen
+überschrieben sein könnte, wird verworfen und als 'dropped' gemeldet.
+"""
+
+import threading
+import numpy as np
+
+# Spaltennamen = Schlüssel der bisherigen Sample-Dicts aus DataProcessor
+SAMPLE_DTYPE = np.dtype([
+    ("secs",   "f8"),
+    ("rate",   "f8"),
+    ("srate",  "f8"),
+    ("raw_qx", "f8"), ("raw_qy", "f8"), ("raw_qz", "f8"), ("raw_qw", "f8"),
+    ("raw_R",  "f8", (3, 3)),
+    ("qx",     "f8"), ("qy",     "f8"), ("qz",     "f8"), ("qw",     "f8"),
+    ("roll",   "f8"),
+    ("pitch",  "f8"),
+    ("yaw",    "f8"),
+    ("R",      "f8", (3, 3)),
+])
+
+
+def rows_to_dicts(rows: np.ndarray, fields=None) -> list:
+    """
+    Samples als Dicts wie früher aus der Queue (Matrizen als Listen),
+    optional nur mit den Schlüsseln aus fields.
+    """
+    names = [k for k in (fields or rows.dtype.names) if k in rows.dtype.names]
+    dicts = [dict(zip(names, vals)) for vals in rows[names].tolist()]
+    # Matrix-Felder liefert tolist() als ndarray → spaltenweise umwandeln
+    for k in names:
+        if rows.dtype[k].shape:
+            for d, v in zip(dicts, rows[k].tolist()):
+                d[k] = v
+    return dicts
+
+
+class SampleRing:
+    def __init__(self, capacity: int = 4096, dtype=SAMPLE_DTYPE):
+        self.capacity = capacity
+        self.dtype    = np.dtype(dtype)
+        self._data    = np.zeros(capacity, dtype=self.dtype)
+        self._head     = 0   # Anzahl veröffentlichter Samples (monoton)
+        self._reserved = 0   # bis hierhin wird gerade geschrieben
+        self._cond = threading.Condition()
+
+    @property
+    def head(self) -> int:
+        """Cursor hinter dem neuesten Sample (Startwert für neue Leser)."""
+        return self._head
+
+    @property
+    def nbytes(self) -> int:
+        """Speicherbedarf des Puffers in Bytes."""
+        return self._data.nbytes
+
+    def write(self, rows: np.ndarray):
+        """Hängt einen Block an (nur vom einen Schreiber-Thread aufrufen)."""
+        n = len(rows)
+        if n == 0:
+            return
+        head = self._head
+        if n > self.capacity:
+            head += n - self.capacity
+            rows = rows[-self.capacity:]
+            n = self.capacity
+        self._reserved = head + n
+        i = head % self.capacity
+        first = min(n, self.capacity - i)
+        self._data[i:i + first] = rows[:first]
+        if first < n:
+            self._data[:n - first] = rows[first:]
+        self._head = head + n
+        with self._cond:
+            self._cond.notify_all()
+
+    def read(self, cursor: int, max_items: int = None):
+        """
+        Alle Samples ab cursor als Kopie.
+        Rückgabe: (rows, neuer_cursor, dropped) – dropped zählt Samples, die
+        bereits überschrieben waren, bevor der Leser sie abholen konnte.
+        """
+        head = self._head
+        start = max(cursor, head - self.capacity)
+        dropped = start - cursor
+        if max_items is not None:
+            head = min(head, start + max_items)
+        if start >= head:
+            return self._data[:0].copy(), max(cursor, head), dropped
+        i, j = start % self.capacity, head % self.capacity
+        if i < j:
+            rows = self._data[i:j].copy()
+        else:
+            rows = np.concatenate((self._data[i:], self._data[:j]))
+        # Während des Kopierens überschriebene Slots verwerfen
+        lost = self._reserved - self.capacity - start
+        if lost > 0:
+            rows = rows[lost:]
+            dropped += lost
+        return rows, head, dropped
+
+    def latest(self, n: int) -> np.ndarray:
+        """Die neuesten n Samples (oder weniger)."""
+        return self.read(max(0, self._head - n))[0]
+
+    def wait(self, cursor: int, timeout: float = None) -> bool:
+        """Blockiert, bis Samples hinter cursor vorliegen (oder timeout)."""
+        if self._head > cursor:
+            return True
+        with self._cond:
+            return self._cond.wait_for(lambda: self._head > cursor, timeout)
@@ -0,0 +1,199 @@
+# sensor_manager.py
+"""
+Mehrere Nicla-Boards (mehrere Glocken) in einem Prozess.
+
+Jeder Sensor hat eine eigene Pipeline: Reader (SerialCore, ReplayCore oder
+eine BleLink-Verbindung) mit DataProcessor/Calibration und SampleRing, dazu
+SwingAnalyzer und SampleHistory. Gemeinsam sind die Status-Verteilung
+(ein BroadcastHub, jede Meldung trägt "sensor": <id>) und ein ViewerCore,
+dessen asyncio-Schleife alle BLE-Verbindungen bedient.
+
+Quellen als Text, z. B. in NICLA_SENSORS (kommagetrennt, id=quelle):
+    nord=/dev/ttyUSB0            seriell, CSV
+    sued=/dev/ttyUSB1@binary     seriell, Binär-Frames
+    mitte=ble:Nicla-3            BLE, erstes Gerät mit diesem Namensanfang
+    west=ble:AA:BB:CC:DD:EE:FF   BLE, feste Adresse (ohne Scan)
+    test=replay:glocke.nraw@4    Aufzeichnung, 4-fache Geschwindigkeit
+
+Zusätzlicher Speicher pro Sensor ist fest (Ring + Verlauf, siehe
+Sensor.nbytes); bench.py --stages sensors misst Speicher und Durchsatz.
+"""
+
+import re
+from broadcast import BroadcastHub
+from history import SampleHistory
+from swing_analysis import SwingAnalyzer
+
+SENSOR_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+BLE_ADDRESS_RE = re.compile(r"^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$|^[0-9A-Fa-f-]{36}$")
+
+
+class _TaggedQueue:
+    """Queue-Ersatz: reicht Meldungen mit der Sensor-ID markiert an q weiter."""
+
+    def __init__(self, q, sid: str):
+        self.q   = q
+        self.sid = sid
+
+    def put(self, item: dict, block: bool = True, timeout: float = None):
+        self.q.put({**item, "sensor": self.sid}, block, timeout)
+
+
+class Sensor:
+    """
+    Eine Quelle mit eigener Pipeline.
+      core:     SerialCore/ReplayCore/BleLink (ring, processor, *_calib, connect)
+      kind:     "serial", "replay" oder "ble"
+      target:   Port, Datei oder BLE-Name/-Adresse
+    """
+
+    def __init__(self, sid: str, kind: str, target: str, core):
+        self.id       = sid
+        self.kind     = kind
+        self.target   = target
+        self.core     = core
+        self.analyzer = SwingAnalyzer()
+        core.processor.analyzer = self.analyzer
+        self.history  = None
+
+    @property
+    def ring(self):
+        return self.core.ring
+
+    @property
+    def processor(self):
+        return self.core.processor
+
+    @property
+    def nbytes(self) -> int:
+        """Fester Speicher der Puffer dieses Sensors in Bytes."""
+        return self.ring.nbytes + (self.history.nbytes if self.history else 0)
+
+    def start(self, history: bool = True):
+        """Startet Verlauf (Hintergrund-Thread am Ring) und Verbindung."""
+        if history and self.history is None:
+            self.history = SampleHistory(self.ring)
+        return self.core.connect()
+
+    def stop(self):
+        if self.history:
+            self.history.stop()
+        self.core.disconnect()
+
+    def info(self) -> dict:
+        p = self.processor
+        out = {
+            "id":          self.id,
+            "kind":        self.kind,
+            "target":      self.target,
+            "samples":     self.ring.head,
+            "rate":        p.rate_hz,
+            "srate":       p.srate_hz,
+            "device_hz":   p.timing.device_hz,   # Rate in Sensor-Zeit
+            "dropped":     p.timing.dropped,
+            "calibrating": p.calib.collecting(),
+            "memory_kb":   self.nbytes / 1024,
+        }
+        if self.kind == "ble":
+            out["link"] = self.core.info()   # Abbrüche, Wiederverbindung, Verluste
+        return out
+
+
+class SensorManager:
+    """
+    Verwaltet die Sensoren eines Prozesses. hub erhält alle Status-Meldungen
+    (markiert mit der Sensor-ID); ohne Angabe wird ein eigener angelegt.
+    """
+
+    def __init__(self, hub=None):
+        self.hub = hub if hub is not None else BroadcastHub()
+        self.sensors = {}
+        self._ble = None
+
+    def __iter__(self):
+        return iter(self.sensors.values())
+
+    def __len__(self):
+        return len(self.sensors)
+
+    def __contains__(self, sid):
+        return sid in self.sensors
+
+    @property
+    def ble(self):
+        """Gemeinsamer ViewerCore aller BLE-Sensoren (beim ersten Bedarf)."""
+        if self._ble is None:
+            from viewer_core import ViewerCore
+            self._ble = ViewerCore()
+        return self._ble
+
+    def get(self, sid: str = None) -> Sensor:
+        """Sensor mit dieser ID, ohne ID der zuerst angelegte (KeyError, falls unbekannt)."""
+        if sid is None:
+            return next(iter(self.sensors.values()))
+        return self.sensors[sid]
+
+    def _add(self, sid: str, kind: str, target: str, core) -> Sensor:
+        sensor = Sensor(sid, kind, target, core)
+        self.sensors[sid] = sensor
+        return sensor
+
+    def _check(self, sid: str) -> _TaggedQueue:
+        if not SENSOR_ID_RE.match(sid):
+            raise ValueError(f"ungültige Sensor-ID '{sid}' (erlaubt: A-Z, a-z, 0-9, _ und -)")
+        if sid in self.sensors:
+            raise ValueError(f"Sensor '{sid}' existiert bereits")
+        return _TaggedQueue(self.hub, sid)
+
+    def add_serial(self, sid: str, port: str, baud: int = 115200,
+                   protocol: str = "csv", chunked: bool = True) -> Sensor:
+        from serial_core import SerialCore
+        q = self._check(sid)
+        core = SerialCore(port=port, baud=baud, protocol=protocol, chunked=chunked, q=q)
+        return self._add(sid, "serial", port, core)
+
+    def add_replay(self, sid: str, path: str, speed: float = 1.0) -> Sensor:
+        from raw_recording import ReplayCore
+        q = self._check(sid)
+        return self._add(sid, "replay", path, ReplayCore(path, speed=speed, q=q))
+
+    def add_ble(self, sid: str, name: str = "Nicla", address: str = None) -> Sensor:
+        q = self._check(sid)
+        link = self.ble.add_link(sid, q, name_prefix=name, address=address)
+        return self._add(sid, "ble", address or name, link)
+
+    def add(self, sid: str, source: str) -> Sensor:
+        """Legt einen Sensor aus einer Quellangabe an (Syntax siehe Modulkopf)."""
+        if source.startswith("ble:"):
+            target = source[4:]
+            if BLE_ADDRESS_RE.match(target):
+                return self.add_ble(sid, address=target)
+            return self.add_ble(sid, name=target or "Nicla")
+        if source.startswith("replay:"):
+            path, _, speed = source[7:].partition("@")
+            return self.add_replay(sid, path, float(speed) if speed else 1.0)
+        port, _, protocol = source.partition("@")
+        if protocol not in ("", "csv", "binary"):
+            raise ValueError(f"unbekanntes Protokoll '{protocol}' (csv oder binary)")
+        return self.add_serial(sid, port, protocol=protocol or "csv")
+
+    def add_spec(self, spec: str) -> list:
+        """Mehrere Sensoren aus 'id=quelle,id=quelle,…'."""
+        added = []
+        for item in filter(None, (s.strip() for s in spec.split(","))):
+            sid, sep, source = item.partition("=")
+            if not sep:
+                raise ValueError(f"Sensor-Angabe '{item}' braucht die Form id=quelle")
+            added.append(self.add(sid.strip(), source.strip()))
+        return added
+
+    def start(self, history: bool = True):
+        for sensor in self:
+            sensor.start(history)
+
+    def stop(self):
+        for sensor in self:
+            sensor.stop()
+
+    def info(self) -> list:
+        return [sensor.info() for sensor in self]
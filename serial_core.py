@@ -1,27 +1,55 @@
 # serial_core.py
 
 import threading, queue, time, serial
+import numpy as np
 from data_processor import DataProcessor
+from serial_protocol import FrameDecoder, LineDecoder, FRAME_SIZE
+from sample_ring import SampleRing
+from metrics import REGISTRY
+
+# kaputte CSV-Zeilen bzw. Binär-Frames (CRC) je Port
+PARSE_ERRORS = REGISTRY.counter("nicla_parse_errors_total",
+                                "Verworfene Zeilen/Frames beim seriellen Lesen", ("port",))
 
 class SerialCore:
-    def __init__(self, port="/dev/serial0", baud=115200):
+    def __init__(self, port="/dev/serial0", baud=115200, batch_size=64,
+                 protocol="csv", chunked=False, q=None):
         self.port = port
         self.baud = baud
+        # "csv": Textzeilen millis,qx,qy,qz,qw  |  "binary": Frames mit Sync + CRC
+        self.protocol = protocol
+        # CSV blockweise (LineDecoder) statt readline() pro Frame lesen
+        self.chunked  = chunked
+        self.decoder  = None
+        # max. Anzahl Frames, die gesammelt an process_batch gehen
+        self.batch_size = batch_size
         self.ser   = None
         self._stop = threading.Event()
-        self.q     = queue.Queue()
+        # Samples landen im Ring, Status-Meldungen in q (z. B. ein BroadcastHub)
+        self.ring  = SampleRing()
+        self.q     = q if q is not None else queue.Queue()
         # DataProcessor übernimmt Kalibrierung & Winkel‐Berechnung
-        self.processor = DataProcessor(queue=self.q)
+        self.processor = DataProcessor(queue=None, ring=self.ring)
 
-    def connect(self):
+    def connect(self, port=None, baud=None):
         """Öffnet den seriellen Port und startet den Reader‐Thread."""
+        self.port = port or self.port
+        self.baud = baud or self.baud
         try:
             self.ser = serial.Serial(self.port, self.baud, timeout=1)
         except serial.SerialException as e:
             print("SerialCore: Port open error:", e)
             return False
         self._stop.clear()
-        threading.Thread(target=self._reader, daemon=True).start()
+        if self.protocol == "binary":
+            self.decoder = FrameDecoder()
+            reader, args = self._reader_blocks, (FRAME_SIZE,)
+        elif self.chunked:
+            self.decoder = LineDecoder()
+            reader, args = self._reader_blocks, (1,)
+        else:
+            reader, args = self._reader, ()
+        threading.Thread(target=reader, args=args, daemon=True).start()
         return True
 
     def disconnect(self):
@@ -30,19 +58,54 @@ class SerialCore:
             self.ser.close()
 
     def _reader(self):
-        """Liest Zeilen im CSV-Format: millis,qx,qy,qz,qw"""
+        """
+        Liest Zeilen im CSV-Format: millis,qx,qy,qz,qw
+        Frames werden gesammelt, solange weitere Bytes im Eingangspuffer
+        liegen, und dann als Block an DataProcessor.process_batch übergeben.
+        """
+        block = []
+        errors = PARSE_ERRORS.labels(self.port)
         while not self._stop.is_set() and self.ser and self.ser.is_open:
             line = self.ser.readline().decode(errors="ignore").strip()
             parts = line.split(",")
-            if len(parts) != 5:
-                continue
-            try:
-                ms  = int(float(parts[0]))
-                qx, qy, qz, qw = map(float, parts[1:])
-            except ValueError:
+            if len(parts) == 5:
+                try:
+                    ms  = int(float(parts[0]))
+                    qx, qy, qz, qw = map(float, parts[1:])
+                    block.append((ms, qx, qy, qz, qw))
+                except ValueError:
+                    errors.inc()
+            elif line:
+                errors.inc()
+            if block and (len(block) >= self.batch_size or not self.ser.in_waiting):
+                self._flush(block)
+                block = []
+
+    def _reader_blocks(self, min_read):
+        """
+        Blockweises Lesen für self.decoder (LineDecoder oder FrameDecoder):
+        alles, was im Eingangspuffer liegt, mindestens aber min_read Bytes.
+        Ein Aufruf von decoder.feed liefert alle darin enthaltenen Frames.
+        """
+        errors, seen = PARSE_ERRORS.labels(self.port), 0
+        while not self._stop.is_set() and self.ser and self.ser.is_open:
+            data = self.ser.read(max(self.ser.in_waiting, min_read))
+            if not data:
                 continue
-            # Verarbeite jeden Frame direkt durch DataProcessor
-            self.processor.process(ms, qx, qy, qz, qw)
+            ms, quat = self.decoder.feed(data)
+            # Fehlerzähler des Decoders (CRC bzw. kaputte Zeilen) nachführen
+            bad = getattr(self.decoder, "crc_errors", None)
+            bad = self.decoder.malformed if bad is None else bad
+            if bad != seen:
+                errors.inc(bad - seen)
+                seen = bad
+            if len(ms):
+                self.processor.process_batch(ms, quat)
+
+    def _flush(self, block):
+        """Übergibt gesammelte Frames (ms,qx,qy,qz,qw) an den DataProcessor."""
+        arr = np.asarray(block, dtype=float)
+        self.processor.process_batch(arr[:, 0], arr[:, 1:])
 
     # Umbau der Kalibrierungs-Hooks für Web-API
     def swing_calib(self, dur=10.0):
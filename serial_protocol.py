@@ -0,0 +1,375 @@
+# serial_protocol.py
+"""
+Decoder für die Strecken Nicla → Host: CSV-Zeilen und Binär-Frames über
+UART, Notifications über BLE.
+
+CSV-Zeile:  millis,qx,qy,qz,qw\r\n
+
+Frame (23 Bytes, little-endian):
+    0xA5 | <Iffff> millis,qx,qy,qz,qw (20 Bytes) | CRC-16 (2 Bytes)
+
+Die Nutzdaten entsprechen einem BLE-Sample. Die CRC ist CRC-16/CCITT-FALSE
+(Polynom 0x1021, Startwert 0xFFFF) über die 20 Nutzbytes; auf dem Host
+rechnet sie binascii.crc_hqx in C.
+
+BLE-Notification, zwei Formate (an der Länge unterscheidbar):
+    einzeln:   k × <Iffff>                                 (Länge % 20 == 0)
+    Batch:     0xB5 | Anzahl n (u8) | Sequenz (u16) | n × <Iffff>
+                                                           (Länge % 20 == 4)
+Die Sequenz zählt Notifications (mod 65536); daraus erkennt BleDecoder
+verlorene und doppelte Pakete. Ein Rücksprung um mehr als REORDER_PACKETS
+bzw. der Sensor-Zeit um mehr als RESTART_MS gilt als Neustart des Boards. In eine Notification passen
+batch_capacity(mtu) Samples, bei MTU 247 also 12.
+"""
+
+import binascii
+import io
+import struct
+import time
+import numpy as np
+from timing import RESTART_MS
+
+SYNC         = 0xA5
+PAYLOAD_FMT  = "<Iffff"
+PAYLOAD_SIZE = struct.calcsize(PAYLOAD_FMT)   # 20
+FRAME_SIZE   = 1 + PAYLOAD_SIZE + 2          # 23
+PAYLOAD_DTYPE = np.dtype([("ms", "<u4"), ("q", "<f4", 4)])
+
+_SYNC_BYTES = bytes([SYNC])
+
+
+def crc16(payload: bytes) -> int:
+    """CRC-16/CCITT-FALSE über die Nutzdaten eines Frames."""
+    return binascii.crc_hqx(payload, 0xFFFF)
+
+
+def encode_frame(ms: int, qx: float, qy: float, qz: float, qw: float) -> bytes:
+    """Baut einen Frame wie die Firmware (für Tests, Replay und Benchmarks)."""
+    payload = struct.pack(PAYLOAD_FMT, ms, qx, qy, qz, qw)
+    return _SYNC_BYTES + payload + struct.pack("<H", crc16(payload))
+
+
+class FrameDecoder:
+    """
+    Resynchronisierender Decoder für den Binär-Stream.
+    feed() nimmt beliebig zerstückelte Bytes entgegen und liefert alle darin
+    vollständig enthaltenen, CRC-gültigen Frames als Arrays. Bei CRC-Fehlern
+    wird ein Byte verworfen und ab dem nächsten Sync-Byte neu aufgesetzt.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self.frames        = 0   # gültige Frames
+        self.crc_errors    = 0   # verworfene Frames (CRC falsch)
+        self.skipped_bytes = 0   # Bytes außerhalb eines Frames
+        self.bytes         = 0   # insgesamt gelesene Bytes
+
+    def feed(self, data: bytes):
+        """
+        Hängt data an den Puffer an und decodiert alle vollständigen Frames.
+        Rückgabe: (ms, quat) mit ms als Array der Länge N und quat als
+        N×4-Array in Sensor-Reihenfolge (qx,qy,qz,qw).
+        """
+        buf = self._buf
+        buf += data
+        self.bytes += len(data)
+        good = bytearray()
+        pos, end = 0, len(buf)
+        while end - pos >= FRAME_SIZE:
+            if buf[pos] != SYNC:
+                nxt = buf.find(_SYNC_BYTES, pos + 1)
+                if nxt < 0:
+                    self.skipped_bytes += end - pos
+                    pos = end
+                    break
+                self.skipped_bytes += nxt - pos
+                pos = nxt
+                continue
+            payload = bytes(buf[pos + 1:pos + 1 + PAYLOAD_SIZE])
+            crc = buf[pos + FRAME_SIZE - 2] | (buf[pos + FRAME_SIZE - 1] << 8)
+            if crc16(payload) == crc:
+                good += payload
+                pos += FRAME_SIZE
+            else:
+                self.crc_errors    += 1
+                self.skipped_bytes += 1
+                pos += 1
+        del buf[:pos]
+
+        rec = np.frombuffer(bytes(good), dtype=PAYLOAD_DTYPE)
+        self.frames += len(rec)
+        return rec["ms"].astype(float), rec["q"].astype(float)
+
+
+def _empty():
+    return np.empty(0), np.empty((0, 4))
+
+
+BATCH_MAGIC  = 0xB5
+BATCH_HEADER = struct.Struct("<BBH")   # Magic, Anzahl, Sequenz
+SEQ_MOD      = 1 << 16
+REORDER_PACKETS = 64   # so weit zurück gilt ein Paket als doppelt/verspätet
+_PAYLOAD     = struct.Struct(PAYLOAD_FMT)
+
+
+def batch_capacity(mtu: int) -> int:
+    """Samples pro Batch-Notification bei gegebener ATT-MTU (3 Bytes ATT-Header)."""
+    return min((mtu - 3 - BATCH_HEADER.size) // PAYLOAD_SIZE, 255)
+
+
+def encode_batch(seq: int, ms, quat) -> bytes:
+    """Baut eine Batch-Notification wie die Firmware (für Tests, Replay und Benchmarks)."""
+    rec = np.empty(len(ms), dtype=PAYLOAD_DTYPE)
+    rec["ms"], rec["q"] = ms, quat
+    return BATCH_HEADER.pack(BATCH_MAGIC, len(rec), seq % SEQ_MOD) + rec.tobytes()
+
+
+class BleDecoder:
+    """
+    Decoder für BLE-Notifications, einzeln (k × 20 Bytes) oder als Batch mit
+    Sequenznummer. feed() bekommt genau eine Notification und liefert
+    (ms, quat) wie FrameDecoder.feed, ohne Python-Schleife pro Sample.
+    Zähler: lost_packets/lost_samples (Sequenzlücken, Samples geschätzt aus
+    der Größe des folgenden Pakets), duplicates (Sequenz schon gesehen,
+    Paket verworfen), malformed (unpassende Länge oder Kopf), restarts
+    (Sequenz springt weiter als REORDER_PACKETS zurück oder die Sensor-Zeit
+    um mehr als RESTART_MS: neuer Bezug, weder Duplikat noch Verlust).
+    """
+
+    def __init__(self):
+        self.packets      = 0
+        self.samples      = 0
+        self.lost_packets = 0
+        self.lost_samples = 0
+        self.duplicates   = 0
+        self.malformed    = 0
+        self.restarts     = 0
+        self.batched      = False   # zuletzt Batch-Format empfangen
+        self._seq = None
+        self._ms  = None            # Sensor-Zeit des letzten Batch-Samples
+
+    def reset(self):
+        """Vergisst die letzte Sequenz (neue Verbindung, Neustart des Sensors)."""
+        self._seq = None
+        self._ms  = None
+
+    def feed(self, data: bytes):
+        size = len(data)
+        if size == PAYLOAD_SIZE:
+            # häufigster Fall im Einzelformat: struct ist hier schneller als frombuffer
+            row = np.array(_PAYLOAD.unpack(data), dtype=float)
+            self.batched = False
+            self.packets += 1
+            self.samples += 1
+            return row[:1], row[None, 1:]
+        if size and size % PAYLOAD_SIZE == 0:
+            # Einzelformat: ohne Sequenz, Verluste nur über die Sensor-Zeit sichtbar
+            rec = np.frombuffer(data, dtype=PAYLOAD_DTYPE)
+            self.batched = False
+        elif size % PAYLOAD_SIZE == BATCH_HEADER.size and data[0] == BATCH_MAGIC:
+            _, n, seq = BATCH_HEADER.unpack_from(data)
+            if n * PAYLOAD_SIZE != size - BATCH_HEADER.size:
+                self.malformed += 1
+                return _empty()
+            rec = np.frombuffer(data, dtype=PAYLOAD_DTYPE, count=n, offset=BATCH_HEADER.size)
+            if self._seq is not None:
+                step = (seq - self._seq) % SEQ_MOD
+                if n and self._ms is not None and rec["ms"][0] < self._ms - RESTART_MS:
+                    self.restarts += 1             # Sensor-Zeit springt zurück
+                elif step == 0 or step >= SEQ_MOD - REORDER_PACKETS:
+                    self.duplicates += 1           # doppelt oder verspätet
+                    return _empty()
+                elif step >= SEQ_MOD // 2:
+                    self.restarts += 1             # Sequenz springt weit zurück
+                else:
+                    self.lost_packets += step - 1
+                    self.lost_samples += (step - 1) * n
+            self._seq = seq
+            if n:
+                self._ms = float(rec["ms"][-1])
+            self.batched = True
+        else:
+            self.malformed += 1
+            return _empty()
+        self.packets += 1
+        self.samples += len(rec)
+        return rec["ms"].astype(float), rec["q"].astype(float)
+
+    def stats(self) -> dict:
+        return {"packets": self.packets, "samples": self.samples, "batched": self.batched,
+                "lost_packets": self.lost_packets, "lost_samples": self.lost_samples,
+                "duplicates": self.duplicates, "malformed": self.malformed,
+                "restarts": self.restarts}
+
+
+class LineDecoder:
+    """
+    Blockweiser Parser für CSV-Zeilen millis,qx,qy,qz,qw.
+    feed() sammelt Bytes in einem wiederverwendeten Puffer, trennt alle
+    vollständigen Zeilen auf einmal ab (eine angefangene Zeile bleibt für den
+    nächsten Aufruf liegen) und parst den Block in einem np.loadtxt-Aufruf.
+    Enthält der Block fehlerhafte Zeilen, wird zeilenweise nachgeparst und
+    jede kaputte Zeile in 'malformed' gezählt.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self.lines     = 0   # gültige Zeilen
+        self.malformed = 0   # verworfene Zeilen
+        self.bytes     = 0   # insgesamt gelesene Bytes
+
+    def feed(self, data: bytes):
+        """
+        Rückgabe: (ms, quat) wie FrameDecoder.feed – ms als Array der Länge N,
+        quat als N×4-Array in Sensor-Reihenfolge (qx,qy,qz,qw).
+        """
+        buf = self._buf
+        buf += data
+        self.bytes += len(data)
+        cut = buf.rfind(b"\n")
+        if cut < 0:
+            return _empty()
+        rows = buf[:cut].decode("ascii", errors="replace").split("\n")
+        del buf[:cut + 1]
+
+        try:
+            arr = np.loadtxt(rows, delimiter=",", ndmin=2)
+            if arr.size and arr.shape[1] != 5:
+                raise ValueError("falsche Spaltenzahl")
+        except ValueError:
+            arr = self._parse_rows(rows)
+        if not arr.size:
+            return _empty()
+        self.lines += len(arr)
+        return arr[:, 0], arr[:, 1:]
+
+    def _parse_rows(self, rows):
+        """Langsamer Pfad: einzeln parsen, kaputte Zeilen zählen."""
+        good = []
+        for row in rows:
+            parts = row.strip().split(",")
+            if parts == [""]:
+                continue
+            if len(parts) != 5:
+                self.malformed += 1
+                continue
+            try:
+                good.append([float(p) for p in parts])
+            except ValueError:
+                self.malformed += 1
+        return np.array(good, dtype=float).reshape(-1, 5)
+
+
+def _bench_readline(data: bytes) -> int:
+    """Referenz: Parsing wie der bisherige zeilenweise SerialCore._reader."""
+    src, n = io.BytesIO(data), 0
+    for raw in iter(src.readline, b""):
+        parts = raw.decode(errors="ignore").strip().split(",")
+        if len(parts) != 5:
+            continue
+        try:
+            ms = int(float(parts[0]))
+            qx, qy, qz, qw = map(float, parts[1:])
+        except ValueError:
+            continue
+        n += 1
+    return n
+
+
+def _bench_decoder(decoder, data: bytes, chunk: int) -> int:
+    n = 0
+    for i in range(0, len(data), chunk):
+        n += len(decoder.feed(data[i:i + chunk])[0])
+    return n
+
+
+def benchmark(data: bytes, chunk: int = 4096) -> dict:
+    """
+    Vergleicht Durchsatz und CPU-Zeit der Parser auf einem aufgezeichneten
+    Byte-Stream (z. B. Mitschnitt von /dev/serial0).
+    """
+    binary = data[:1] == bytes([SYNC])
+    runs = {"decoder": lambda: _bench_decoder(
+        FrameDecoder() if binary else LineDecoder(), data, chunk)}
+    if not binary:
+        runs["readline"] = lambda: _bench_readline(data)
+    result = {}
+    for name, fn in runs.items():
+        w0, c0 = time.perf_counter(), time.process_time()
+        frames = fn()
+        wall, cpu = time.perf_counter() - w0, time.process_time() - c0
+        result[name] = {
+            "frames":       frames,
+            "wall_s":       wall,
+            "cpu_s":        cpu,
+            "frames_per_s": frames / wall if wall > 0 else 0.0,
+            "mb_per_s":     len(data) / wall / 1e6 if wall > 0 else 0.0,
+        }
+    return result
+
+
+def selftest():
+    """Prüft BleDecoder mit synthetischen Notifications (python serial_protocol.py --selftest)."""
+    q = np.array([[0.1, 0.2, 0.3, 0.9]] * 12)
+    ms = np.arange(12) * 10
+
+    # Einzelformat: ein und mehrere Samples pro Notification
+    dec = BleDecoder()
+    m, qq = dec.feed(struct.pack(PAYLOAD_FMT, 1234, *q[0]))
+    assert m.tolist() == [1234.0] and np.allclose(qq, q[:1])
+    m, _ = dec.feed(b"".join(struct.pack(PAYLOAD_FMT, int(t), *q[0]) for t in ms[:3]))
+    assert m.tolist() == [0.0, 10.0, 20.0] and not dec.batched
+
+    # Batch: Reihenfolge, Verlust, Duplikat, verspätetes Paket, Überlauf der Sequenz
+    dec = BleDecoder()
+    m, qq = dec.feed(encode_batch(65534, ms, q))
+    assert np.array_equal(m, ms) and np.allclose(qq, q, atol=1e-7) and dec.batched
+    assert len(dec.feed(encode_batch(65535, ms + 120, q))[0]) == 12
+    assert len(dec.feed(encode_batch(0, ms + 240, q))[0]) == 12            # 65535 → 0
+    assert len(dec.feed(encode_batch(0, ms + 240, q))[0]) == 0             # Duplikat
+    assert len(dec.feed(encode_batch(3, ms[:4] + 600, q[:4]))[0]) == 4     # 1, 2 fehlen
+    assert len(dec.feed(encode_batch(2, ms + 480, q))[0]) == 0             # verspätet
+    assert (dec.lost_packets, dec.lost_samples, dec.duplicates) == (2, 8, 2)
+
+    # kaputte Notifications
+    good = encode_batch(4, ms[:2], q[:2])
+    for bad in (good[:-1], b"\x00" + good[1:], good[:1] + b"\x05" + good[2:], b"\xb5\x00", b""):
+        assert len(dec.feed(bad)[0]) == 0
+    assert dec.malformed == 5 and dec.packets == 4
+    assert batch_capacity(23) == 0 and batch_capacity(247) == 12 and batch_capacity(517) == 25
+
+    # Neustart: Sequenz beginnt wieder bei 0 (kurz nach 100 bzw. weit nach 40000)
+    dec = BleDecoder()
+    for k in range(95, 101):
+        dec.feed(encode_batch(k, ms + 120 * k + 60000, q))
+    got = sum(len(dec.feed(encode_batch(k, ms + 120 * k, q))[0]) for k in range(50))
+    assert got == 50 * 12 and dec.restarts == 1 and dec.duplicates == 0
+    assert dec.lost_packets == 0
+    dec = BleDecoder()
+    dec.feed(encode_batch(40000, ms + 4_800_000, q))
+    assert len(dec.feed(encode_batch(0, ms, q))[0]) == 12
+    assert dec.restarts == 1 and dec.lost_packets == 0
+    # ohne Zeitsprung: Rücksprung der Sequenz allein reicht
+    dec = BleDecoder()
+    dec.feed(encode_batch(100, ms, q))
+    assert len(dec.feed(encode_batch(0, ms + 120, q))[0]) == 12 and dec.restarts == 1
+    dec.reset()
+    assert len(dec.feed(encode_batch(500, ms + 240, q))[0]) == 12 and dec.lost_packets == 0
+    return True
+
+
+if __name__ == "__main__":
+    import argparse, json
+    ap = argparse.ArgumentParser(description="Parser-Benchmark auf einem Byte-Mitschnitt")
+    ap.add_argument("file", nargs="?", help="Mitschnitt des seriellen Streams (CSV oder Binär)")
+    ap.add_argument("--chunk", type=int, default=4096, help="Blockgröße pro feed()")
+    ap.add_argument("--selftest", action="store_true", help="BLE-Decoder mit synthetischen Daten prüfen")
+    args = ap.parse_args()
+    if args.selftest:
+        selftest()
+        print("selftest ok")
+    elif args.file:
+        with open(args.file, "rb") as f:
+            print(json.dumps(benchmark(f.read(), args.chunk), indent=2))
+    else:
+        ap.error("Mitschnitt oder --selftest angeben")
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# session_analysis.py
+"""
+Offline-Auswertung aufgezeichneter Sitzungen (gui.py „Start Aufnahme“):
+CSV-Dateien und .nrec-Aufnahmen aus session_recording.py.
+
+Spalten: secs,roll,pitch,yaw,qx,qy,qz,qw
+
+load_session() liest nur secs und roll, blockweise (chunk_rows Zeilen pro
+np.loadtxt-Aufruf), sodass auch stundenlange Aufzeichnungen nicht als Text im
+Speicher stehen. Mit cache=True wird daneben eine .npy-Datei (N×2, float64)
+abgelegt und beim nächsten Mal per Memory-Map geöffnet.
+
+analyze() berechnet vektorisiert dieselben Kennwerte wie SwingAnalyzer
+(swing_analysis.py), aber über die ganze Sitzung:
+  - Mittellagen-Durchgänge mit Hysterese, Zeitpunkt linear interpoliert
+  - ein Umkehrpunkt je Halbschwingung, per Parabel interpoliert
+  - Periodendauer/Frequenz (Median) aus gleichsinnigen Durchgängen, zusätzlich die
+    Frequenz des Welch-Spektrums
+  - Tabelle je Schwingung (SWING_DTYPE) und log. Dekrement per Ausgleichsgerade
+    durch log(Amplitude) aller Schwingungen deutlich über der Hysterese
+
+Kommandozeile (Verzeichnisse werden parallel in einem Prozess-Pool ausgewertet):
+    python session_analysis.py nicla_20250101_120000.csv --swings
+    python session_analysis.py aufnahmen/ --jobs 4 --json > ergebnis.json
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import itertools
+import json
+import math
+import os
+import numpy as np
+from session_recording import load_rec, is_part
+
+COLUMNS = ("secs", "roll", "pitch", "yaw", "qx", "qy", "qz", "qw")
+
+SWING_DTYPE = np.dtype([
+    ("t_start",        "f8"),   # Durchgang aufwärts, Beginn der Schwingung
+    ("period",         "f8"),
+    ("freq",           "f8"),
+    ("peak_pos",       "f8"),   # Umkehrpunkt der positiven Halbschwingung
+    ("peak_neg",       "f8"),
+    ("amplitude",      "f8"),   # halbe Spitze-Spitze
+    ("asymmetry",      "f8"),   # Mitte der Umkehrpunkte / Amplitude
+    ("time_asymmetry", "f8"),   # (t_pos - t_neg) / Periode
+])
+
+
+# ---------------------------------------------------------------------------
+# Einlesen
+# ---------------------------------------------------------------------------
+
+def load_session(path: str, chunk_rows: int = 100_000, cache: bool = False):
+    """
+    Liest secs und roll einer CSV-Sitzung. Rückgabe: (secs, roll) als float64.
+    Leere oder kaputte Zeilen am Ende (abgebrochene Aufnahme) werden ignoriert.
+    .nrec-Aufnahmen (session_recording.py) werden direkt spaltenweise gelesen.
+    """
+    if path.endswith(".nrec"):
+        rec = load_rec(path, ["secs", "roll"])
+        return rec["secs"].astype(float), rec["roll"].astype(float)
+    npy = path + ".npy"
+    if cache and os.path.exists(npy) and os.path.getmtime(npy) >= os.path.getmtime(path):
+        data = np.load(npy, mmap_mode="r")
+        return data[:, 0], data[:, 1]
+
+    blocks = []
+    with open(path, "r", newline="") as f:
+        first = f.readline()
+        header = first.strip().split(",")
+        names = header if "roll" in header else COLUMNS   # ohne Kopfzeile: Standardspalten
+        cols = (names.index("secs"), names.index("roll"))
+        lines = f if "roll" in header else itertools.chain([first], f)
+        while True:
+            rows = list(itertools.islice(lines, chunk_rows))
+            if not rows:
+                break
+            blocks.append(_parse_rows(rows, cols))
+    data = np.concatenate(blocks) if blocks else np.empty((0, 2))
+
+    if cache:
+        np.save(npy, data)
+    return data[:, 0], data[:, 1]
+
+
+def _parse_rows(rows, cols):
+    try:
+        return np.loadtxt(rows, delimiter=",", usecols=cols, ndmin=2)
+    except ValueError:
+        # Langsamer Pfad nur für den betroffenen Block
+        good = []
+        for row in rows:
+            parts = row.split(",")
+            try:
+                good.append((float(parts[cols[0]]), float(parts[cols[1]])))
+            except (ValueError, IndexError):
+                continue
+        return np.array(good, dtype=float).reshape(-1, 2)
+
+
+# ---------------------------------------------------------------------------
+# Schwingungen
+# ---------------------------------------------------------------------------
+
+def _vertex(t, v, i):
+    """
+    Vektorisierte Variante von swing_analysis._vertex: Scheitel der Parabel
+    durch (i-1, i, i+1) für alle Indizes i; am Rand bzw. ohne sauberes
+    Extremum bleibt das Sample selbst.
+    """
+    n = len(v)
+    i0, i2 = np.clip(i - 1, 0, n - 1), np.clip(i + 1, 0, n - 1)
+    a, b = t[i0] - t[i], t[i2] - t[i]
+    d0, d2 = v[i0] - v[i], v[i2] - v[i]
+    den = a * b * (a - b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        A = (b * d0 - a * d2) / den
+        B = (a * a * d2 - b * b * d0) / den
+        dt = -B / (2 * A)
+    ok = (den != 0) & (A != 0) & (a <= dt) & (dt <= b)
+    dt = np.where(ok, dt, 0.0)
+    return t[i] + dt, np.where(ok, v[i] + B * dt / 2, v[i])
+
+
+def _half_waves(secs, roll, center, hysteresis):
+    """
+    Bestätigte Halbschwingungen wie SwingAnalyzer._confirm.
+    Rückgabe: Durchgangszeiten tc (M), Richtungen (M, ±1) und die
+    Umkehrpunkte (t, v) der M-1 abgeschlossenen Halbschwingungen.
+    """
+    d = roll - center
+    state = np.where(d > hysteresis, 1, np.where(d < -hysteresis, -1, 0))
+    nz = np.flatnonzero(state)
+    if len(nz) == 0:
+        e = np.empty(0)
+        return e, e.astype(int), e, e
+    sv = state[nz]
+    first = np.concatenate(([0], np.flatnonzero(np.diff(sv)) + 1))
+    k, dirs = nz[first], sv[first]          # Index und Richtung jeder Bestätigung
+
+    # letzter Vorzeichenwechsel von d bis einschließlich k → interpolierter Durchgang
+    above = d > 0
+    sc = np.flatnonzero(above[1:] != above[:-1]) + 1
+    j = np.searchsorted(sc, k, side="right") - 1
+    has = j >= 0
+    jj = sc[np.where(has, j, 0)] if len(sc) else np.zeros_like(k)
+    has &= jj > np.concatenate(([-1], k[:-1]))
+    j1, j0 = jj, np.maximum(jj - 1, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tc = secs[j0] - d[j0] * (secs[j1] - secs[j0]) / (d[j1] - d[j0])
+    tc = np.where(has, tc, secs[k])
+
+    # Extremum je abgeschlossener Halbschwingung [k_i, k_i+1)
+    if len(k) < 2:
+        e = np.empty(0)
+        return tc, dirs, e, e
+    lengths = np.diff(k)
+    seg = roll[k[0]:k[-1]] * np.repeat(dirs[:-1], lengths)
+    seg_id = np.repeat(np.arange(len(lengths)), lengths)
+    best = np.maximum.reduceat(seg, k[:-1] - k[0])
+    hits = np.flatnonzero(seg == best[seg_id])
+    _, pos = np.unique(seg_id[hits], return_index=True)
+    tp, vp = _vertex(secs, roll, hits[pos] + k[0])
+    return tc, dirs, tp, vp
+
+
+def _swing_table(tc, dirs, tp, vp):
+    """Eine Zeile je voller Schwingung: positive + negative Halbschwingung."""
+    up = np.flatnonzero(dirs[:-2] == 1) if len(dirs) > 2 else np.empty(0, int)
+    out = np.zeros(len(up), dtype=SWING_DTYPE)
+    if not len(up):
+        return out
+    period = tc[up + 2] - tc[up]
+    pos, neg = vp[up], vp[up + 1]
+    amp = 0.5 * (pos - neg)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["freq"] = 1.0 / period
+        out["asymmetry"] = np.where(amp > 0, 0.5 * (pos + neg) / amp, np.nan)
+        out["time_asymmetry"] = ((tc[up + 1] - tc[up]) - (tc[up + 2] - tc[up + 1])) / period
+    out["t_start"], out["period"] = tc[up], period
+    out["peak_pos"], out["peak_neg"], out["amplitude"] = pos, neg, amp
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Spektrum
+# ---------------------------------------------------------------------------
+
+def welch(x, fs: float, nperseg: int):
+    """
+    Leistungsdichte nach Welch (Hann-Fenster, 50 % Überlappung, Mittelwert je
+    Segment abgezogen). Rückgabe: (f, P).
+    """
+    x = np.asarray(x, dtype=float)
+    nperseg = min(nperseg, len(x))
+    step = max(nperseg // 2, 1)
+    starts = np.arange(0, len(x) - nperseg + 1, step)
+    segs = x[starts[:, None] + np.arange(nperseg)]
+    segs -= segs.mean(axis=1, keepdims=True)
+    win = np.hanning(nperseg)
+    spec = np.abs(np.fft.rfft(segs * win, axis=1)) ** 2
+    P = spec.mean(axis=0) / (fs * (win ** 2).sum())
+    P[1:-1] *= 2
+    return np.fft.rfftfreq(nperseg, 1.0 / fs), P
+
+
+def dominant_frequency(secs, roll, seg_seconds: float = 64.0, fmin: float = 0.05):
+    """
+    Frequenz des höchsten Welch-Peaks oberhalb fmin, per Parabel im
+    log-Spektrum zwischen den Bins interpoliert. Die Samples werden dazu auf
+    ein gleichmäßiges Raster (Median-Abstand) interpoliert.
+    """
+    secs, roll = np.asarray(secs, dtype=float), np.asarray(roll, dtype=float)
+    # Zeitsprünge zurück (Sensor-Neustart): nur den längsten monotonen Abschnitt nehmen
+    cuts = np.concatenate(([0], np.flatnonzero(np.diff(secs) <= 0) + 1, [len(secs)]))
+    i = int(np.argmax(np.diff(cuts)))
+    secs, roll = secs[cuts[i]:cuts[i + 1]], roll[cuts[i]:cuts[i + 1]]
+    if len(secs) < 16:
+        return None
+    dt = float(np.median(np.diff(secs)))
+    if not dt > 0:
+        return None
+    grid = np.arange(secs[0], secs[-1], dt)
+    x = np.interp(grid, secs, roll)
+    nperseg = min(len(x), 1 << max(4, math.ceil(math.log2(seg_seconds / dt))))
+    f, P = welch(x, 1.0 / dt, nperseg)
+    band = np.flatnonzero(f >= fmin)
+    if len(band) < 3:
+        return None
+    i = band[np.argmax(P[band])]
+    if 0 < i < len(P) - 1 and P[i - 1] > 0 and P[i + 1] > 0:
+        l0, l1, l2 = np.log(P[i - 1:i + 2])
+        den = l0 - 2 * l1 + l2
+        shift = 0.5 * (l0 - l2) / den if den != 0 else 0.0
+        return float(f[i] + shift * (f[1] - f[0]))
+    return float(f[i])
+
+
+# ---------------------------------------------------------------------------
+# Auswertung
+# ---------------------------------------------------------------------------
+
+def _mean(a):
+    return float(np.mean(a)) if len(a) else None
+
+
+def analyze(secs, roll, hysteresis: float = 1.0, center: float = None) -> dict:
+    """
+    Kennwerte einer ganzen Sitzung; Schlüssel wie SwingAnalyzer.result(),
+    dazu 'freq_welch' und 'swings' (Structured-Array SWING_DTYPE).
+    """
+    secs = np.asarray(secs, dtype=float)
+    roll = np.asarray(roll, dtype=float)
+    n = len(roll)
+    res = {"samples": n, "cycles": 0, "secs": float(secs[-1]) if n else None,
+           "center": center, "max_pos": None, "max_neg": None, "mid": None,
+           "period": None, "freq": None, "freq_welch": None, "amplitude": None,
+           "peak_pos": None, "peak_neg": None, "log_decrement": None,
+           "damping_ratio": None, "decay_time": None, "asymmetry": None,
+           "time_asymmetry": None, "swings": np.zeros(0, dtype=SWING_DTYPE)}
+    if n < 3:
+        return res
+    max_pos, max_neg = float(roll.max()), float(roll.min())
+    res.update(max_pos=max_pos, max_neg=max_neg,
+               mid=0.5 * (abs(max_pos) + abs(max_neg)))
+
+    # Mittellage: erst Mitte des Wertebereichs, dann Median der Umkehrpunkt-Mitten
+    c = 0.5 * (max_pos + max_neg) if center is None else center
+    tc, dirs, tp, vp = _half_waves(secs, roll, c, hysteresis)
+    if center is None and len(vp) >= 2:
+        c = float(np.median(0.5 * (vp[1:] + vp[:-1])))
+        tc, dirs, tp, vp = _half_waves(secs, roll, c, hysteresis)
+    res["center"] = c
+
+    # Periode als Median über die Schwingungen deutlich über der Hysterese:
+    # die abgeklungene Schwingung im Rauschen verfälscht sonst Periode und Dämpfung
+    sw = _swing_table(tc, dirs, tp, vp)
+    ok = sw["amplitude"] > 2 * hysteresis
+    if np.any(ok):
+        period = float(np.median(sw["period"][ok]))
+    else:
+        periods = np.concatenate([np.diff(tc[dirs == s]) for s in (1, -1)]) if len(tc) else []
+        period = float(np.median(periods)) if len(periods) else None
+    res.update(
+        cycles=max(int(np.count_nonzero(dirs == 1)) - 1, 0),
+        period=period,
+        freq=1.0 / period if period else None,
+        freq_welch=dominant_frequency(secs, roll),
+        swings=sw,
+    )
+    if len(vp):
+        last = {s: vp[dirs[:-1] == s] for s in (1, -1)}
+        res["peak_pos"] = float(last[1][-1]) if len(last[1]) else None
+        res["peak_neg"] = float(last[-1][-1]) if len(last[-1]) else None
+    if len(sw):
+        res["amplitude"] = float(sw["amplitude"][-1])
+        valid = sw[ok] if np.any(ok) else sw
+        res["asymmetry"] = float(np.nanmean(valid["asymmetry"]))
+        res["time_asymmetry"] = float(np.mean(valid["time_asymmetry"]))
+        if np.count_nonzero(ok) >= 2 and period:
+            # Ausgleichsgerade durch log(Amplitude) über der Zeit → Dekrement pro Periode
+            slope = np.polyfit(sw["t_start"][ok], np.log(sw["amplitude"][ok]), 1)[0]
+            delta = -float(slope) * period
+            res["log_decrement"] = delta
+            res["damping_ratio"] = delta / math.sqrt(4 * math.pi ** 2 + delta ** 2)
+            res["decay_time"] = period / delta if delta > 0 else None
+    return res
+
+
+def analyze_file(path: str, hysteresis: float = 1.0, chunk_rows: int = 100_000,
+                 cache: bool = False) -> dict:
+    """load_session + analyze; Einheit für den Prozess-Pool."""
+    secs, roll = load_session(path, chunk_rows, cache)
+    res = analyze(secs, roll, hysteresis)
+    res["file"] = path
+    return res
+
+
+def analyze_many(paths, jobs: int = None, **kw):
+    """
+    Wertet mehrere Dateien parallel aus (ProcessPoolExecutor). Verzeichnisse
+    werden nach *.csv und *.nrec (ohne rotierte Folgeteile) durchsucht.
+    Rückgabe in Eingabereihenfolge.
+    """
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            files += sorted(f for ext in ("*.csv", "*.nrec")
+                            for f in glob.glob(os.path.join(p, ext)) if not is_part(f))
+        else:
+            files.append(p)
+    if jobs == 1 or len(files) <= 1:
+        return [analyze_file(f, **kw) for f in files]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        futs = [pool.submit(analyze_file, f, **kw) for f in files]
+        return [f.result() for f in futs]
+
+
+# ---------------------------------------------------------------------------
+# Ausgabe
+# ---------------------------------------------------------------------------
+
+def format_result(r: dict) -> str:
+    """Textblock wie das Analyse-Feld in gui.py."""
+    if r["samples"] < 3:
+        return "Zu wenige Daten für Analyse."
+
+    def f(key, fmt):
+        return "–" if r[key] is None else format(r[key], fmt)
+    dur = r["secs"] - r["swings"]["t_start"][0] if len(r["swings"]) else 0.0
+    return (
+        f"Samples: {r['samples']}   Schwingungen: {len(r['swings'])}   ({dur:.0f} s)\n"
+        f"Max. positiver Roll (°): {f('max_pos', '.2f')}\n"
+        f"Max. negativer Roll (°): {f('max_neg', '.2f')}\n"
+        f"Mittelwert (°):           {f('mid', '.2f')}\n\n"
+        f"Periodendauer (Median, s):  {f('period', '.3f')}\n"
+        f"Schwingfrequenz (Hz):       {f('freq', '.4f')}   Welch: {f('freq_welch', '.4f')}\n"
+        f"Amplitude (°): {f('amplitude', '.2f')}   log. Dekrement: {f('log_decrement', '.4f')}"
+        f"   Dämpfungsgrad: {f('damping_ratio', '.4f')}\n"
+        f"Asymmetrie Amplitude: {f('asymmetry', '+.3f')}   Zeit: {f('time_asymmetry', '+.3f')}"
+    )
+
+
+def format_swings(sw) -> str:
+    lines = [f"{'Nr':>4}{'t (s)':>11}{'T (s)':>8}{'f (Hz)':>8}{'+Max':>8}"
+             f"{'-Max':>8}{'Ampl.':>8}{'Asym.':>8}{'t-Asym.':>9}"]
+    for i, s in enumerate(sw, 1):
+        lines.append(f"{i:>4}{s['t_start']:>11.3f}{s['period']:>8.3f}{s['freq']:>8.4f}"
+                     f"{s['peak_pos']:>+8.2f}{s['peak_neg']:>+8.2f}{s['amplitude']:>8.2f}"
+                     f"{s['asymmetry']:>+8.3f}{s['time_asymmetry']:>+9.3f}")
+    return "\n".join(lines)
+
+
+def to_json(r: dict, swings: bool = False) -> dict:
+    out = {k: v for k, v in r.items() if k != "swings"}
+    out["swing_count"] = len(r["swings"])
+    if swings:
+        out["swings"] = [dict(zip(SWING_DTYPE.names, map(float, s))) for s in r["swings"]]
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline-Analyse aufgezeichneter Sitzungen (CSV/NREC)")
+    ap.add_argument("paths", nargs="+", help="CSV-/NREC-Dateien oder Verzeichnisse")
+    ap.add_argument("--jobs", type=int, default=None, help="Prozesse (Standard: CPU-Kerne)")
+    ap.add_argument("--hysteresis", type=float, default=1.0, help="Totband um die Mittellage in Grad")
+    ap.add_argument("--chunk", type=int, default=100_000, help="Zeilen pro Einleseblock")
+    ap.add_argument("--cache", action="store_true", help=".npy-Cache neben der CSV anlegen/nutzen")
+    ap.add_argument("--swings", action="store_true", help="Tabelle je Schwingung ausgeben")
+    ap.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = ap.parse_args()
+
+    results = analyze_many(args.paths, args.jobs, hysteresis=args.hysteresis,
+                           chunk_rows=args.chunk, cache=args.cache)
+    if args.json:
+        print(json.dumps([to_json(r, args.swings) for r in results], indent=2))
+        return
+    for r in results:
+        print(f"== {r['file']}")
+        print(format_result(r))
+        if args.swings and len(r["swings"]):
+            print()
+            print(format_swings(r["swings"]))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# session_recording.py
+"""
+Aufzeichnung der verarbeiteten Samples (Winkel + kalibrierte Quaternion) in
+einem kompakten, spaltenweisen Binärformat – als Ersatz für csv.writer pro
+Sample im GUI-Thread.
+
+SessionRecorder liest mit eigenem Cursor aus einem SampleRing und schreibt in
+einem Hintergrund-Thread große Blöcke. Die Dateien können während der
+Aufnahme nach Größe oder Zeit rotiert und in festen Abständen per fsync
+gesichert werden. export_csv() erzeugt nachträglich die gewohnte CSV
+(secs,roll,pitch,yaw,qx,qy,qz,qw).
+
+Dateiformat (.nrec, little-endian):
+    Header  <4sHI> = b"NREC", Version, Länge des JSON-Kopfs
+            JSON   {"fields": [[name, dtype], …], "created": ISO-Zeit}
+    Blöcke  <4sI>  = b"CHNK", Anzahl Zeilen n
+            danach je Feld n Werte am Stück (spaltenweise)
+Ein unvollständiger letzter Block (Absturz während des Schreibens) wird beim
+Lesen ignoriert.
+"""
+
+import datetime
+import errno
+import glob
+import io
+import json
+import os
+import re
+import struct
+import threading
+import time
+import numpy as np
+
+REC_MAGIC    = b"NREC"
+REC_VERSION  = 1
+REC_HEADER   = struct.Struct("<4sHI")
+CHUNK_MAGIC  = b"CHNK"
+CHUNK_HEADER = struct.Struct("<4sI")
+
+# Felder wie in der bisherigen CSV; secs bleibt f8 (Stunden mit ms-Auflösung)
+REC_FIELDS = (
+    ("secs",  "<f8"),
+    ("roll",  "<f4"), ("pitch", "<f4"), ("yaw", "<f4"),
+    ("qx",    "<f4"), ("qy",    "<f4"), ("qz",  "<f4"), ("qw",  "<f4"),
+)
+
+# Zahlenformat je Feld beim CSV-Export (wie bisher gui.py)
+CSV_FMT = {"secs": "%.4f", "roll": "%.2f", "pitch": "%.2f", "yaw": "%.2f"}
+
+_PART_RE = re.compile(r"\.\d{3}\.nrec$")
+
+
+def part_path(path: str, index: int) -> str:
+    """Dateiname des index-ten Teils einer rotierten Aufnahme (0 = path selbst)."""
+    if index == 0:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{index:03d}{ext}"
+
+
+def session_files(path: str) -> list:
+    """Alle Teile einer (ggf. rotierten) Aufnahme in Reihenfolge."""
+    stem, ext = os.path.splitext(path)
+    parts = sorted(p for p in glob.glob(glob.escape(stem) + ".*" + ext) if _PART_RE.search(p))
+    return ([path] if os.path.exists(path) else []) + parts
+
+
+def is_part(path: str) -> bool:
+    """True für Folgeteile (x.001.nrec …), die zu x.nrec gehören."""
+    return bool(_PART_RE.search(path))
+
+
+class SessionRecorder:
+    """
+    path:        Zieldatei (.nrec); Folgeteile heißen x.001.nrec, x.002.nrec …
+    ring:        SampleRing, aus dem der Hintergrund-Thread liest
+                 (None → Samples selbst per write() übergeben)
+    fields:      (Name, dtype)-Paare; Namen müssen Spalten von SAMPLE_DTYPE sein
+    block_rows:  Zeilen pro geschriebenem Block
+    flush_s:     spätestens nach dieser Zeit wird ein angefangener Block geschrieben
+    fsync_s:     Abstand der fsync-Aufrufe (0 = nach jedem Block, None = nur am Ende)
+    rotate_bytes / rotate_s: neue Teildatei ab dieser Größe bzw. Dauer
+    overwrite:   vorhandene Aufnahme gleichen Namens (alle Teile) vorher löschen;
+                 sonst FileExistsError, eine Aufnahme wird nie still überschrieben
+    """
+
+    def __init__(self, path: str, ring=None, fields=REC_FIELDS, block_rows: int = 4096,
+                 flush_s: float = 2.0, fsync_s: float = 10.0,
+                 rotate_bytes: int = None, rotate_s: float = None, overwrite: bool = False):
+        self.path   = path
+        self.ring   = ring
+        self.fields = tuple((name, np.dtype(dt)) for name, dt in fields)
+        self.block_rows   = block_rows
+        self.flush_s      = flush_s
+        self.fsync_s      = fsync_s
+        self.rotate_bytes = rotate_bytes
+        self.rotate_s     = rotate_s
+        self.rows    = 0        # geschriebene Zeilen (alle Teile)
+        self.bytes   = 0
+        self.dropped = 0        # im Ring überschrieben, bevor sie gelesen wurden
+        self.files   = []
+        self.error   = None
+        self.started = time.time()
+        self._cols = {name: np.empty(block_rows, dtype=dt) for name, dt in self.fields}
+        self._fill = 0
+        self._last_write = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = None
+        old = session_files(path)
+        if old and not overwrite:
+            raise FileExistsError(errno.EEXIST, "Aufnahme existiert bereits", path)
+        for p in old:   # alte Folgeteile würden sonst in die neue Aufnahme gemischt
+            os.remove(p)
+        self._open_next()
+        self._stop   = threading.Event()
+        self._thread = None
+        if ring is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    # --- Dateien ------------------------------------------------------------
+
+    def _open_next(self):
+        if self._file:
+            self._sync()
+            self._file.close()
+        path = part_path(self.path, len(self.files))
+        head = json.dumps({
+            "fields":  [[name, dt.str] for name, dt in self.fields],
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        }).encode()
+        self._file = open(path, "xb")
+        self._file.write(REC_HEADER.pack(REC_MAGIC, REC_VERSION, len(head)) + head)
+        self.bytes += REC_HEADER.size + len(head)
+        self.files.append(path)
+        self._opened = self._synced = time.monotonic()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._synced = time.monotonic()
+
+    def _write_block(self):
+        n = self._fill
+        if not n:
+            return
+        f = self._file
+        f.write(CHUNK_HEADER.pack(CHUNK_MAGIC, n))
+        for name, _ in self.fields:
+            f.write(self._cols[name][:n].tobytes())
+        self._fill = 0
+        self.rows  += n
+        self.bytes += CHUNK_HEADER.size + n * sum(dt.itemsize for _, dt in self.fields)
+        self._last_write = time.monotonic()
+
+        now = time.monotonic()
+        if self.fsync_s is not None and now - self._synced >= self.fsync_s:
+            self._sync()
+        if (self.rotate_bytes and f.tell() >= self.rotate_bytes) or \
+           (self.rotate_s and now - self._opened >= self.rotate_s):
+            self._open_next()
+
+    # --- Eingang ------------------------------------------------------------
+
+    def write(self, rows: np.ndarray):
+        """Übernimmt einen Block (SAMPLE_DTYPE) in die Spaltenpuffer."""
+        with self._lock:
+            if self._file is None:
+                return
+            i, n = 0, len(rows)
+            while i < n:
+                k = min(n - i, self.block_rows - self._fill)
+                for name, _ in self.fields:
+                    self._cols[name][self._fill:self._fill + k] = rows[name][i:i + k]
+                self._fill += k
+                i += k
+                if self._fill == self.block_rows:
+                    self._write_block()
+
+    def flush(self):
+        """Schreibt einen angefangenen Block sofort."""
+        with self._lock:
+            if self._file:
+                self._write_block()
+
+    def _run(self):
+        cursor = self.ring.head
+        try:
+            while not self._stop.is_set():
+                self.ring.wait(cursor, 0.2)
+                rows, cursor, dropped = self.ring.read(cursor)
+                self.dropped += dropped
+                if len(rows):
+                    self.write(rows)
+                if self._fill and time.monotonic() - self._last_write >= self.flush_s:
+                    self.flush()
+            rows, cursor, dropped = self.ring.read(cursor)
+            self.dropped += dropped
+            self.write(rows)
+        except OSError as e:      # Datenträger voll, USB-Stick abgezogen …
+            self.error = str(e)
+            # Datei aufgeben, damit active False wird und neu gestartet werden kann
+            with self._lock:
+                if self._file:
+                    try:
+                        self._file.close()
+                    except OSError:
+                        pass
+                    self._file = None
+
+    def close(self):
+        """Beendet den Thread, schreibt den Rest und schließt die Datei."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        with self._lock:
+            if self._file:
+                try:
+                    self._write_block()
+                    self._sync()
+                except OSError as e:
+                    self.error = str(e)
+                self._file.close()
+                self._file = None
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def info(self) -> dict:
+        return {
+            "path":    self.path,
+            "files":   list(self.files),
+            "rows":    self.rows + self._fill,
+            "bytes":   self.bytes,
+            "dropped": self.dropped,
+            "started": self.started,
+            "active":  self.active,
+            "error":   self.error,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Lesen und Export
+# ---------------------------------------------------------------------------
+
+def read_header(path: str):
+    """Rückgabe: (Kopf-Dict, Offset des ersten Blocks)."""
+    with open(path, "rb") as f:
+        magic, version, n = REC_HEADER.unpack(f.read(REC_HEADER.size))
+        if magic != REC_MAGIC:
+            raise ValueError(f"{path}: keine gültige NREC-Datei")
+        head = json.loads(f.read(n))
+    head["version"] = version
+    return head, REC_HEADER.size + n
+
+
+def iter_chunks(path: str, fields=None):
+    """
+    Liefert je Block ein Dict {Feld: Array}. Die Arrays sind Sichten auf die
+    memory-gemappte Datei; nur die angefragten Felder werden angefasst.
+    """
+    head, pos = read_header(path)
+    dtypes = [(name, np.dtype(dt)) for name, dt in head["fields"]]
+    want = set(fields or (name for name, _ in dtypes))
+    row_size = sum(dt.itemsize for _, dt in dtypes)
+    size = os.path.getsize(path)
+    if size <= pos:
+        return
+    buf = np.memmap(path, dtype=np.uint8, mode="r")
+    while pos + CHUNK_HEADER.size <= size:
+        magic, n = CHUNK_HEADER.unpack(bytes(buf[pos:pos + CHUNK_HEADER.size]))
+        pos += CHUNK_HEADER.size
+        if magic != CHUNK_MAGIC or pos + n * row_size > size:
+            break
+        out = {}
+        for name, dt in dtypes:
+            if name in want:
+                out[name] = np.frombuffer(buf, dtype=dt, count=n, offset=pos)
+            pos += n * dt.itemsize
+        yield out
+
+
+def load_rec(path: str, fields=None) -> np.ndarray:
+    """
+    Lädt eine Aufnahme inkl. aller rotierten Teile als Structured-Array
+    (nur die Spalten aus fields, Standard: alle).
+    """
+    files = session_files(path) or [path]
+    head, _ = read_header(files[0])
+    dtypes = [(name, dt) for name, dt in head["fields"] if not fields or name in fields]
+    blocks = [c for f in files for c in iter_chunks(f, fields)]
+    out = np.empty(sum(len(c[dtypes[0][0]]) for c in blocks) if blocks else 0, dtype=dtypes)
+    i = 0
+    for c in blocks:
+        n = len(c[dtypes[0][0]])
+        for name, _ in dtypes:
+            out[name][i:i + n] = c[name]
+        i += n
+    return out
+
+
+def iter_csv(path: str):
+    """CSV wie bisher gui.py, blockweise als Text (für Export und Download)."""
+    files = session_files(path) or [path]
+    names = [name for name, _ in read_header(files[0])[0]["fields"]]
+    fmt = [CSV_FMT.get(name, "%.6f") for name in names]
+    yield ",".join(names) + "\n"
+    for f in files:
+        for c in iter_chunks(f):
+            out = io.StringIO()
+            np.savetxt(out, np.column_stack([c[n] for n in names]), fmt=fmt, delimiter=",")
+            yield out.getvalue()
+
+
+def export_csv(path: str, dst: str):
+    """Schreibt eine Aufnahme (alle Teile) als CSV."""
+    with open(dst, "w", newline="") as out:
+        out.writelines(iter_csv(path))
+
+
+def summarize(path: str, window: float = 1.0, field: str = "roll") -> dict:
+    """
+    Fenster-Zusammenfassung einer Aufnahme: je 'window' Sekunden Startzeit,
+    Anzahl, Min, Max und Mittelwert von 'field'. Springt secs zurück
+    (Sensor-Neustart), beginnt dort ein neues Fenster.
+    """
+    rec = load_rec(path, ["secs", field])
+    if not len(rec):
+        return {"t": [], "n": [], "min": [], "max": [], "mean": []}
+    secs, v = rec["secs"], rec[field].astype(float)
+    bins = np.floor((secs - secs[0]) / window).astype(np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bins)) + 1))
+    n = np.diff(np.append(starts, len(v)))
+    return {
+        "t":    (secs[0] + bins[starts] * window).tolist(),
+        "n":    n.tolist(),
+        "min":  np.minimum.reduceat(v, starts).tolist(),
+        "max":  np.maximum.reduceat(v, starts).tolist(),
+        "mean": (np.add.reduceat(v, starts) / n).tolist(),
+    }
+
+
+def recording_info(path: str) -> dict:
+    """Kurzinfo einer Aufnahme (alle Teile) für Listen."""
+    files = session_files(path) or [path]
+    head, _ = read_header(files[0])
+    secs = load_rec(path, ["secs"])["secs"]
+    return {
+        "name":     os.path.basename(path),
+        "files":    [os.path.basename(f) for f in files],
+        "bytes":    sum(os.path.getsize(f) for f in files),
+        "rows":     len(secs),
+        "duration": float(np.ptp(secs)) if len(secs) else 0.0,
+        "created":  head.get("created"),
+        "fields":   [name for name, _ in head["fields"]],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="NREC-Aufnahme anzeigen oder als CSV exportieren")
+    ap.add_argument("file", help=".nrec-Datei (erster Teil)")
+    ap.add_argument("--csv", help="als CSV in diese Datei exportieren")
+    args = ap.parse_args()
+    rec = load_rec(args.file, ["secs"])
+    dur = float(rec["secs"][-1] - rec["secs"][0]) if len(rec) else 0.0
+    print(f"{len(session_files(args.file))} Datei(en), {len(rec)} Samples, {dur:.1f} s")
+    if args.csv:
+        export_csv(args.file, args.csv)
+        print("exportiert:", args.csv)
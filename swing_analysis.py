@@ -0,0 +1,219 @@
+# swing_analysis.py
+"""
+Laufende Schwinganalyse des Roll-Winkels mit konstantem Speicher.
+
+SwingAnalyzer bekommt die Samples blockweise (secs, roll) aus dem
+DataProcessor bzw. dem Sample-Ring und erkennt:
+  - Durchgänge durch die Mittellage mit Hysterese (±hysteresis Grad),
+    Zeitpunkt linear zwischen den beiden Samples interpoliert
+  - genau einen Umkehrpunkt je Halbschwingung, per Parabel durch die drei
+    Samples um das Extremum interpoliert
+Daraus werden laufend Periodendauer, Frequenz, Amplitude, logarithmisches
+Dekrement / Dämpfungsgrad und Asymmetrie (Amplitude und Zeit) berechnet.
+Gemittelt wird über die letzten 'history' Werte (feste Deques).
+
+Perioden, Amplituden, Halbschwingungen und cycles zählen nur Schwingungen
+mit Amplitude > 2 × hysteresis (wie session_analysis.analyze): ist die
+Glocke ausgeschwungen, erzeugt das Rauschen sonst Durchgänge durch das
+Totband mit beliebigen Abständen.
+
+Die Mittellage folgt der Mitte zwischen letztem positiven und negativem
+Umkehrpunkt; vor der ersten vollen Schwingung der Mitte des bisherigen
+Wertebereichs.
+"""
+
+import collections
+import math
+import threading
+
+
+def _vertex(p0, p1, p2):
+    """Scheitel der Parabel durch drei (t, v)-Punkte; Fallback: Mittelpunkt."""
+    (t0, v0), (t1, v1), (t2, v2) = p0, p1, p2
+    a, b = t0 - t1, t2 - t1          # relativ zu t1 (große Zeitwerte)
+    den = a * b * (a - b)
+    if den == 0:
+        return t1, v1
+    A = (b * (v0 - v1) - a * (v2 - v1)) / den
+    B = (a * a * (v2 - v1) - b * b * (v0 - v1)) / den
+    if A == 0:
+        return t1, v1
+    dt = -B / (2 * A)
+    if not a <= dt <= b:             # Scheitel außerhalb → kein sauberes Extremum
+        return t1, v1
+    return t1 + dt, v1 + B * dt / 2
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else None
+
+
+class SwingAnalyzer:
+    """
+    hysteresis: halbe Breite des Totbands um die Mittellage in Grad
+    history:    Anzahl Perioden/Umkehrpunkte für die gleitenden Mittelwerte
+    center:     feste Mittellage (None → automatisch nachführen)
+    """
+
+    def __init__(self, hysteresis: float = 1.0, history: int = 8, center: float = None):
+        self.hysteresis = hysteresis
+        self.history    = history
+        self.fixed_center = center
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.samples = 0
+            self.cycles  = 0          # vollständige Perioden
+            self.version = 0          # zählt bestätigte Halbschwingungen
+            self.max_pos = -math.inf
+            self.max_neg = math.inf
+            self._center = self.fixed_center
+            self._state  = 0          # +1 oberhalb, -1 unterhalb, 0 unbekannt
+            self._pp = self._prev = None
+            self._cross = None        # (t, Richtung) letzter Mittellagen-Durchgang
+            self._best  = None        # (t, v, v_roh) Umkehrpunkt-Kandidat
+            self._last_cross = {1: None, -1: None}
+            self._peak = {1: None, -1: None}   # letzte Umkehrpunkte (t, v)
+            n = self.history
+            self._periods = collections.deque(maxlen=n)
+            self._halves  = {1: collections.deque(maxlen=n), -1: collections.deque(maxlen=n)}
+            self._amps    = collections.deque(maxlen=n + 1)   # halbe Spitze-Spitze
+            self._asym    = collections.deque(maxlen=n)
+            self._t_last  = None
+
+    # --- Eingang ------------------------------------------------------------
+
+    def feed(self, secs, roll):
+        """Verarbeitet einen Block (gleich lange Folgen von Zeit und Roll-Winkel)."""
+        with self._lock:
+            for t, v in zip(secs, roll):
+                self._push(float(t), float(v))
+
+    def _push(self, t, v):
+        self.samples += 1
+        if v > self.max_pos:
+            self.max_pos = v
+        if v < self.max_neg:
+            self.max_neg = v
+        if self._prev is not None and t < self._prev[0]:
+            # Zeit springt zurück (Sensor-Neustart, Replay-Schleife): Zeitbezug neu
+            self._pp = self._prev = self._cross = None
+            self._last_cross = {1: None, -1: None}
+        self._t_last = t
+        c = self._center
+        if self.fixed_center is None and (self._peak[1] is None or self._peak[-1] is None):
+            # noch keine volle Schwingung: Mitte des bisherigen Wertebereichs
+            c = self._center = 0.5 * (self.max_pos + self.max_neg)
+
+        prev = self._prev
+        if prev is not None:
+            t0, v0 = prev
+            # Durchgang durch die Mittellage → Zeitpunkt interpolieren
+            if (v0 - c) * (v - c) < 0:
+                tc = t0 + (c - v0) * (t - t0) / (v - v0)
+                self._cross = (tc, 1 if v > v0 else -1)
+            # Extremum der laufenden Halbschwingung (mittleres von drei Samples)
+            s = self._state
+            if self._pp is not None and s:
+                vp = self._pp[1]
+                if s * (v0 - vp) >= 0 and s * (v0 - v) >= 0 and (
+                        self._best is None or s * (v0 - self._best[2]) > 0):
+                    self._best = _vertex(self._pp, prev, (t, v)) + (v0,)
+
+        # Hysterese: neue Halbschwingung erst, wenn das Totband verlassen ist
+        h = self.hysteresis
+        if v > c + h and self._state <= 0:
+            self._confirm(1, t)
+        elif v < c - h and self._state >= 0:
+            self._confirm(-1, t)
+        self._pp, self._prev = prev, (t, v)
+
+    def _confirm(self, direction, t):
+        cross = self._cross
+        tc = cross[0] if cross and cross[1] == direction else t
+        old = self._state
+
+        # Umkehrpunkt der abgeschlossenen Halbschwingung übernehmen;
+        # ok = Schwingung deutlich über dem Totband (kein Rauschen)
+        ok = False
+        if old and self._best is not None:
+            self._peak[old] = self._best[:2]
+            pos, neg = self._peak[1], self._peak[-1]
+            if pos and neg:
+                amp = 0.5 * (pos[1] - neg[1])
+                ok = amp > 2 * self.hysteresis
+                if ok:
+                    self._amps.append(amp)
+                    self._asym.append(0.5 * (pos[1] + neg[1]) / amp)
+                if self.fixed_center is None:
+                    self._center = 0.5 * (pos[1] + neg[1])
+
+        # Periode (gleichsinnige Durchgänge) und Dauer der Halbschwingung
+        last = self._last_cross[direction]
+        if last is not None and ok:
+            self._periods.append(tc - last)
+            if direction == 1:
+                self.cycles += 1
+        if old and self._last_cross[old] is not None and ok:
+            # Halbschwingung 'old' lief vom letzten Durchgang in Richtung old bis tc
+            self._halves[old].append(tc - self._last_cross[old])
+        self._last_cross[direction] = tc
+
+        self._state = direction
+        self._best = None
+        self._cross = None
+        self.version += 1
+
+    # --- Ausgang ------------------------------------------------------------
+
+    def result(self) -> dict:
+        """Momentaufnahme aller Kennwerte (None = noch nicht bestimmbar)."""
+        with self._lock:
+            period = _mean(self._periods)
+            amps = list(self._amps)
+            delta = None
+            if len(amps) >= 2 and amps[0] > 0 and amps[-1] > 0:
+                # Amplituden je Halbschwingung → Dekrement pro voller Periode
+                delta = 2.0 * math.log(amps[0] / amps[-1]) / (len(amps) - 1)
+            up, down = _mean(self._halves[1]), _mean(self._halves[-1])
+            has = self.samples > 0
+            return {
+                "samples":       self.samples,
+                "cycles":        self.cycles,
+                "version":       self.version,
+                "secs":          self._t_last,
+                "center":        self._center,
+                "max_pos":       self.max_pos if has else None,
+                "max_neg":       self.max_neg if has else None,
+                "mid":           0.5 * (abs(self.max_pos) + abs(self.max_neg)) if has else None,
+                "period":        period,
+                "freq":          1.0 / period if period else None,
+                "amplitude":     amps[-1] if amps else None,
+                "peak_pos":      self._peak[1][1] if self._peak[1] else None,
+                "peak_neg":      self._peak[-1][1] if self._peak[-1] else None,
+                "log_decrement": delta,
+                "damping_ratio": delta / math.sqrt(4 * math.pi ** 2 + delta ** 2)
+                                 if delta is not None else None,
+                "decay_time":    period / delta if period and delta and delta > 0 else None,
+                "asymmetry":     _mean(self._asym),
+                "time_asymmetry": (up - down) / (up + down) if up and down else None,
+            }
+
+
+if __name__ == "__main__":
+    # Selbsttest: abklingende Schwingung 0.8 Hz mit Rauschen; die
+    # ausgeschwungene Glocke darf Periode und Dekrement nicht verfälschen
+    import numpy as np
+    rng = np.random.default_rng(1)
+    secs = np.arange(0, 600, 0.01)
+    roll = 30 * np.exp(-0.01 * secs) * np.sin(2 * np.pi * 0.8 * secs) + rng.normal(0, 0.3, len(secs))
+    an = SwingAnalyzer()
+    for i in range(0, len(secs), 64):
+        an.feed(secs[i:i + 64], roll[i:i + 64])
+    r = an.result()
+    assert abs(r["freq"] - 0.8) < 0.02, r["freq"]
+    assert r["log_decrement"] > 0 and r["cycles"] < 0.8 * 600, (r["log_decrement"], r["cycles"])
+    print({k: r[k] for k in ("cycles", "period", "freq", "amplitude", "log_decrement")})
+    print("ok")
@@ -0,0 +1,270 @@
+# timing.py
+"""
+Zeitmessung der Sample-Strecke aus Sensor-Zeit (ms) und Host-Zeit
+(time.monotonic), ohne Eingriff in den Datenweg.
+
+StreamTiming.feed() läuft im Reader-Thread einmal pro Block (aus
+DataProcessor.process_batch) und ermittelt daraus:
+  - device_hz:   tatsächliche Sample-Rate des Boards (Samples je Sekunde
+                 Sensor-Zeit, gleitend über WINDOW_S)
+  - Abstände:    Histogramm der Sample-Abstände in Sensor-Zeit und der
+                 Block-Ankünfte in Host-Zeit (Kanten HIST_EDGES_MS)
+  - Lücken:      Abstände über GAP_FACTOR × typischem Abstand, daraus die
+                 Zahl verlorener Samples; Rücksprünge zählen als Neustart
+  - Drift:       Gangunterschied Nicla ↔ Host in ppm (Regression des
+                 Versatzes Host-Zeit − Sensor-Zeit über die Host-Zeit;
+                 positiv = Nicla-Uhr geht langsamer als der Host)
+  - Transport:   Versatz des neuesten Samples über dem kleinsten bisher
+                 gesehenen (driftbereinigt) = Verzögerung bis zum Reader
+                 über der minimalen, nicht messbaren Grundlatenz
+
+consumed() misst die Zeit vom Schreiben eines Samples in den Ring bis zu
+seiner Auslieferung (SSE, WebSocket, GUI). Dazu merkt sich feed() zu jedem
+Block den Ring-Cursor und die Host-Zeit.
+
+Aufwand: einige NumPy-Operationen pro Block, nichts pro Sample;
+bench.py --stages process misst den Unterschied (timing_feed).
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+import numpy as np
+
+WINDOW_S      = 5.0     # Fenster (Sensor-Zeit) für device_hz
+GAP_FACTOR    = 1.5     # Abstand > GAP_FACTOR × Periode gilt als Lücke
+RESTART_MS    = 1000.0  # Rücksprung der Sensor-Zeit um mehr = Neustart
+DRIFT_MIN_S   = 10.0    # Drift erst nach so viel Host-Zeit melden
+MARKS         = 512     # gemerkte Blöcke (Ring-Cursor → Host-Zeit)
+RECENT        = 256     # letzte Latenzen für Perzentile
+HIST_EDGES_MS = np.array([0.5, 1, 2, 5, 10, 15, 20, 30, 50, 100, 200, 500, 1000])
+_EDGES        = HIST_EDGES_MS.tolist()   # für bisect bei Einzelwerten
+
+
+def hist_labels(edges=HIST_EDGES_MS) -> list:
+    """Beschriftung der Histogramm-Klassen, z. B. '<0.5', '10-15', '>=1000'."""
+    e = [f"{v:g}" for v in edges]
+    return [f"<{e[0]}"] + [f"{a}-{b}" for a, b in zip(e, e[1:])] + [f">={e[-1]}"]
+
+
+class _Recent:
+    """Letzte RECENT Werte (ms) mit Zähler, Summe und Maximum."""
+
+    def __init__(self, size: int = RECENT):
+        self.buf   = np.zeros(size)
+        self.count = 0
+        self.sum   = 0.0
+        self.max   = 0.0
+
+    def add(self, v: float):
+        self.buf[self.count % len(self.buf)] = v
+        self.count += 1
+        self.sum   += v
+        if v > self.max:
+            self.max = v
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {"count": 0}
+        last = self.buf[:min(self.count, len(self.buf))]
+        p50, p95 = np.percentile(last, (50, 95))
+        return {"count": self.count, "mean_ms": self.sum / self.count,
+                "p50_ms": float(p50), "p95_ms": float(p95), "max_ms": self.max}
+
+
+class StreamTiming:
+    """Zeitstatistik einer Sample-Quelle (ein Schreiber: der Reader-Thread)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()   # nur für consumers
+        self.reset()
+
+    def reset(self):
+        n = len(HIST_EDGES_MS) + 1
+        self.samples   = 0
+        self.blocks    = 0
+        self.gaps      = 0
+        self.dropped   = 0
+        self.restarts  = 0
+        self.period_ms = None
+        self.device_hz = 0.0
+        self.hist_sensor  = np.zeros(n, dtype=np.int64)   # Sample-Abstände (Sensor)
+        self.hist_arrival = np.zeros(n, dtype=np.int64)   # Block-Abstände (Host)
+        self.transport = _Recent()
+        self.consumers = {}
+        self._marks_cur = np.full(MARKS, -1, dtype=np.int64)
+        self._marks_t   = np.zeros(MARKS)
+        self._marks_n   = 0
+        self._last_ms   = None
+        self._last_t    = None
+        self._restart()
+
+    def _restart(self):
+        """Bezug nach Start oder Sensor-Neustart neu aufbauen."""
+        self._window  = deque()            # (ms des Blockendes, Samples bis dahin)
+        self._ref     = None               # (Host-Zeit, Versatz) beim ersten Block
+        self._sums    = [0.0] * 5          # n, Σx, Σy, Σxx, Σxy
+        self._min_res = None               # kleinster driftbereinigter Versatz
+        self.drift_ppm = None
+
+    # --- Reader-Thread ---
+
+    def feed(self, ms: np.ndarray, cursor: int = None, now: float = None):
+        """
+        Ein Block Sensor-Zeitstempel (ms, aufsteigend), angekommen zur
+        Host-Zeit now (Standard: time.monotonic()). cursor = Ring-Kopf nach
+        dem Schreiben des Blocks (für consumed()).
+        """
+        now = time.monotonic() if now is None else float(now)
+        n = len(ms)
+        if cursor is not None:
+            i = self._marks_n % MARKS
+            self._marks_t[i]   = now
+            self._marks_cur[i] = cursor
+            self._marks_n += 1
+
+        first, last = float(ms[0]), float(ms[-1])
+        prev = self._last_ms
+        if prev is not None and first < prev - RESTART_MS:
+            self.restarts += 1
+            prev = None
+            self._restart()
+
+        # Sample-Abstände in Sensor-Zeit (auch über die Blockgrenze)
+        if n == 1:
+            if prev is not None:
+                self._interval(first - prev, 1)
+        else:
+            d = np.diff(ms) if prev is None else np.diff(ms, prepend=prev)
+            self.hist_sensor += np.bincount(np.searchsorted(HIST_EDGES_MS, d, side="right"),
+                                            minlength=len(self.hist_sensor))
+            # typischer Abstand = mittlerer Abstand im Block, Lücken einzeln
+            self._interval(last - (first if prev is None else prev), len(d), d)
+
+        # Block-Ankünfte in Host-Zeit
+        if self._last_t is not None:
+            self.hist_arrival[bisect_right(_EDGES, (now - self._last_t) * 1000.0)] += 1
+        self._last_t  = now
+        self._last_ms = last
+        self.samples += n
+        self.blocks  += 1
+
+        # Sample-Rate des Boards über WINDOW_S Sensor-Zeit
+        w = self._window
+        w.append((last, self.samples))
+        while len(w) > 2 and last - w[1][0] >= WINDOW_S * 1000.0:
+            w.popleft()
+        if len(w) > 1 and last > w[0][0]:
+            self.device_hz = (self.samples - w[0][1]) * 1000.0 / (last - w[0][0])
+
+        # Versatz Host − Sensor des neuesten Samples: Drift und Transport
+        off = now - last / 1000.0
+        if self._ref is None:
+            self._ref = (now, off)
+        x, y = now - self._ref[0], off - self._ref[1]
+        s = self._sums
+        s[0] += 1.0; s[1] += x; s[2] += y; s[3] += x * x; s[4] += x * y
+        var = s[0] * s[3] - s[1] * s[1]
+        slope = (s[0] * s[4] - s[1] * s[2]) / var if var > 0 else 0.0
+        if x >= DRIFT_MIN_S:
+            self.drift_ppm = slope * 1e6
+        res = y - slope * x
+        if self._min_res is None or res < self._min_res:
+            self._min_res = res
+        self.transport.add((res - self._min_res) * 1000.0)
+
+    def _interval(self, span: float, count: int, d: np.ndarray = None):
+        """
+        count Abstände mit Summe span (ms): typische Periode nachführen und
+        Lücken zählen. d = die einzelnen Abstände (None bei nur einem).
+        """
+        if d is None:
+            self.hist_sensor[bisect_right(_EDGES, span)] += 1
+        if span <= 0:
+            return
+        typ = span / count
+        if self.period_ms is None:
+            self.period_ms = typ
+        limit = GAP_FACTOR * self.period_ms
+        if d is None:
+            big = span if span > limit else None
+        else:
+            big = d[d > limit] if d.max() > limit else None
+        if big is None:
+            # nur lückenlose Blöcke führen die Periode nach
+            self.period_ms = 0.9 * self.period_ms + 0.1 * typ
+            return
+        gaps = np.atleast_1d(big)
+        self.gaps    += len(gaps)
+        self.dropped += int(np.sum(np.round(gaps / self.period_ms) - 1))
+
+    # --- Verbraucher (beliebiger Thread) ---
+
+    def consumed(self, name: str, cursor: int, now: float = None):
+        """
+        Verbraucher name hat den Ring bis cursor (exklusiv) gelesen und
+        ausgeliefert: Alter des neuesten Samples seit dem Schreiben.
+        """
+        now = time.monotonic() if now is None else float(now)
+        i = self._marks_n - 1
+        stop = max(0, self._marks_n - MARKS)
+        if i < 0 or self._marks_cur[i % MARKS] < cursor:
+            return
+        # Block mit cursor-1 suchen: jüngster Block, dessen Vorgänger < cursor
+        while i > stop and self._marks_cur[(i - 1) % MARKS] >= cursor:
+            i -= 1
+        with self._lock:
+            rec = self.consumers.get(name)
+            if rec is None:
+                rec = self.consumers[name] = _Recent()
+            rec.add(float(now - self._marks_t[i % MARKS]) * 1000.0)
+
+    # --- Auswertung ---
+
+    def snapshot(self) -> dict:
+        """Alle Kennwerte als JSON-fähiges Dict."""
+        with self._lock:
+            consumers = {k: v.summary() for k, v in self.consumers.items()}
+        expected = self.samples + self.dropped
+        return {
+            "samples":    self.samples,
+            "blocks":     self.blocks,
+            "device_hz":  self.device_hz,
+            "period_ms":  self.period_ms,
+            "gaps":       self.gaps,
+            "dropped":    self.dropped,
+            "loss":       self.dropped / expected if expected else 0.0,
+            "restarts":   self.restarts,
+            "drift_ppm":  self.drift_ppm,
+            "transport":  self.transport.summary(),
+            "consumers":  consumers,
+            "hist_edges_ms": HIST_EDGES_MS.tolist(),
+            "hist_labels":   hist_labels(),
+            "hist_sensor":   self.hist_sensor.tolist(),
+            "hist_arrival":  self.hist_arrival.tolist(),
+        }
+
+
+if __name__ == "__main__":
+    # Selbsttest: 100 Hz-Board, 0.1 % schneller als der Host, Blöcke zu 10
+    # Samples mit zufälliger Verzögerung, zwischendurch 5 verlorene Samples
+    rng = np.random.default_rng(1)
+    t = StreamTiming()
+    ms0 = 0.0
+    for k in range(3000):
+        ms = ms0 + 10.0 * np.arange(10)
+        if k == 1000:
+            ms = ms[5:]
+        host = (ms[-1] / 1000.0) / 1.001 + 0.02 + rng.exponential(0.003)
+        t.feed(ms, cursor=10 * (k + 1), now=host)
+        t.consumed("test", 10 * (k + 1), now=host + 0.004)
+        ms0 += 100.0
+    s = t.snapshot()
+    assert abs(s["device_hz"] - 100.0) < 0.5, s["device_hz"]
+    assert s["dropped"] == 5 and s["gaps"] == 1, (s["dropped"], s["gaps"])
+    assert abs(s["drift_ppm"] + 1000) < 20, s["drift_ppm"]
+    assert abs(s["consumers"]["test"]["p50_ms"] - 4.0) < 1e-6
+    assert s["transport"]["p50_ms"] < 10.0
+    print({k: s[k] for k in ("device_hz", "gaps", "dropped", "drift_ppm", "transport")})
+    print("ok")
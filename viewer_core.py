@@ -1,55 +1,129 @@
 # viewer_core.py
+"""
+BLE-Backend: eine asyncio-Schleife in einem Hintergrund-Thread, darauf
+beliebig viele Verbindungen (BleLink) mit je eigener Pipeline.
+
+Jede Verbindung wartet ereignisgesteuert (Notifications bzw. Callback bei
+Verbindungsabbruch, kein Polling) und verbindet sich nach einem Abbruch
+selbst neu: Wartezeit exponentiell von BACKOFF_MIN bis BACKOFF_MAX, die
+Geräteadresse aus der ersten Suche wird wiederverwendet (kein erneuter
+Scan). Erst nach RESCAN_AFTER Fehlversuchen wird wieder gesucht.
+BleLink.info() meldet Verbindungsabbrüche, Dauer der letzten
+Wiederverbindung und verlorene Samples (aus Lücken der Sensor-Zeit,
+gezählt von DataProcessor.timing).
+
+Notifications decodiert serial_protocol.BleDecoder: das bisherige
+Einzelformat (<Iffff> je Sample) und Batches mit Sequenznummer, beides
+ohne Schleife pro Sample und als ein Block an process_batch.
+
+Client- und Scanner-Klasse sind austauschbar (ViewerCore(client_cls=…,
+scanner=…)), die Logik lässt sich damit ohne Bluetooth prüfen.
+"""
 
 import asyncio
 import struct
 import threading
+import time
 from bleak import BleakClient, BleakScanner
 from data_processor import DataProcessor
+from sample_ring import SampleRing
+from serial_protocol import BleDecoder, PAYLOAD_FMT, PAYLOAD_SIZE
 
 CHAR_UUID = "19b10001-0000-537e-4f6c-d104768a1214"
+SAMPLE_FMT  = PAYLOAD_FMT    # millis + 4×float
+SAMPLE_SIZE = PAYLOAD_SIZE   # 20 Bytes
+
+SCAN_S       = 3.0    # Dauer einer Gerätesuche
+BACKOFF_MIN  = 0.5    # erste Wartezeit vor einem neuen Verbindungsversuch
+BACKOFF_MAX  = 30.0   # obere Grenze der Wartezeit
+RESCAN_AFTER = 3      # Fehlversuche mit gemerkter Adresse, danach neu suchen
 
 def _new_loop():
     loop = asyncio.new_event_loop()
     threading.Thread(target=loop.run_forever, daemon=True).start()
     return loop
 
-class ViewerCore:
-    def __init__(self):
-        self.loop   = _new_loop()
-        self.client = None
-        self.is_connected = False
-
-        # zentraler DataProcessor für BLE
-        self.processor = DataProcessor(queue=None)
-        self.queue     = None
-
-    def auto_connect(self, queue, name_prefix="Nicla"):
-        self.queue            = queue
-        self.processor.queue  = queue
-
-        async def _job():
-            devs = await BleakScanner.discover(timeout=3.0)
-            trg  = next((d for d in devs if d.name and d.name.startswith(name_prefix)), None)
-            if not trg:
-                queue.put({"status": "Kein Nicla gefunden"})
-                return
-
-            queue.put({"status": f"Verbinde: {trg.name}"})
-            async with BleakClient(trg) as cl:
-                self.client        = cl
-                self.is_connected  = True
-                queue.put({"status": f"Verbunden: {trg.name}"})
-                await cl.start_notify(CHAR_UUID, self._notify)
-                while self.is_connected:
-                    await asyncio.sleep(0.2)
-
-        asyncio.run_coroutine_threadsafe(_job(), self.loop)
+
+class BleLink:
+    """
+    Eine BLE-Verbindung mit eigenem DataProcessor und Ring.
+    Wird von ViewerCore.add_link angelegt; connect()/disconnect() sind aus
+    jedem Thread aufrufbar, die Verbindung selbst läuft auf der Schleife
+    des Cores.
+    """
+
+    def __init__(self, core, key: str, queue=None, name_prefix: str = "Nicla",
+                 address: str = None):
+        self.core        = core
+        self.key         = key
+        self.queue       = queue
+        self.name_prefix = name_prefix
+        self.fixed       = address is not None   # feste Adresse: nie neu suchen
+        self.address     = address               # gemerkte Adresse
+        self.name        = address
+        self.client      = None
+        self.connected   = False
+        self.ring        = SampleRing()
+        self.processor   = DataProcessor(queue=None, ring=self.ring)
+        self.decoder     = BleDecoder()
+
+        # Statistik
+        self.connects    = 0
+        self.disconnects = 0
+        self.failures    = 0
+        self.reconnect_s = None   # Dauer der letzten Wiederverbindung
+        self.backoff_s   = None   # Wartezeit vor dem nächsten Versuch (None = verbunden)
+        self._lost_at    = None
+
+        self._task = None   # laufender _run der Verbindung
+        self._stop = None   # asyncio.Event dieses Laufs, in der Schleife angelegt
+
+    def _status(self, msg: str):
+        if self.queue:
+            self.queue.put({"status": msg})
+
+    # --- Steuerung (beliebiger Thread) ---
+
+    # connect() und disconnect() laufen beide über die Schleife und damit in
+    # Aufrufreihenfolge. Jeder Lauf hat ein eigenes Stop-Event: ein noch
+    # ausstehendes disconnect() beendet nur den Lauf davor, nie einen neuen.
+
+    def connect(self) -> bool:
+        """Startet Verbindung und automatische Wiederverbindung."""
+        self.core.loop.call_soon_threadsafe(self._start)
+        return True
 
     def disconnect(self):
-        self.is_connected = False
-        if self.client:
-            asyncio.run_coroutine_threadsafe(self.client.disconnect(), self.loop)
-            self.client = None
+        """Trennt und beendet die Wiederverbindung."""
+        self.core.loop.call_soon_threadsafe(self._halt)
+
+    def _start(self):
+        if self._stop is not None and not self._stop.is_set():
+            return   # läuft bereits
+        self._stop = asyncio.Event()
+        # ein gerade endender Lauf trennt zuerst, dann beginnt der neue
+        self._task = self.core.loop.create_task(self.core._run(self, self._stop, self._task))
+
+    def _halt(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    def info(self) -> dict:
+        return {
+            "address":     self.address,
+            "name":        self.name,
+            "connected":   self.connected,
+            "connects":    self.connects,
+            "disconnects": self.disconnects,
+            "failures":    self.failures,
+            "reconnect_s": self.reconnect_s,
+            "backoff_s":   self.backoff_s,
+            "dropped":     self.dropped,
+            "drift_ppm":   self.processor.timing.drift_ppm,
+            "packets":     self.decoder.stats(),
+        }
+
+    # --- Kalibrierung ---
 
     def swing_calib(self, dur=10.0):
         """Zweiphasige Swing-Kalibrierung über BLE auslösen."""
@@ -63,21 +137,292 @@ class ViewerCore:
 
     def confirm_baseline(self, dur=0.5):
         """Bestätigung der Stillstand-Phase (Rolloffset) auslösen."""
-        def cb(msg):
-            if self.queue:
-                self.queue.put({"status": msg})
-        self.processor.calib.confirm_baseline(dur, callback=cb)
+        self.processor.calib.confirm_baseline(dur, callback=self._status)
 
     def null_calib(self, dur=0.5):
         """
         Nullpunkt-Kalibrierung (alle Achsen) über BLE auslösen.
         """
-        def cb(msg):
-            if self.queue:
-                self.queue.put({"status": msg})
-        self.processor.calib.start_nullpoint(dur, callback=cb)
+        self.processor.calib.start_nullpoint(dur, callback=self._status)
+
+    # --- Daten ---
+
+    @property
+    def dropped(self) -> int:
+        """Verlorene Samples aus Lücken der Sensor-Zeit, auch über Abbrüche hinweg."""
+        return self.processor.timing.dropped
 
     def _notify(self, handle, data: bytes):
-        # Unpack <Iffff> = millis + 4×float
-        ms, qx, qy, qz, qw = struct.unpack("<Iffff", data)
-        self.processor.process(ms, qx, qy, qz, qw)
+        # Einzel- oder Batch-Format, ganze Notification als ein Block
+        ms, quat = self.decoder.feed(bytes(data))
+        if len(ms) == 0:
+            return
+        self.processor.process_batch(ms, quat)
+
+
+class ViewerCore:
+    """
+    BLE-Schleife mit beliebig vielen BleLinks. Für die GUI gibt es eine
+    Standard-Verbindung (link); ring, processor und die Kalibrierungs-
+    Methoden beziehen sich auf sie.
+    """
+
+    def __init__(self, loop=None, client_cls=BleakClient, scanner=BleakScanner):
+        self.loop       = loop or _new_loop()
+        self.client_cls = client_cls
+        self.scanner    = scanner
+        self.links      = {}
+        self._scan_lock = None   # asyncio.Lock, in der Schleife angelegt
+
+        # Standard-Verbindung: Samples in ihren Ring,
+        # Status-Meldungen in die Queue aus auto_connect
+        self.link      = self.add_link("default")
+        self.ring      = self.link.ring
+        self.processor = self.link.processor
+
+    @property
+    def client(self):
+        return self.link.client
+
+    @property
+    def is_connected(self) -> bool:
+        return self.link.connected
+
+    @property
+    def queue(self):
+        return self.link.queue
+
+    def add_link(self, key: str, queue=None, name_prefix: str = "Nicla",
+                 address: str = None) -> BleLink:
+        """Neue Verbindung mit eigener Pipeline (startet erst mit connect())."""
+        link = BleLink(self, key, queue, name_prefix, address)
+        self.links[key] = link
+        return link
+
+    def auto_connect(self, queue, name_prefix="Nicla", address=None):
+        """
+        Verbindet die Standard-Verbindung mit dem ersten Gerät, dessen Name
+        mit name_prefix beginnt, bzw. direkt mit address (MAC/UUID, ohne Scan).
+        Eine schon gefundene Adresse wird bei gleichen Angaben wiederverwendet.
+        """
+        link = self.link
+        link.queue = queue
+        if (name_prefix, address) != (link.name_prefix, link.address if link.fixed else None):
+            link.name_prefix, link.fixed = name_prefix, address is not None
+            link.address = link.name = address
+        link.connect()
+
+    def disconnect(self):
+        self.link.disconnect()
+
+    def swing_calib(self, dur=10.0):
+        self.link.swing_calib(dur)
+
+    def confirm_baseline(self, dur=0.5):
+        self.link.confirm_baseline(dur)
+
+    def null_calib(self, dur=0.5):
+        self.link.null_calib(dur)
+
+    def _notify(self, handle, data: bytes):
+        self.link._notify(handle, data)
+
+    # --- Ablauf in der Schleife ---
+
+    async def _find(self, link: BleLink):
+        """Nächstes passendes Gerät, das noch keiner anderen Verbindung gehört."""
+        if self._scan_lock is None:
+            self._scan_lock = asyncio.Lock()
+        async with self._scan_lock:   # ein Adapter, eine Suche zur Zeit
+            devs = await self.scanner.discover(timeout=SCAN_S)
+        taken = {l.address for l in self.links.values() if l is not link and l.address}
+        return next((d for d in devs if d.name and d.name.startswith(link.name_prefix)
+                     and d.address not in taken), None)
+
+    async def _session(self, link: BleLink, target, stop: asyncio.Event):
+        """Eine Verbindung, bis das Gerät sie abbricht oder disconnect() kommt."""
+        lost = asyncio.Event()
+        client = self.client_cls(
+            target, disconnected_callback=lambda _c: self.loop.call_soon_threadsafe(lost.set))
+        await client.connect()
+        link.decoder.reset()   # Sequenz beginnt nach Neustart/Wiederverbindung neu
+        try:
+            link.client, link.connected = client, True
+            link.connects += 1
+            link.backoff_s = None
+            if link._lost_at is not None:
+                link.reconnect_s = time.monotonic() - link._lost_at
+                link._lost_at = None
+                link._status(f"Wieder verbunden: {link.name} nach {link.reconnect_s:.1f} s")
+            else:
+                link._status(f"Verbunden: {link.name}")
+            await client.start_notify(CHAR_UUID, link._notify)
+            # ohne Polling warten: Abbruch-Callback oder disconnect()
+            waits = [asyncio.ensure_future(lost.wait()), asyncio.ensure_future(stop.wait())]
+            await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+            for w in waits:
+                w.cancel()
+        finally:
+            link.connected, link.client = False, None
+            if not lost.is_set():
+                try:
+                    await client.disconnect()
+                except Exception:
+                    pass
+
+    async def _run(self, link: BleLink, stop: asyncio.Event, prev=None):
+        """
+        Verbinden und nach Abbrüchen mit exponentiellem Backoff neu verbinden,
+        bis stop gesetzt ist. prev = vorheriger Lauf, auf dessen Ende gewartet wird.
+        """
+        if prev is not None:
+            await asyncio.wait([prev])
+        delay, misses = BACKOFF_MIN, 0
+        while not stop.is_set():
+            target = link.address
+            if target is None:
+                dev = await self._find(link)
+                if dev is None:
+                    link._status("Kein Nicla gefunden")
+                else:
+                    target, link.address, link.name = dev, dev.address, dev.name
+            if target is not None:
+                link._status(f"Verbinde: {link.name}")
+                try:
+                    await self._session(link, target, stop)
+                    delay, misses = BACKOFF_MIN, 0
+                except Exception as e:
+                    link.failures += 1
+                    misses += 1
+                    link._status(f"Verbindungsfehler: {e}")
+                    if misses >= RESCAN_AFTER and not link.fixed:
+                        link.address = None   # gemerkte Adresse verwerfen, neu suchen
+                        misses = 0
+            if stop.is_set():
+                break
+            if link.connects and link._lost_at is None:
+                link.disconnects += 1
+                link._lost_at = time.monotonic()
+            link.backoff_s = delay
+            link._status(f"Neuer Versuch in {delay:.1f} s")
+            try:
+                await asyncio.wait_for(stop.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, BACKOFF_MAX)
+        link.backoff_s = None
+        link._status("Getrennt")
+
+
+def selftest():
+    """
+    Prüft Wiederverbindung und Backoff mit Ersatz für BleakClient/BleakScanner
+    (python viewer_core.py): Fehlversuche, Abbruch durch das Gerät,
+    Wiederverwendung der Adresse, neue Suche nach RESCAN_AFTER Fehlversuchen,
+    Reconnect (disconnect + sofort connect) und die Zähler.
+    """
+    global BACKOFF_MIN, BACKOFF_MAX
+    saved = BACKOFF_MIN, BACKOFF_MAX
+    BACKOFF_MIN, BACKOFF_MAX = 0.01, 0.04
+    MIN = BACKOFF_MIN
+
+    class Dev:
+        def __init__(self, name, address):
+            self.name, self.address = name, address
+
+    class FakeScanner:
+        scans = 0
+
+        @classmethod
+        async def discover(cls, timeout):
+            cls.scans += 1
+            return [Dev("Other", "CC"), Dev("Nicla-A", "AA")]
+
+    class FakeClient:
+        fail = 0          # so viele connect() schlagen fehl
+        current = None    # verbundener Client
+
+        def __init__(self, target, disconnected_callback=None):
+            self.target, self.cb = target, disconnected_callback
+
+        async def connect(self):
+            if FakeClient.fail:
+                FakeClient.fail -= 1
+                raise OSError("device not found")
+            FakeClient.current = self
+
+        async def start_notify(self, uuid, fn):
+            fn(0, struct.pack(PAYLOAD_FMT, 1000, 0.0, 0.0, 0.0, 1.0))
+
+        async def disconnect(self):
+            FakeClient.current = None
+
+        def drop(self):   # Abbruch durch das Gerät (beliebiger Thread)
+            FakeClient.current = None
+            self.cb(self)
+
+    class Log:
+        """Queue-Ersatz: merkt Meldungen und die Wartezeit bei "Neuer Versuch"."""
+        def __init__(self):
+            self.msgs, self.delays = [], []
+
+        def put(self, item, block=True, timeout=None):
+            self.msgs.append(item["status"])
+            if item["status"].startswith("Neuer Versuch"):
+                self.delays.append(core.link.backoff_s)
+
+    def until(cond, timeout=2.0):
+        end = time.monotonic() + timeout
+        while not cond():
+            assert time.monotonic() < end, log.msgs
+            time.sleep(0.002)
+
+    try:
+        core = ViewerCore(client_cls=FakeClient, scanner=FakeScanner)
+        link, log = core.link, Log()
+
+        # zwei Fehlversuche, dann verbunden: Wartezeit verdoppelt sich, eine Suche
+        FakeClient.fail = 2
+        core.auto_connect(log, name_prefix="Nicla")
+        until(lambda: link.connected)
+        assert log.delays == [MIN, 2 * MIN], log.delays
+        assert (link.connects, link.failures, link.disconnects) == (1, 2, 0)
+        assert link.address == "AA" and FakeScanner.scans == 1
+        assert link.processor.timing.samples == 1
+
+        # Abbruch durch das Gerät: Backoff beginnt wieder bei MIN,
+        # gemerkte Adresse ohne neue Suche, reconnect_s gemessen
+        FakeClient.current.drop()
+        until(lambda: link.connects == 2 and link.connected)
+        assert log.delays[2:] == [MIN], log.delays
+        assert link.disconnects == 1 and FakeScanner.scans == 1
+        assert link.reconnect_s is not None and link.reconnect_s < 1.0
+        assert any(m.startswith("Wieder verbunden") for m in log.msgs)
+
+        # Reconnect wie in der GUI: disconnect() und sofort connect()
+        core.disconnect()
+        core.auto_connect(log, name_prefix="Nicla")
+        until(lambda: link.connects == 3 and link.connected)
+        time.sleep(0.05)
+        assert link.connected and log.msgs.count("Getrennt") == 1, log.msgs
+
+        # RESCAN_AFTER Fehlversuche: Adresse verwerfen, neu suchen;
+        # Wartezeit durch BACKOFF_MAX begrenzt
+        n = len(log.delays)
+        FakeClient.fail = RESCAN_AFTER
+        FakeClient.current.drop()
+        until(lambda: link.connects == 4 and link.connected)
+        assert log.delays[n:] == [MIN, 2 * MIN, 4 * MIN, 4 * MIN], log.delays[n:]
+        assert FakeScanner.scans == 2 and link.disconnects == 2
+        assert link.failures == 2 + RESCAN_AFTER
+
+        core.disconnect()
+        until(lambda: log.msgs[-1] == "Getrennt")
+        assert not link.connected and link.backoff_s is None
+    finally:
+        BACKOFF_MIN, BACKOFF_MAX = saved
+
+
+if __name__ == "__main__":
+    selftest()
+    print("selftest ok")
@@ -0,0 +1,141 @@
+# window_stats.py
+"""
+Gleitendes Fenster über (Zeit, Wert)-Paare mit Min/Max/Mittel/Varianz in
+amortisiert O(1) pro Sample – unabhängig von der Fensterlänge.
+
+Min/Max: monotone Deques (Index, Wert); vorn steht immer das Extremum des
+Fensters, hinten wird alles verworfen, was nie mehr Extremum werden kann.
+Mittel/Varianz: laufende Summe und Quadratsumme relativ zu einem
+Referenzwert (gegen Auslöschung). Die Summen werden spätestens nach
+einer Fensterlänge neu berechnet, damit sich keine Rundungsfehler
+aufaddieren.
+"""
+
+import collections
+import math
+
+
+class SlidingWindow:
+    """
+    Fenster über die letzten maxlen Samples und/oder die letzten span Sekunden.
+    t und v sind die Deques mit den Rohdaten (z. B. für Plots). Mit span
+    beginnt das Fenster neu, wenn die Zeit zurückspringt.
+    """
+
+    def __init__(self, maxlen: int = None, span: float = None):
+        self.maxlen = maxlen
+        self.span   = span
+        self.t = collections.deque()
+        self.v = collections.deque()
+        self._min = collections.deque()   # (Index, Wert), Werte aufsteigend
+        self._max = collections.deque()   # (Index, Wert), Werte absteigend
+        self._first = 0     # Index des ältesten Samples im Fenster
+        self._next  = 0     # Index des nächsten Samples
+        self._ref   = 0.0   # Referenzwert der Summen
+        self._sum   = 0.0
+        self._sum2  = 0.0
+        self._since = 0     # Pushes seit der letzten Neuberechnung
+
+    def __len__(self) -> int:
+        return len(self.v)
+
+    def clear(self):
+        # Deques bleiben dieselben Objekte (Plots halten Referenzen)
+        self.t.clear(); self.v.clear()
+        self._min.clear(); self._max.clear()
+        self._first = self._next = 0
+        self._sum = self._sum2 = 0.0
+        self._since = 0
+
+    def push(self, t: float, v: float):
+        if self.span is not None and self.t and t < self.t[-1]:
+            # Zeit springt zurück (Replay-Schleife, Sensor-Neustart): sonst
+            # würde nach Zeit nie mehr verworfen und das Fenster wüchse unbegrenzt
+            self.clear()
+        if not self.v:
+            self._ref = v
+        i = self._next
+        self._next += 1
+        self.t.append(t)
+        self.v.append(v)
+
+        mn, mx = self._min, self._max
+        while mn and mn[-1][1] >= v:
+            mn.pop()
+        mn.append((i, v))
+        while mx and mx[-1][1] <= v:
+            mx.pop()
+        mx.append((i, v))
+
+        d = v - self._ref
+        self._sum  += d
+        self._sum2 += d * d
+
+        while ((self.maxlen and len(self.v) > self.maxlen)
+               or (self.span is not None and t - self.t[0] > self.span)):
+            self._popleft()
+
+        self._since += 1
+        if self._since >= max(len(self.v), 256):
+            self._recompute()
+
+    def extend(self, ts, vs):
+        for t, v in zip(ts, vs):
+            self.push(t, v)
+
+    def _popleft(self):
+        self.t.popleft()
+        v = self.v.popleft()
+        d = v - self._ref
+        self._sum  -= d
+        self._sum2 -= d * d
+        self._first += 1
+        if self._min[0][0] < self._first:
+            self._min.popleft()
+        if self._max[0][0] < self._first:
+            self._max.popleft()
+
+    def _recompute(self):
+        """Summen exakt neu bilden, Referenz = aktueller Mittelwert."""
+        n = len(self.v)
+        self._ref  = self._ref + self._sum / n if n else 0.0
+        self._sum  = math.fsum(v - self._ref for v in self.v)
+        self._sum2 = math.fsum((v - self._ref) ** 2 for v in self.v)
+        self._since = 0
+
+    # --- Kennwerte (nan bei leerem Fenster) ---------------------------------
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1] if self._min else math.nan
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1] if self._max else math.nan
+
+    @property
+    def mean(self) -> float:
+        n = len(self.v)
+        return self._ref + self._sum / n if n else math.nan
+
+    @property
+    def var(self) -> float:
+        """Varianz der Grundgesamtheit (wie np.var)."""
+        n = len(self.v)
+        if not n:
+            return math.nan
+        m = self._sum / n
+        return max(self._sum2 / n - m * m, 0.0)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+    @property
+    def duration(self) -> float:
+        """Zeitspanne zwischen ältestem und neuestem Sample."""
+        return self.t[-1] - self.t[0] if self.t else 0.0
+
+    def stats(self) -> dict:
+        return {"n": len(self), "min": self.min, "max": self.max,
+                "mean": self.mean, "std": self.std, "duration": self.duration}